@@ -0,0 +1,137 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from ..core.perf import summarize
+from .synthetic import synthetic_columns
+
+# Headless benchmark of the full dashboard frame:
+#
+#     gt7-simdash bench [--frames N] [--frames-per-packet K] [--replay CAPTURE]
+#                       [--output FILE]
+#
+# Runs DashboardState on the dummy SDL video driver, one packet every K
+# frames (default 1) from a synthetic session or a capture, with ingest and
+# ECU pumped synchronously. Reports p50/p95/p99 for update, draw and present,
+# plus update/draw per widget and how many widget updates were skipped
+# (WidgetGroup instrumentation), as JSON.
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--frames", type=int, default=3000, help="measured frames")
+    parser.add_argument("--warmup", type=int, default=120, help="unmeasured frames")
+    parser.add_argument(
+        "--frames-per-packet",
+        type=int,
+        default=1,
+        help="render frames per packet (>1 redraws stale packets)",
+    )
+    parser.add_argument(
+        "--replay", metavar="CAPTURE", help="capture file instead of synthetic data"
+    )
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--height", type=int, default=600)
+    parser.add_argument(
+        "--output", "-o", metavar="FILE", help="write the JSON here (default stdout)"
+    )
+
+
+def run(args: argparse.Namespace) -> int:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+
+    from ..core.replay import MODE_STEP, ReplayFeed
+    from ..core.utils import warm_up_fonts
+    from ..states.dashboard_state import DashboardState
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((args.width, args.height))
+    warm_up_fonts()
+
+    total = args.warmup + args.frames
+    per_packet = max(1, args.frames_per_packet)
+    if args.replay:
+        feed = ReplayFeed(args.replay, mode=MODE_STEP, loop=True)
+        source = args.replay
+    else:
+        feed = ReplayFeed(synthetic_columns(total), mode=MODE_STEP)
+        source = "synthetic"
+
+    phases: Dict[str, List[int]] = {"update": [], "draw": [], "present": []}
+    pixels: List[int] = []
+    dt = 1 / 60
+    with tempfile.TemporaryDirectory(prefix="gt7-bench-") as ecu_dir:
+        state = DashboardState(
+            None,
+            feed.start(),
+            threaded=False,
+            ecu_storage_dir=ecu_dir,
+            record=False,
+            lap_storage_dir=os.path.join(ecu_dir, "laps"),
+        )
+        state.enter()
+        state.widgets.set_instrumented(True, capacity=args.frames)
+        try:
+            for frame in range(total):
+                if frame == args.warmup:
+                    state.widgets.reset_timings()
+                measure = frame >= args.warmup
+                pygame.event.pump()
+                if frame % per_packet == 0:
+                    feed.step(1)
+
+                t0 = time.perf_counter_ns()
+                state.update(dt)
+                t1 = time.perf_counter_ns()
+                rects = state.draw(screen)
+                t2 = time.perf_counter_ns()
+                if rects is None:
+                    pygame.display.flip()
+                elif rects:
+                    pygame.display.update(rects)
+                t3 = time.perf_counter_ns()
+
+                if measure:
+                    phases["update"].append(t1 - t0)
+                    phases["draw"].append(t2 - t1)
+                    phases["present"].append(t3 - t2)
+                    pixels.append(state.pixels_pushed)
+            widget_stats = state.widgets.timing_stats()
+            widget_updates = state.widgets.update_stats()
+        finally:
+            state.exit()
+    pygame.quit()
+
+    frame_ns = [sum(x) for x in zip(*phases.values())]
+    result = {
+        "benchmark": "dashboard_frame",
+        "created": time.time(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "source": source,
+        "frames": args.frames,
+        "frames_per_packet": per_packet,
+        "warmup": args.warmup,
+        "size": [args.width, args.height],
+        "phases": {name: summarize(s) for name, s in phases.items()},
+        "frame": summarize(frame_ns),
+        "widgets": widget_stats,
+        "widget_updates": widget_updates,
+        "pixels_pushed_mean": float(np.mean(pixels)) if pixels else 0.0,
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+    return 0
@@ -0,0 +1,106 @@
+import argparse
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from ..core.lap_delta import MultiProgressCursor, ProgressCursor
+from ..core.lap_store import LapReference
+from .synthetic import TRACK_A, TRACK_B
+
+# Micro-benchmark: per-frame cost of lap deltas against several references.
+# Run with
+#
+#     python -m gt7_simdash.bench.lap_delta [--frames N] [--max-refs R]
+#
+# and compare one KD-tree query per reference (the lookup before the progress
+# cursors), one ProgressCursor per reference, and a single MultiProgressCursor
+# doing one batched projection for all of them. The batched column should stay
+# roughly flat as references are added; "max diff" is the largest disagreement
+# between the batched and the per-reference cursors (expected: 0).
+
+LAP_S = 90.0
+SAMPLE_HZ = 10.0
+
+
+def _reference(k: int, seed: int = 0) -> LapReference:
+    """A lap of the synthetic ellipse, a little slower and wider than lap k-1."""
+    rng = np.random.default_rng(seed + k)
+    lap_s = LAP_S + 0.7 * k
+    n = int(lap_s * SAMPLE_HZ)
+    theta = np.linspace(0.0, 2 * np.pi, n, endpoint=False)
+    theta += rng.normal(0.0, 0.2 * np.pi / n, n)  # uneven checkpoint spacing
+    theta.sort()
+    r = 1.0 + 0.004 * k
+    pts = np.stack([TRACK_A * r * np.cos(theta), TRACK_B * r * np.sin(theta)], 1)
+    times = theta / (2 * np.pi) * lap_s
+    ref = LapReference(pts.astype(np.float32), times.astype(np.float32), lap_s)
+    ref.build_index().wait_ready()
+    return ref
+
+
+def _drive(frames: int, seed: int = 0):
+    """Positions of one lap sampled at render rate, with a little GPS noise."""
+    rng = np.random.default_rng(seed)
+    theta = np.linspace(0.0, 2 * np.pi, frames, endpoint=False)
+    x = TRACK_A * np.cos(theta) + rng.normal(0.0, 0.4, frames)
+    z = TRACK_B * np.sin(theta) + rng.normal(0.0, 0.4, frames)
+    return x.tolist(), z.tolist()
+
+
+def _per_frame_us(fn: Callable[[float, float], object], xs, zs) -> float:
+    t0 = time.perf_counter()
+    for x, z in zip(xs, zs):
+        fn(x, z)
+    return (time.perf_counter() - t0) / len(xs) * 1e6
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=5400)  # 90 s at 60 fps
+    parser.add_argument("--max-refs", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    xs, zs = _drive(args.frames)
+    refs: List[LapReference] = [_reference(k) for k in range(args.max_refs)]
+
+    print(
+        f"{'refs':>4} {'kd us':>8} {'cursors us':>11} {'batched us':>11}"
+        f" {'max diff s':>11}"
+    )
+    for n in range(1, args.max_refs + 1):
+        subset = refs[:n]
+
+        def kd(x: float, z: float) -> list:
+            return [ref.query((x, z)) for ref in subset]
+
+        cursors = [ProgressCursor(ref) for ref in subset]
+        for c in cursors:
+            c.reset()
+
+        def sequential(x: float, z: float) -> list:
+            return [c.locate(x, z) for c in cursors]
+
+        multi = MultiProgressCursor()
+        for k, ref in enumerate(subset):
+            multi.set(f"ref{k}", ref)
+
+        t_kd = _per_frame_us(kd, xs, zs)
+        t_seq = _per_frame_us(sequential, xs, zs)
+        t_multi = _per_frame_us(multi.locate, xs, zs)
+
+        # same lap again, comparing results frame by frame
+        multi.reset()
+        for c in cursors:
+            c.reset()
+        diff = 0.0
+        for x, z in zip(xs, zs):
+            batched = multi.locate(x, z)
+            for k, c in enumerate(cursors):
+                diff = max(diff, abs(batched[f"ref{k}"] - c.locate(x, z)))
+        print(f"{n:>4} {t_kd:>8.1f} {t_seq:>11.1f} {t_multi:>11.1f} {diff:>11.2g}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
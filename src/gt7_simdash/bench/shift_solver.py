@@ -0,0 +1,126 @@
+import argparse
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from ..core.ecu import DynoCurve
+from ..core.shift_solver import solve_shift_points
+
+# Micro-benchmark: vectorised shift solver vs. the per-gear, per-bin scalar
+# loop ECU._recompute_targets used before. Run with
+#
+#     python -m gt7_simdash.bench.shift_solver [--repeat N]
+#
+# and compare timings and the largest disagreement (which should stay within
+# one rpm bin, since the solver interpolates between bins).
+
+GEARBOXES: Dict[str, List[float]] = {
+    "6-speed": [3.626, 2.188, 1.541, 1.213, 1.0, 0.767],
+    "7-speed": [3.827, 2.360, 1.685, 1.312, 1.000, 0.793, 0.642],
+    "8-speed": [4.714, 3.143, 2.106, 1.667, 1.285, 1.000, 0.839, 0.667],
+}
+
+
+def _curve(shape: str, redline: float, seed: int = 0) -> DynoCurve:
+    curve = DynoCurve()
+    rpm = np.asarray(curve.rpm_bins, dtype=np.float64)
+    x = (rpm - 800.0) / (redline - 800.0)
+    if shape == "peaky":  # NA, torque peak near the top
+        t = 0.45 + 0.55 * np.exp(-(((x - 0.8) / 0.35) ** 2))
+    elif shape == "turbo":  # early plateau, falling after the midrange
+        t = np.clip(0.3 + 2.5 * x, 0.0, 1.0) * (1.0 - 0.45 * np.clip(x - 0.55, 0, 1))
+    else:  # flat diesel-ish curve
+        t = 0.9 - 0.5 * (x - 0.35) ** 2
+    t = t + np.random.default_rng(seed).normal(0.0, 0.01, t.size)
+    t[rpm > redline + 500.0] = 0.0
+    curve.torque_bins = t.astype(np.float32)
+    curve.counts = np.where(t > 0, 10, 0).astype(np.int64)
+    curve.version += 1
+    return curve
+
+
+def legacy_solve(
+    curve: DynoCurve, gr: List[float], redline_rpm: float
+) -> Tuple[Dict[int, float], Dict[int, float]]:
+    """The scalar loop ECU._recompute_targets ran before the vectorised solver."""
+    xs, _ = curve.smoothed()
+    up: Dict[int, float] = {}
+    down: Dict[int, float] = {}
+    for g in range(1, len(gr)):
+        Gg, Gn = gr[g - 1], gr[g]
+        if Gg <= 0 or Gn <= 0:
+            continue
+        best_rpm = None
+        for rpm in xs.tolist():
+            if rpm < 1200.0:
+                continue
+            if rpm > redline_rpm:
+                break
+            if curve.torque_at(rpm * (Gn / Gg)) * Gn >= curve.torque_at(rpm) * Gg:
+                best_rpm = rpm
+                break
+        up[g] = best_rpm if best_rpm is not None else min(redline_rpm, float(xs[-1]))
+    for g in range(2, len(gr)):
+        Gg, Gd = gr[g - 1], gr[g - 2]
+        if Gg <= 0 or Gd <= 0:
+            continue
+        best_rpm = None
+        for rpm in xs.tolist():
+            if rpm < 1000.0:
+                continue
+            if curve.torque_at(rpm) * Gg >= curve.torque_at(rpm * (Gd / Gg)) * Gd:
+                best_rpm = rpm
+                break
+        down[g] = best_rpm if best_rpm is not None else 1400.0
+    return up, down
+
+
+def _time(fn: Callable[[], object], repeat: int) -> float:
+    """Best-of-5 mean time per call, in microseconds."""
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / repeat)
+    return best * 1e6
+
+
+def _max_diff(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if a.keys() != b.keys():
+        return float("inf")
+    return max((abs(a[g] - b[g]) for g in a), default=0.0)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--redline", type=float, default=7500.0)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'gearbox':<9} {'curve':<7} {'legacy us':>10} {'solver us':>10}"
+        f" {'speedup':>8} {'max diff rpm':>13}"
+    )
+    for box, gr in GEARBOXES.items():
+        for seed, shape in enumerate(("peaky", "turbo", "flat")):
+            curve = _curve(shape, args.redline, seed)
+            xs, ys = curve.smoothed()
+            old_up, old_dn = legacy_solve(curve, gr, args.redline)
+            table = solve_shift_points(xs, ys, gr, args.redline)
+            diff = max(_max_diff(old_up, table.up), _max_diff(old_dn, table.down))
+
+            t_old = _time(lambda: legacy_solve(curve, gr, args.redline), args.repeat)
+            t_new = _time(
+                lambda: solve_shift_points(xs, ys, gr, args.redline), args.repeat
+            )
+            print(
+                f"{box:<9} {shape:<7} {t_old:>10.1f} {t_new:>10.1f}"
+                f" {t_old / t_new:>7.1f}x {diff:>13.1f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,383 @@
+import argparse
+import random
+import socket
+import struct
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from granturismo.intake.feed import Feed
+
+from ..core.logger import Logger
+from .synthetic import synthetic_columns
+
+try:
+    from salsa20 import Salsa20_xor  # installed with granturismo
+
+    _HAVE_SALSA20 = True
+except ImportError:
+    _HAVE_SALSA20 = False
+
+# Local stand-in for the console's telemetry service:
+#
+#     gt7-simdash sim [--hz 240] [--jitter-ms 2] [--loss 0.01] [--reorder 0.01]
+#
+# Listens for heartbeats on Feed._HEARTBEAT_PORT and streams encrypted GT7
+# packets to Feed._BIND_PORT of every peer that sent one recently, so the
+# connection handshake and the ingest path can be exercised on loopback
+# (enter 127.0.0.1 as the PlayStation IP).
+
+KEY = b"Simulator Interface Packet GT7 v"
+IV_MASK = 0xDEADBEAF
+MAGIC = b"0S7G"  # "G7S0", stored byte-reversed
+HEARTBEAT_TIMEOUT_S = 15.0
+MIN_HZ, MAX_HZ = 1.0, 1000.0
+
+# Plaintext packet layout (little endian, Feed._BUFFER_LEN bytes)
+PACKET_DTYPE = np.dtype(
+    {
+        "names": [
+            "magic",
+            "position",
+            "velocity",
+            "engine_rpm",
+            "gas_level",
+            "gas_capacity",
+            "car_speed",
+            "packet_id",
+            "lap_count",
+            "laps_in_race",
+            "best_lap_time",
+            "last_lap_time",
+            "time_of_day",
+            "start_position",
+            "rpm_alert_min",
+            "rpm_alert_max",
+            "car_max_speed",
+            "flags",
+            "gears",
+            "throttle",
+            "brake",
+            "wheel_rps",
+            "wheel_radius",
+            "wheel_suspension",
+            "clutch",
+            "transmission_max_speed",
+            "gear_ratios",
+            "car_id",
+        ],
+        "formats": [
+            "S4",
+            ("<f4", (3,)),
+            ("<f4", (3,)),
+            "<f4",
+            "<f4",
+            "<f4",
+            "<f4",
+            "<i4",
+            "<u2",
+            "<u2",
+            "<u4",
+            "<u4",
+            "<u4",
+            "<u4",
+            "<u2",
+            "<u2",
+            "<u2",
+            "<u2",
+            "u1",
+            "u1",
+            "u1",
+            ("<f4", (4,)),
+            ("<f4", (4,)),
+            ("<f4", (4,)),
+            "<f4",
+            "<f4",
+            ("<f4", (8,)),
+            "<i4",
+        ],
+        "offsets": [
+            0,
+            4,
+            16,
+            60,
+            68,
+            72,
+            76,
+            112,
+            116,
+            118,
+            120,
+            124,
+            128,
+            132,
+            136,
+            138,
+            140,
+            142,
+            144,
+            145,
+            146,
+            164,
+            180,
+            196,
+            244,
+            256,
+            260,
+            292,
+        ],
+        "itemsize": Feed._BUFFER_LEN,
+    }
+)
+
+
+def _opt_u(col: np.ndarray, none: int) -> np.ndarray:
+    """Capture NONE_INT (-1) -> the protocol's all-ones "not set" value."""
+    col = col.astype(np.int64)
+    return np.where(col < 0, none, col)
+
+
+def encode_columns(cols: Dict[str, np.ndarray]) -> np.ndarray:
+    """Encode capture columns into plaintext packets, one row per packet."""
+    n = len(cols["packet_id"])
+    out = np.zeros(n, dtype=PACKET_DTYPE)
+    out["magic"] = MAGIC
+    out["position"] = cols["position"]
+    out["velocity"] = cols["velocity"]
+    out["engine_rpm"] = cols["engine_rpm"]
+    out["gas_level"] = 100.0
+    out["gas_capacity"] = 100.0
+    out["car_speed"] = cols["car_speed"]
+    out["packet_id"] = cols["packet_id"]
+    out["lap_count"] = _opt_u(cols["lap_count"], 0xFFFF)
+    out["laps_in_race"] = _opt_u(cols["laps_in_race"], 0xFFFF)
+    out["best_lap_time"] = _opt_u(cols["best_lap_time"], 0xFFFFFFFF)
+    out["last_lap_time"] = _opt_u(cols["last_lap_time"], 0xFFFFFFFF)
+    out["time_of_day"] = np.maximum(cols["time_of_day"], 0)
+    out["start_position"] = 0xFFFFFFFF  # no race: start position/cars unset
+    out["rpm_alert_min"] = np.clip(cols["rpm_alert_min"], 0, 0xFFFF)
+    out["rpm_alert_max"] = np.clip(cols["rpm_alert_max"], 0, 0xFFFF)
+    out["car_max_speed"] = 300
+    out["flags"] = cols["flags"]
+    current = _opt_u(cols["current_gear"], 15) & 15
+    suggested = _opt_u(cols["suggested_gear"], 15) & 15
+    out["gears"] = current | (suggested << 4)
+    out["throttle"] = np.clip(cols["throttle"], 0, 255)
+    out["brake"] = np.clip(cols["brake"], 0, 255)
+    out["wheel_rps"] = cols["wheel_rps"] * (2 * np.pi)  # sent as rad/s
+    out["wheel_radius"] = cols["wheel_radius"]
+    out["wheel_suspension"] = cols["wheel_suspension"]
+    out["clutch"] = cols["clutch"]
+    out["transmission_max_speed"] = 0.0
+    out["gear_ratios"] = cols["gear_ratios"]
+    out["car_id"] = cols["car_id"]
+    return out
+
+
+def encrypt(plain: bytes, iv1: int) -> bytes:
+    """Encrypt one packet the way the console does; iv1 travels at bytes 64:68."""
+    iv2 = iv1 ^ IV_MASK
+    nonce = iv2.to_bytes(4, "little") + iv1.to_bytes(4, "little")
+    data = bytearray(Salsa20_xor(plain, nonce, KEY))
+    data[64:68] = iv1.to_bytes(4, "little")
+    return bytes(data)
+
+
+class GT7Simulator:
+    """Heartbeat listener plus a paced, optionally lossy telemetry streamer.
+
+    ``jitter_ms`` is the standard deviation of a per-packet send delay,
+    ``loss`` the probability a packet is dropped and ``reorder`` the
+    probability a packet is held back and sent after the next one.
+    """
+
+    def __init__(
+        self,
+        cols: Dict[str, np.ndarray],
+        hz: float = 60.0,
+        jitter_ms: float = 0.0,
+        loss: float = 0.0,
+        reorder: float = 0.0,
+        bind: str = "0.0.0.0",
+        heartbeat_port: int = Feed._HEARTBEAT_PORT,
+        telemetry_port: int = Feed._BIND_PORT,
+        seed: Optional[int] = None,
+    ) -> None:
+        if not _HAVE_SALSA20:
+            raise RuntimeError("The simulator needs the 'salsa20' package")
+        self.logger = Logger(__class__.__name__).get()
+        self._packets = encode_columns(cols)
+        self.hz = min(MAX_HZ, max(MIN_HZ, float(hz)))
+        self.jitter_s = max(0.0, jitter_ms) / 1000.0
+        self.loss = min(1.0, max(0.0, loss))
+        self.reorder = min(1.0, max(0.0, reorder))
+        self.bind = bind
+        self.heartbeat_port = heartbeat_port
+        self.telemetry_port = telemetry_port
+        self._rng = random.Random(seed)
+        self._id_span = int(np.ptp(cols["packet_id"])) + 1 if len(self._packets) else 1
+
+        self._peers: Dict[str, float] = {}  # ip -> last heartbeat (monotonic)
+        self._peers_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+        self.heartbeats = 0
+        self.sent = 0
+        self.lost = 0
+        self.reordered = 0
+
+    # --- Lifecycle ---------------------------------------------------------
+    def start(self) -> "GT7Simulator":
+        self._hb_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._hb_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._hb_sock.bind((self.bind, self.heartbeat_port))
+        self._hb_sock.settimeout(0.2)
+        self._tx_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        for target, name in (
+            (self._listen, "SimHeartbeat"),
+            (self._stream, "SimStream"),
+        ):
+            t = threading.Thread(target=target, name=name, daemon=True)
+            t.start()
+            self._threads.append(t)
+        self.logger.info(
+            f"GT7 simulator on {self.bind}:{self.heartbeat_port}, "
+            f"{self.hz:g} Hz, jitter {self.jitter_s * 1000:g} ms, "
+            f"loss {self.loss:g}, reorder {self.reorder:g}"
+        )
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=1.0)
+        self._threads = []
+        self._hb_sock.close()
+        self._tx_sock.close()
+
+    def stats(self) -> dict:
+        with self._peers_lock:
+            peers = len(self._peers)
+        return {
+            "peers": peers,
+            "heartbeats": self.heartbeats,
+            "sent": self.sent,
+            "lost": self.lost,
+            "reordered": self.reordered,
+        }
+
+    # --- Threads -----------------------------------------------------------
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            try:
+                data, (ip, _) = self._hb_sock.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            if data.startswith(Feed._HEARTBEAT_MESSAGE):
+                self.heartbeats += 1
+                with self._peers_lock:
+                    if ip not in self._peers:
+                        self.logger.info(f"Heartbeat from {ip}, streaming")
+                    self._peers[ip] = time.monotonic()
+
+    def _active_peers(self, now: float) -> Tuple[str, ...]:
+        with self._peers_lock:
+            for ip, seen in list(self._peers.items()):
+                if now - seen > HEARTBEAT_TIMEOUT_S:
+                    del self._peers[ip]
+                    self.logger.info(f"No heartbeat from {ip}, stopped streaming")
+            return tuple(self._peers)
+
+    def _stream(self) -> None:
+        period = 1.0 / self.hz
+        i = 0
+        loops = 0
+        held: Optional[bytes] = None
+        next_t = time.monotonic()
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if next_t > now:
+                time.sleep(next_t - now)
+            next_t += period
+            now = time.monotonic()
+            if now - next_t > 1.0:
+                next_t = now  # fell far behind (e.g. suspended); don't burst
+
+            peers = self._active_peers(now)
+            if not peers:
+                continue
+
+            plain = bytearray(self._packets[i : i + 1].tobytes())
+            pid = int(self._packets["packet_id"][i]) + loops * self._id_span
+            struct.pack_into("<i", plain, 112, pid & 0x7FFFFFFF)
+            i += 1
+            if i == len(self._packets):
+                i, loops = 0, loops + 1
+
+            if self._rng.random() < self.loss:
+                self.lost += 1
+                continue
+            data = encrypt(bytes(plain), self._rng.getrandbits(32))
+            if held is None and self._rng.random() < self.reorder:
+                held = data
+                self.reordered += 1
+                continue
+            if self.jitter_s:
+                time.sleep(abs(self._rng.gauss(0.0, self.jitter_s)))
+            for payload in (data, held) if held is not None else (data,):
+                for ip in peers:
+                    try:
+                        self._tx_sock.sendto(payload, (ip, self.telemetry_port))
+                        self.sent += 1
+                    except OSError as e:
+                        self.logger.info(f"Send to {ip} failed: {e}")
+            held = None
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--hz", type=float, default=60.0, help="packet rate, 1-1000")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0, help="drop probability")
+    parser.add_argument(
+        "--reorder", type=float, default=0.0, help="swap-with-next probability"
+    )
+    parser.add_argument("--bind", default="0.0.0.0", help="heartbeat listen address")
+    parser.add_argument(
+        "--replay", metavar="CAPTURE", help="stream a capture instead of synthetic"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=0.0, help="seconds to run (0 = forever)"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.replay:
+        from ..core.capture import CaptureReader
+
+        cols = CaptureReader(args.replay).columns()
+    else:
+        cols = synthetic_columns(int(60 * 600))  # 10 minutes, looped
+    sim = GT7Simulator(
+        cols,
+        hz=args.hz,
+        jitter_ms=args.jitter_ms,
+        loss=args.loss,
+        reorder=args.reorder,
+        bind=args.bind,
+        seed=args.seed,
+    ).start()
+    start = time.monotonic()
+    try:
+        while not args.duration or time.monotonic() - start < args.duration:
+            time.sleep(min(5.0, args.duration or 5.0))
+            sim.logger.info(f"Simulator: {sim.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.stop()
+    return 0
@@ -0,0 +1,96 @@
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..core.capture import RECORD_DTYPE
+
+# Synthetic telemetry in capture-column form, so it can be fed through
+# ReplayFeed exactly like a recorded session. The car laps an elliptical
+# track with a periodic speed profile, picks gears by rpm and gets throttle,
+# brake and lap times that are consistent with its motion.
+
+GEAR_RATIOS = [3.62, 2.38, 1.78, 1.41, 1.16, 0.97]
+FINAL_DRIVE = 3.9
+WHEEL_RADIUS = 0.32
+REDLINE = 7800.0
+TRACK_A, TRACK_B = 420.0, 210.0  # ellipse semi-axes, metres
+
+
+def _track_length() -> float:
+    a, b = TRACK_A, TRACK_B
+    h = ((a - b) / (a + b)) ** 2
+    return math.pi * (a + b) * (1 + 3 * h / (10 + math.sqrt(4 - 3 * h)))
+
+
+def synthetic_columns(
+    n: int,
+    hz: float = 60.0,
+    car_id: int = 3344,
+    gear_ratios: Optional[List[float]] = None,
+    seed: int = 0,
+) -> Dict[str, np.ndarray]:
+    """Return *n* packets at *hz* as capture columns (see RECORD_DTYPE)."""
+    gr = np.asarray(gear_ratios or GEAR_RATIOS, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    rec = np.zeros(n, dtype=RECORD_DTYPE)
+    t = np.arange(n) / hz
+
+    # speed profile (m/s): straights and corners, a little noise
+    v = 42.0 + 17.0 * np.sin(2 * np.pi * t / 14.0) + rng.normal(0.0, 0.15, n)
+    v = np.maximum(v, 5.0)
+    accel = np.gradient(v, 1.0 / hz)
+
+    length = _track_length()
+    s = np.cumsum(v) / hz
+    lap = (s // length).astype(np.int64)
+    theta = 2 * np.pi * (s % length) / length
+
+    # gear: lowest one that keeps the engine below 95% of the redline
+    wheel_rpm = v / (2 * np.pi * WHEEL_RADIUS) * 60.0
+    rpm_all = wheel_rpm[:, None] * gr[None, :] * FINAL_DRIVE
+    ok = rpm_all <= 0.95 * REDLINE
+    gear_idx = np.where(ok.any(axis=1), ok.argmax(axis=1), gr.size - 1)
+    rpm = np.maximum(rpm_all[np.arange(n), gear_idx], 900.0)
+
+    # lap times (ms) from the crossing times of the start line
+    lap_start = np.concatenate(([0], np.flatnonzero(np.diff(lap)) + 1))
+    lap_ms = np.diff(t[lap_start]) * 1000.0
+    last = np.full(n, -1, np.int64)
+    best = np.full(n, -1, np.int64)
+    for k in range(1, lap_start.size):
+        last[lap_start[k] :] = int(lap_ms[k - 1])
+        best[lap_start[k] :] = int(lap_ms[:k].min())
+
+    rec["recv_ns"] = (t * 1e9).astype(np.int64)
+    rec["packet_id"] = np.arange(n) + 1000
+    rec["car_id"] = car_id
+    rec["engine_rpm"] = rpm
+    rec["car_speed"] = v
+    rec["throttle"] = np.where(accel > -0.5, 255.0, 0.0)
+    rec["brake"] = np.where(accel < -2.0, np.minimum(255.0, -accel * 25.0), 0.0)
+    rec["current_gear"] = gear_idx + 1
+    rec["suggested_gear"] = -1
+    rec["flags"] = 0b1001  # car_on_track | in_gear
+    rec["lap_count"] = lap + 1
+    rec["laps_in_race"] = -1
+    rec["best_lap_time"] = best
+    rec["last_lap_time"] = last
+    rec["time_of_day"] = (43_200_000 + t * 1000).astype(np.int64)
+    rec["rpm_alert_min"] = REDLINE - 800.0
+    rec["rpm_alert_max"] = REDLINE
+    rec["position"] = np.stack(
+        [TRACK_A * np.cos(theta), np.zeros(n), TRACK_B * np.sin(theta)], axis=1
+    )
+    rec["velocity"] = np.stack(
+        [-v * np.sin(theta), np.zeros(n), v * np.cos(theta)], axis=1
+    )
+    rps = v / (2 * np.pi * WHEEL_RADIUS)
+    rec["wheel_radius"] = WHEEL_RADIUS
+    rec["wheel_rps"] = rps[:, None]
+    rec["wheel_ground_speed"] = v[:, None]
+    rec["wheel_suspension"] = 0.08
+    ratios = np.zeros((n, rec["gear_ratios"].shape[1]), np.float32)
+    ratios[:, : gr.size] = gr
+    rec["gear_ratios"] = ratios
+    return {name: rec[name] for name in RECORD_DTYPE.names}
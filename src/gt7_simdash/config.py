@@ -14,6 +14,17 @@ class Config:
     height: int = field(default=600)
     playstation_ip: Optional[str] = field(default=None)
     recent_connected: list[str] = field(default_factory=list)
+    # telemetry capture (see core/capture.py)
+    record_telemetry: bool = field(default=False)
+    capture_dir: str = field(default="~/.gt7_captures")
+    capture_compress: bool = field(default=True)
+    # best-lap references per car and track (see core/lap_store.py)
+    lap_reference_dir: str = field(default="~/.gt7_laps")
+    # frame pacing (see core/frame_pacer.py): fixed, vsync, telemetry or idle
+    frame_mode: str = field(default="fixed")
+    fps: int = field(default=60)
+    idle_fps: int = field(default=10)
+    idle_after_s: float = field(default=2.0)
 
     @classmethod
     def parse_config(cls, path: Path) -> "Config":
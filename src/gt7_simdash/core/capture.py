@@ -0,0 +1,488 @@
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .ingest import StampedPacket
+from .logger import Logger
+
+# Telemetry capture files.
+#
+# Every packet becomes one fixed-width record (RECORD_DTYPE). Records are
+# buffered into chunks and written column by column, so a chunk is a short
+# header followed by one contiguous block per field:
+#
+#   file   := MAGIC, u32 header length, JSON header, chunk*
+#   chunk  := "CHNK", u32 records, u32 flags, u32 payload length, u32 crc32,
+#             payload (the column blocks, zlib-compressed if flags & 1)
+#
+# Columns compress well (rpm, gear, lap and flags change slowly), so an hour
+# at 60 Hz is a few MB. Uncompressed captures can be read straight from an
+# mmap without copying.
+
+MAGIC = b"GT7CAP01"
+CHUNK_TAG = b"CHNK"
+FLAG_ZLIB = 1
+DEFAULT_CHUNK_RECORDS = 4096
+
+_CHUNK = struct.Struct("<4sIIII")
+
+FLAG_NAMES = (
+    "car_on_track",
+    "paused",
+    "loading_or_processing",
+    "in_gear",
+    "has_turbo",
+    "rev_limiter_alert_active",
+    "hand_brake_active",
+    "lights_active",
+    "lights_high_beams_active",
+    "lights_low_beams_active",
+    "asm_active",
+    "tcs_active",
+)
+WHEEL_NAMES = ("front_left", "front_right", "rear_left", "rear_right")
+MAX_GEARS = 8
+NONE_INT = -1  # stored for optional integer fields that were None
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("recv_ns", "<i8"),
+        ("packet_id", "<u4"),
+        ("car_id", "<u4"),
+        ("engine_rpm", "<f4"),
+        ("car_speed", "<f4"),
+        ("throttle", "<f4"),
+        ("brake", "<f4"),
+        ("clutch", "<f4"),
+        ("current_gear", "i1"),
+        ("suggested_gear", "i1"),
+        ("flags", "<u2"),
+        ("lap_count", "<i2"),
+        ("laps_in_race", "<i2"),
+        ("best_lap_time", "<i4"),
+        ("last_lap_time", "<i4"),
+        ("time_of_day", "<i4"),
+        ("rpm_alert_min", "<f4"),
+        ("rpm_alert_max", "<f4"),
+        ("position", "<f4", (3,)),
+        ("velocity", "<f4", (3,)),
+        ("wheel_radius", "<f4", (4,)),
+        ("wheel_rps", "<f4", (4,)),
+        ("wheel_ground_speed", "<f4", (4,)),
+        ("wheel_suspension", "<f4", (4,)),
+        ("gear_ratios", "<f4", (MAX_GEARS,)),
+    ]
+)
+
+
+def _opt_int(v) -> int:
+    return NONE_INT if v is None else int(v)
+
+
+def _vec(v) -> tuple:
+    if v is None:
+        return (0.0, 0.0, 0.0)
+    return (
+        float(getattr(v, "x", 0.0) or 0.0),
+        float(getattr(v, "y", 0.0) or 0.0),
+        float(getattr(v, "z", 0.0) or 0.0),
+    )
+
+
+def _wheel_list(wheels) -> list:
+    if wheels is None:
+        return []
+    try:
+        return list(wheels)[:4]
+    except TypeError:
+        return [getattr(wheels, n, None) for n in WHEEL_NAMES]
+
+
+def encode_packet(row: np.void, stamped: StampedPacket) -> None:
+    """Fill the record *row* (a RECORD_DTYPE element) from *stamped*."""
+    p = stamped.packet
+    row["recv_ns"] = stamped.recv_ns
+    row["packet_id"] = int(getattr(p, "packet_id", 0) or 0)
+    row["car_id"] = int(getattr(p, "car_id", 0) or 0)
+    row["engine_rpm"] = float(getattr(p, "engine_rpm", 0.0) or 0.0)
+    row["car_speed"] = float(getattr(p, "car_speed", 0.0) or 0.0)
+    row["throttle"] = float(getattr(p, "throttle", 0.0) or 0.0)
+    row["brake"] = float(getattr(p, "brake", 0.0) or 0.0)
+    row["clutch"] = float(getattr(p, "clutch", 0.0) or 0.0)
+    row["current_gear"] = _opt_int(getattr(p, "current_gear", None))
+    row["suggested_gear"] = _opt_int(getattr(p, "suggested_gear", None))
+    row["lap_count"] = _opt_int(getattr(p, "lap_count", None))
+    row["laps_in_race"] = _opt_int(getattr(p, "laps_in_race", None))
+    row["best_lap_time"] = _opt_int(getattr(p, "best_lap_time", None))
+    row["last_lap_time"] = _opt_int(getattr(p, "last_lap_time", None))
+    row["time_of_day"] = int(getattr(p, "time_of_day", 0) or 0)
+
+    flags = getattr(p, "flags", None)
+    bits = 0
+    if flags is not None:
+        for i, name in enumerate(FLAG_NAMES):
+            if getattr(flags, name, False):
+                bits |= 1 << i
+    row["flags"] = bits
+
+    alert = getattr(p, "rpm_alert", None)
+    row["rpm_alert_min"] = float(getattr(alert, "min", 0.0) or 0.0)
+    row["rpm_alert_max"] = float(getattr(alert, "max", 0.0) or 0.0)
+    row["position"] = _vec(getattr(p, "position", None))
+    row["velocity"] = _vec(getattr(p, "velocity", None))
+
+    radius, rps, ground, susp = [0.0] * 4, [0.0] * 4, [0.0] * 4, [0.0] * 4
+    for i, w in enumerate(_wheel_list(getattr(p, "wheels", None))):
+        if w is None:
+            continue
+        radius[i] = float(getattr(w, "radius", 0.0) or 0.0)
+        rps[i] = float(getattr(w, "rps", 0.0) or 0.0)
+        ground[i] = float(getattr(w, "ground_speed", 0.0) or 0.0)
+        susp[i] = float(getattr(w, "suspension_height", 0.0) or 0.0)
+    row["wheel_radius"] = radius
+    row["wheel_rps"] = rps
+    row["wheel_ground_speed"] = ground
+    row["wheel_suspension"] = susp
+
+    gr = list(getattr(p, "gear_ratios", None) or [])[:MAX_GEARS]
+    ratios = [0.0] * MAX_GEARS
+    ratios[: len(gr)] = [float(g) for g in gr]
+    row["gear_ratios"] = ratios
+
+
+# --- Decoding --------------------------------------------------------------
+# Lightweight stand-ins for the granturismo model classes, exposing the same
+# attribute names for everything a capture stores.
+
+
+class Vector:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x: float, y: float, z: float) -> None:
+        self.x, self.y, self.z = x, y, z
+
+
+class Bounds:
+    __slots__ = ("min", "max")
+
+    def __init__(self, min: float, max: float) -> None:
+        self.min, self.max = min, max
+
+
+class Wheel:
+    __slots__ = ("radius", "rps", "ground_speed", "suspension_height")
+
+    def __init__(
+        self, radius: float, rps: float, ground_speed: float, suspension_height: float
+    ) -> None:
+        self.radius = radius
+        self.rps = rps
+        self.ground_speed = ground_speed
+        self.suspension_height = suspension_height
+
+
+class Wheels:
+    __slots__ = WHEEL_NAMES
+
+    def __init__(self, wheels: List[Wheel]) -> None:
+        for name, w in zip(WHEEL_NAMES, wheels):
+            setattr(self, name, w)
+
+    def __iter__(self) -> Iterator[Wheel]:
+        return (getattr(self, name) for name in WHEEL_NAMES)
+
+
+class Flags:
+    __slots__ = FLAG_NAMES
+
+    def __init__(self, bits: int) -> None:
+        for i, name in enumerate(FLAG_NAMES):
+            setattr(self, name, bool(bits >> i & 1))
+
+
+class CapturedPacket:
+    """Packet rebuilt from a capture record."""
+
+    __slots__ = (
+        "packet_id",
+        "car_id",
+        "engine_rpm",
+        "car_speed",
+        "throttle",
+        "brake",
+        "clutch",
+        "current_gear",
+        "suggested_gear",
+        "flags",
+        "lap_count",
+        "laps_in_race",
+        "best_lap_time",
+        "last_lap_time",
+        "time_of_day",
+        "rpm_alert",
+        "position",
+        "velocity",
+        "wheels",
+        "gear_ratios",
+    )
+
+
+def _opt(v: int) -> Optional[int]:
+    return None if v == NONE_INT else v
+
+
+def decode_packet(cols: Dict[str, np.ndarray], i: int) -> CapturedPacket:
+    """Rebuild record *i* of the capture columns *cols* as a packet."""
+    p = CapturedPacket()
+    p.packet_id = int(cols["packet_id"][i])
+    p.car_id = int(cols["car_id"][i])
+    p.engine_rpm = float(cols["engine_rpm"][i])
+    p.car_speed = float(cols["car_speed"][i])
+    p.throttle = float(cols["throttle"][i])
+    p.brake = float(cols["brake"][i])
+    p.clutch = float(cols["clutch"][i])
+    p.current_gear = _opt(int(cols["current_gear"][i]))
+    p.suggested_gear = _opt(int(cols["suggested_gear"][i]))
+    p.flags = Flags(int(cols["flags"][i]))
+    p.lap_count = _opt(int(cols["lap_count"][i]))
+    p.laps_in_race = _opt(int(cols["laps_in_race"][i]))
+    p.best_lap_time = _opt(int(cols["best_lap_time"][i]))
+    p.last_lap_time = _opt(int(cols["last_lap_time"][i]))
+    p.time_of_day = int(cols["time_of_day"][i])
+    p.rpm_alert = Bounds(
+        float(cols["rpm_alert_min"][i]), float(cols["rpm_alert_max"][i])
+    )
+    p.position = Vector(*cols["position"][i].tolist())
+    p.velocity = Vector(*cols["velocity"][i].tolist())
+    p.wheels = Wheels(
+        [
+            Wheel(*w)
+            for w in zip(
+                cols["wheel_radius"][i].tolist(),
+                cols["wheel_rps"][i].tolist(),
+                cols["wheel_ground_speed"][i].tolist(),
+                cols["wheel_suspension"][i].tolist(),
+            )
+        ]
+    )
+    p.gear_ratios = [g for g in cols["gear_ratios"][i].tolist() if g > 0.0]
+    return p
+
+
+def pack_chunk(records: np.ndarray, compress: bool) -> bytes:
+    """Serialise *records* column by column into one chunk."""
+    payload = b"".join(
+        np.ascontiguousarray(records[name]).tobytes() for name in records.dtype.names
+    )
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 6)
+        flags |= FLAG_ZLIB
+    return (
+        _CHUNK.pack(CHUNK_TAG, len(records), flags, len(payload), zlib.crc32(payload))
+        + payload
+    )
+
+
+def unpack_chunk(buf, n: int, flags: int) -> Dict[str, np.ndarray]:
+    """Column arrays for a chunk payload of *n* records (views into *buf*)."""
+    if flags & FLAG_ZLIB:
+        buf = zlib.decompress(buf)
+    cols = {}
+    off = 0
+    for name in RECORD_DTYPE.names:
+        dt, shape = RECORD_DTYPE[name].base, RECORD_DTYPE[name].shape
+        count = n * int(np.prod(shape, dtype=np.int64))
+        arr = np.frombuffer(buf, dt, count, off)
+        cols[name] = arr.reshape((n, *shape))
+        off += count * dt.itemsize
+    return cols
+
+
+class CaptureRecorder:
+    """Writes every ingested packet to a capture file.
+
+    Subscribe :meth:`submit` to a :class:`TelemetryIngest`. Packets are
+    encoded into a preallocated record buffer on the calling thread; full
+    chunks are compressed and written by a background thread. :meth:`close`
+    writes the last partial chunk.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        chunk_records: int = DEFAULT_CHUNK_RECORDS,
+        compress: bool = True,
+    ) -> None:
+        self.path = path
+        self.logger = Logger(__class__.__name__).get()
+        self.chunk_records = max(1, int(chunk_records))
+        self.compress = compress
+        self._buf = np.zeros(self.chunk_records, dtype=RECORD_DTYPE)
+        self._n = 0
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[np.ndarray]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+        self.records = 0
+        self.chunks = 0
+        self.bytes_written = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        header = json.dumps(
+            {
+                "version": 1,
+                "created": time.time(),
+                "dtype": RECORD_DTYPE.descr,
+                "flags": FLAG_NAMES,
+            }
+        ).encode("utf-8")
+        self._fh = open(path, "wb")
+        self._fh.write(MAGIC + struct.pack("<I", len(header)) + header)
+        self.bytes_written = self._fh.tell()
+
+    def start(self) -> "CaptureRecorder":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="CaptureRecorder", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def submit(self, stamped: StampedPacket) -> None:
+        with self._lock:
+            encode_packet(self._buf[self._n], stamped)
+            self._n += 1
+            self.records += 1
+            if self._n == self.chunk_records:
+                self._hand_off()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._n:
+                self._hand_off()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        else:
+            self._drain()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self.logger.info(
+            f"Capture {self.path}: {self.records} packets, "
+            f"{self.chunks} chunks, {self.bytes_written} bytes"
+        )
+
+    # --- Internals ---------------------------------------------------------
+    def _hand_off(self) -> None:
+        # the writer owns the full buffer; start filling a fresh one
+        self._queue.put(self._buf[: self._n])
+        self._buf = np.zeros(self.chunk_records, dtype=RECORD_DTYPE)
+        self._n = 0
+
+    def _write(self, records: np.ndarray) -> None:
+        data = pack_chunk(records, self.compress)
+        self._fh.write(data)
+        self._fh.flush()
+        self.chunks += 1
+        self.bytes_written += len(data)
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                records = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if records is not None:
+                self._write(records)
+
+    def _run(self) -> None:
+        while True:
+            records = self._queue.get()
+            if records is None:
+                return
+            try:
+                self._write(records)
+            except Exception as e:
+                self.logger.info(f"Capture write failed: {e}")
+
+
+class CaptureReader:
+    """Memory-mapped reader for capture files.
+
+    ``len(reader)`` is the number of records, :meth:`columns` returns the
+    whole capture as one array per field and :meth:`records` as a single
+    structured array. A truncated last chunk is ignored.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[: len(MAGIC)] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a telemetry capture")
+        (hlen,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(bytes(self._mm[start : start + hlen]))
+        self._chunks: List[tuple] = []  # (payload offset, records, flags, length)
+        off = start + hlen
+        while off + _CHUNK.size <= len(self._mm):
+            tag, n, flags, length, crc = _CHUNK.unpack_from(self._mm, off)
+            end = off + _CHUNK.size + length
+            if tag != CHUNK_TAG or end > len(self._mm):
+                break
+            if zlib.crc32(self._mm[off + _CHUNK.size : end]) != crc:
+                break
+            self._chunks.append((off + _CHUNK.size, n, flags, length))
+            off = end
+        self._len = sum(c[1] for c in self._chunks)
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return self._len
+
+    def iter_chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        for off, n, flags, length in self._chunks:
+            yield unpack_chunk(memoryview(self._mm)[off : off + length], n, flags)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        if self._columns is None:
+            chunks = list(self.iter_chunks())
+            if len(chunks) == 1:
+                self._columns = chunks[0]
+            else:
+                self._columns = {
+                    name: (
+                        np.concatenate([c[name] for c in chunks])
+                        if chunks
+                        else np.zeros(
+                            (0, *RECORD_DTYPE[name].shape), RECORD_DTYPE[name].base
+                        )
+                    )
+                    for name in RECORD_DTYPE.names
+                }
+        return self._columns
+
+    def records(self) -> np.ndarray:
+        out = np.zeros(self._len, dtype=RECORD_DTYPE)
+        for name, col in self.columns().items():
+            out[name] = col
+        return out
+
+    def close(self) -> None:
+        self._columns = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # column views still alive; the map closes with them
@@ -1,34 +1,65 @@
-import json
 import os
 import time
-from collections import deque
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
+from .ecu_store import ECUStore, ModelRecord
+from .logger import Logger
+from .model_cache import DEFAULT_MAX_MODELS, ModelCache
+from .shift_solver import solve_shift_points
+from .telemetry_frame import TelemetryFrame
+
 # ECU learns a per-car torque curve (relative scale) from WOT acceleration
 # and computes optimal shift RPMs. It also buffers recent samples per gear
 # for plotting, and exposes debug counters so you can see why learning may
 # be gated.
 
 
-@dataclass
+@dataclass(eq=False)
 class DynoCurve:
+    """Binned torque curve backed by NumPy arrays.
+
+    ``torque_bins`` (float32) and ``counts`` are arrays; plain lists (e.g. from
+    the JSON model files) are converted on construction. The 3-tap smoothed
+    curve is cached and only recomputed after :meth:`add_sample` bumps
+    ``version``. Arrays returned by :meth:`smoothed` are read-only.
+    Bins touched since the last :meth:`take_dirty` are tracked so the store
+    only writes what changed.
+    """
+
     rpm_min: float = 800.0
     rpm_max: float = 12000.0
     bin_size: float = 100.0
-    torque_bins: List[float] = field(default_factory=list)
-    counts: List[int] = field(default_factory=list)
+    torque_bins: np.ndarray = field(default_factory=lambda: np.zeros(0, np.float32))
+    counts: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int64))
     last_updated: float = field(default_factory=time.time)
+    version: int = 0
+    _rpm_bins: np.ndarray = field(init=False, repr=False)
+    _smoothed: Optional[np.ndarray] = field(init=False, repr=False, default=None)
+    _smoothed_version: int = field(init=False, repr=False, default=-1)
+    _dirty: Optional[np.ndarray] = field(init=False, repr=False, default=None)
 
     def __post_init__(self) -> None:
-        if not self.torque_bins:
+        tb = np.asarray(self.torque_bins, dtype=np.float32)
+        if tb.size == 0:
             n = int((self.rpm_max - self.rpm_min) / self.bin_size) + 1
-            self.torque_bins = [0.0] * n
-            self.counts = [0] * n
+            tb = np.zeros(n, dtype=np.float32)
+        counts = np.zeros(tb.size, dtype=np.int64)
+        c = np.asarray(self.counts, dtype=np.int64)[: tb.size]
+        counts[: c.size] = c
+        self.torque_bins = tb
+        self.counts = counts
+        self._rpm_bins = (
+            self.rpm_min + np.arange(tb.size, dtype=np.float32) * self.bin_size
+        )
+        self._rpm_bins.flags.writeable = False
+        self._dirty = np.zeros(tb.size, dtype=bool)
 
     @property
-    def rpm_bins(self) -> List[float]:
-        return [self.rpm_min + i * self.bin_size for i in range(len(self.torque_bins))]
+    def rpm_bins(self) -> np.ndarray:
+        return self._rpm_bins
 
     def idx(self, rpm: float) -> Optional[int]:
         if rpm < self.rpm_min or rpm > self.rpm_max:
@@ -43,57 +74,98 @@ class DynoCurve:
         if i is None:
             return
         if self.counts[i] > 12:
-            mean = self.torque_bins[i]
+            mean = float(self.torque_bins[i])
             if torque_proxy > 3.5 * max(mean, 1e-6):
                 return
-        old = self.torque_bins[i]
+        old = float(self.torque_bins[i])
         new = old * (1.0 - alpha) + alpha * max(0.0, torque_proxy)
         self.torque_bins[i] = new
         self.counts[i] += 1
+        self._dirty[i] = True
         self.last_updated = time.time()
-
-    def smoothed(self) -> Tuple[List[float], List[float]]:
-        y = self.torque_bins[:]
-        n = len(y)
-        if n < 3:
-            return self.rpm_bins, y
-        sm = [0.0] * n
-        for i in range(n):
-            acc = y[i]
-            k = 1
-            if i > 0:
-                acc += y[i - 1]
-                k += 1
-            if i + 1 < n:
-                acc += y[i + 1]
-                k += 1
-            sm[i] = acc / k
-        return self.rpm_bins, sm
+        self.version += 1
+
+    def take_dirty(self) -> np.ndarray:
+        """Indices of bins changed since the last call; clears the mask."""
+        idx = np.flatnonzero(self._dirty)
+        self._dirty[idx] = False
+        return idx
+
+    def smoothed(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._smoothed_version != self.version or self._smoothed is None:
+            y = self.torque_bins
+            if y.size < 3:
+                sm = y.copy()
+            else:
+                acc = y.copy()
+                acc[1:] += y[:-1]
+                acc[:-1] += y[1:]
+                k = np.full(y.size, 3.0, dtype=np.float32)
+                k[0] = k[-1] = 2.0
+                sm = acc / k
+            sm.flags.writeable = False
+            self._smoothed = sm
+            self._smoothed_version = self.version
+        return self._rpm_bins, self._smoothed
 
     def coverage(self) -> float:
-        have = sum(1 for c in self.counts if c >= 3)
+        have = int(np.count_nonzero(self.counts >= 3))
         return have / max(1, len(self.counts))
 
-    def torque_at(self, rpm: float) -> float:
+    def torque_at(self, rpm):
+        """Interpolated smoothed torque; *rpm* may be a scalar or an array.
+
+        Values outside the binned range clamp to the first/last bin.
+        """
         xs, ys = self.smoothed()
-        if not xs:
-            return 0.0
-        if rpm <= xs[0]:
-            return ys[0]
-        if rpm >= xs[-1]:
-            return ys[-1]
-        lo, hi = 0, len(xs) - 1
-        while lo + 1 < hi:
-            mid = (lo + hi) // 2
-            if xs[mid] <= rpm:
-                lo = mid
-            else:
-                hi = mid
-        x0, x1 = xs[lo], xs[hi]
-        y0 = ys[lo]
-        y1 = ys[hi]
-        t = (rpm - x0) / max(1e-6, (x1 - x0))
-        return y0 * (1 - t) + y1 * t
+        if xs.size == 0:
+            return 0.0 if np.ndim(rpm) == 0 else np.zeros(np.shape(rpm))
+        out = np.interp(rpm, xs, ys)
+        return float(out) if np.ndim(rpm) == 0 else out
+
+
+RECENT_SAMPLES = 500  # per gear, for the live scatter plot
+
+
+class RecentSamples:
+    """Ring of the latest ``(rpm, proxy, time)`` samples of one gear.
+
+    ``count`` is the total number ever appended and doubles as the sequence
+    number of the next sample, so a reader on another thread can fetch just
+    the samples it has not seen with :meth:`since`. The writer only ever
+    overwrites the oldest slot; readers stay clear of it via ``READ_SLACK``.
+    """
+
+    READ_SLACK = 32
+
+    __slots__ = ("data", "count", "peak")
+
+    def __init__(self, size: int = RECENT_SAMPLES) -> None:
+        self.data = np.zeros((max(1, int(size)), 3), dtype=np.float64)
+        self.count = 0
+        self.peak = 0.0  # largest proxy ever appended (plot scale)
+
+    def __len__(self) -> int:
+        return min(self.count, self.data.shape[0])
+
+    def append(self, rpm: float, proxy: float, t: float) -> None:
+        self.data[self.count % self.data.shape[0]] = (rpm, proxy, t)
+        self.count += 1
+        if proxy > self.peak:
+            self.peak = proxy
+
+    def since(self, seq: int, upto: Optional[int] = None) -> np.ndarray:
+        """Samples with sequence numbers in ``[seq, upto)``, oldest first.
+
+        Older samples that have already been overwritten are skipped.
+        """
+        size = self.data.shape[0]
+        upto = self.count if upto is None else min(int(upto), self.count)
+        lo = max(int(seq), upto - size + self.READ_SLACK, 0)
+        if lo >= upto:
+            return self.data[:0]
+        idx = np.arange(lo, upto) % size
+        return self.data[idx]
 
 
 @dataclass
@@ -105,20 +177,33 @@ class CarModel:
     idle_rpm: float = 800.0
     shift_up_rpm: Dict[int, float] = field(default_factory=dict)
     shift_down_rpm: Dict[int, float] = field(default_factory=dict)
-    recent_by_gear: Dict[int, deque] = field(default_factory=dict)
+    recent_by_gear: Dict[int, RecentSamples] = field(default_factory=dict)
+    loading: bool = False  # placeholder served while the stored model loads
 
 
 class ECU:
-    def __init__(self, storage_dir: str | None = None) -> None:
+    def __init__(
+        self, storage_dir: str | None = None, max_models: int = DEFAULT_MAX_MODELS
+    ) -> None:
         self.storage_dir = os.path.expanduser(storage_dir or "~/.gt7_ecu")
         os.makedirs(self.storage_dir, exist_ok=True)
-        self.models: Dict[int, CarModel] = {}
+        self.logger = Logger(__class__.__name__).get()
+        self.store = ECUStore(self.storage_dir)
+        # recently used models, loaded in the background on car change
+        self._cache = ModelCache(
+            load=self._load_model,
+            placeholder=lambda car_id: CarModel(car_id=car_id, loading=True),
+            on_evict=self._save_model,
+            max_models=max_models,
+        )
+        self.models: Dict[int, CarModel] = self._cache.models
         self._prev_speed: Optional[float] = None
         self._accel_lp: float = 0.0
         self._last_car_id: Optional[int] = None
         self._last_save: float = 0.0
         self._dbg = {
             "ok": 0,
+            "loading": 0,
             "bad_gear": 0,
             "rpm_gate": 0,
             "throttle": 0,
@@ -130,30 +215,25 @@ class ECU:
         self._last_throttle_raw: float = 0.0
         self._last_throttle: float = 0.0  # normalized 0..1
         self._last_speed: float = 0.0  # m/s
-        self._thr_seen_max: float = 1.0  # for dynamic scaling fallback
 
     # --- Public ------------------------------------------------------------
-    def update(self, pkt, dt: Optional[float]) -> None:
-        car_id = int(getattr(pkt, "car_id", 0) or 0)
-        model = self._get_or_load_model(car_id)
+    def update(self, frame: TelemetryFrame, dt: Optional[float]) -> None:
+        model = self._get_or_load_model(frame.car_id)
 
         # Redline hint only from rpm_alert.max
-        rpm_alert = getattr(pkt, "rpm_alert", None)
-        if rpm_alert is not None:
-            mx = getattr(rpm_alert, "max", None)
-            if isinstance(mx, (int, float)) and mx > 2000:
-                model.redline_rpm = float(mx)
+        if frame.redline_rpm is not None:
+            model.redline_rpm = frame.redline_rpm
         # keep idle sane
         model.idle_rpm = max(600.0, min(model.idle_rpm, 1400.0))
 
         # Gear ratios
-        gr = list(getattr(pkt, "gear_ratios", []) or [])
+        gr = list(frame.gear_ratios)
         if gr and (not model.gear_ratios or len(model.gear_ratios) != len(gr)):
             model.gear_ratios = gr
 
-        # Speed estimate (prefer wheel RPS, else car_speed with km/h fix)
-        wheel_radius = self._avg_wheel_radius(pkt) or 0.31
-        v = self._estimate_speed(pkt, wheel_radius)
+        # Speed (car_speed, m/s) and wheel radius come precomputed
+        wheel_radius = frame.wheel_radius or 0.31
+        v = frame.speed_ms
         self._last_speed = v
 
         a_raw = 0.0
@@ -164,22 +244,22 @@ class ECU:
         alpha = (dt / (tau + dt)) if dt else 0.15
         self._accel_lp = (1 - alpha) * self._accel_lp + alpha * a_raw
 
-        rpm = float(getattr(pkt, "engine_rpm", 0.0) or 0.0)
-        gear = int(getattr(pkt, "current_gear", 0) or 0)
-        thr_raw = float(getattr(pkt, "throttle", 0.0) or 0.0)
-        throttle = self._normalize_throttle(thr_raw)
-        brake = float(getattr(pkt, "brake", 0.0) or 0.0)
-        clutch = float(getattr(pkt, "clutch", 0.0) or 0.0)  # 0 = engaged, 1 = pressed
+        rpm = frame.rpm
+        gear = frame.gear
+        throttle = frame.throttle
+        brake = frame.brake
+        clutch = frame.clutch  # 0 = engaged, 1 = pressed
 
-        self._last_throttle_raw = thr_raw
+        self._last_throttle_raw = frame.throttle_raw
         self._last_throttle = throttle
 
-        # GT7 gear numbers are 1..N; map to ratios idx 0..N-1
+        # GT7 gear numbers are 1..N; map to ratios idx 0..N-1. A valid gear
+        # indexes the frame's ratios, which model.gear_ratios mirrors above
         ratio_idx = gear - 1
-        valid_gear = (
-            (gear >= 1) and (ratio_idx >= 0) and (ratio_idx < len(model.gear_ratios))
-        )
-        if not valid_gear:
+        if model.loading:
+            self._dbg["loading"] += 1
+            return
+        if not frame.gear_valid:
             self._dbg["bad_gear"] += 1
             return
 
@@ -222,12 +302,11 @@ class ECU:
             self._last_save = now
 
     def get_shift_targets(
-        self, pkt
+        self, frame: TelemetryFrame
     ) -> Tuple[Optional[float], Optional[float], Dict[str, float]]:
-        car_id = int(getattr(pkt, "car_id", 0) or 0)
-        model = self._get_or_load_model(car_id)
-        gear = int(getattr(pkt, "current_gear", 0) or 0)
-        rpm = float(getattr(pkt, "engine_rpm", 0.0) or 0.0)
+        model = self._get_or_load_model(frame.car_id)
+        gear = frame.gear
+        rpm = frame.rpm
         up = model.shift_up_rpm.get(gear)
         dn = model.shift_down_rpm.get(gear)
         info = {
@@ -239,7 +318,7 @@ class ECU:
             "thr": self._last_throttle,
             "speed": self._last_speed,
             "dbg": (
-                f"ok:{self._dbg['ok']} badg:{self._dbg['bad_gear']} rpm:{self._dbg['rpm_gate']} "
+                f"ok:{self._dbg['ok']} ld:{self._dbg['loading']} badg:{self._dbg['bad_gear']} rpm:{self._dbg['rpm_gate']} "
                 f"Th:{self._dbg['throttle']} Br:{self._dbg['brake']} Cl:{self._dbg['clutch']} "
                 f"a:{self._dbg['accel']} v:{self._dbg['speed']}"
             ),
@@ -251,234 +330,111 @@ class ECU:
             return max(0.0, min(1.2, rpm / target_up_rpm))
         return 0.0
 
-    def get_plot_data(
-        self, pkt, gear: int
-    ) -> Tuple[
-        List[Tuple[float, float, float]],
-        Tuple[float, float, float],
-        List[Tuple[float, float]],
-    ]:
-        car_id = int(getattr(pkt, "car_id", 0) or 0)
-        model = self._get_or_load_model(car_id)
-        dq = model.recent_by_gear.get(int(gear))
-        now = time.time()
-        pts: List[Tuple[float, float, float]] = []
-        if dq is not None:
-            pts = [(r, p, max(0.0, now - ts)) for (r, p, ts) in list(dq)]
-        xs, ys = model.curve.smoothed()
-        y_max = 0.0
-        if ys:
-            y_max = max(y_max, max(ys))
-        if pts:
-            y_max = max(y_max, max(p for _, p, _ in pts))
+    def plot_source(
+        self, frame: TelemetryFrame, gear: int
+    ) -> Tuple[Optional[RecentSamples], Tuple[float, float, float], int]:
+        """Recent samples of *gear*, plot bounds and the curve version.
+
+        The sample ring is returned by reference (see :class:`RecentSamples`)
+        so publishing it costs nothing; fetch the smoothed curve with
+        :meth:`DynoCurve.smoothed` only when the version changed.
+        """
+        model = self._get_or_load_model(frame.car_id)
+        samples = model.recent_by_gear.get(int(gear))
+        _, ys = model.curve.smoothed()
+        y_max = float(ys.max()) if ys.size else 0.0
+        if samples is not None:
+            y_max = max(y_max, samples.peak)
         if y_max <= 1e-6:
             y_max = 1.0
-        curve = list(zip(xs, ys)) if xs and ys else []
-        return pts, (model.curve.rpm_min, model.curve.rpm_max, y_max), curve
+        bounds = (model.curve.rpm_min, model.curve.rpm_max, y_max)
+        return samples, bounds, model.curve.version
 
     def save_if_needed(self) -> None:
+        # only changed bins (and changed gearing) are written
         for cm in self.models.values():
-            # save every 15 seconds
-            if time.time() - cm.curve.last_updated < 15.0:
+            if not cm.loading:
                 self._save_model(cm)
 
-    # --- Internals ---------------------------------------------------------
-    def _normalize_throttle(self, t: float) -> float:
-        # Normalize throttle from common telemetry ranges to [0,1].
-        if t <= 1.2:
-            return max(0.0, min(1.0, t))
-        # 0..100 scale
-        if 0.0 <= t <= 110.0:
-            return max(0.0, min(1.0, t / 100.0))
-        # 0..255 scale
-        if 0.0 <= t <= 260.0:
-            return max(0.0, min(1.0, t / 255.0))
-        # Fallback: dynamic max tracking
-        self._thr_seen_max = max(self._thr_seen_max, t)
-        return max(0.0, min(1.0, t / max(1.0, self._thr_seen_max)))
+    def close(self) -> None:
+        """Save pending changes and wait for the store to write them."""
+        self._cache.close()
+        self.save_if_needed()
+        self.store.close()
 
+    # --- Internals ---------------------------------------------------------
     def _get_or_load_model(self, car_id: int) -> CarModel:
-        if car_id not in self.models:
-            cm = self._load_model(car_id)
-            self.models[car_id] = cm
+        if car_id != self._last_car_id:
             self._last_car_id = car_id
-        return self.models[car_id]
-
-    def _avg_wheel_radius(self, pkt) -> Optional[float]:
-        wheels = getattr(pkt, "wheels", None)
-        if not wheels:
-            return None
-        radii = []
-        try:
-            for w in wheels:
-                r = float(getattr(w, "radius", 0.0) or 0.0)
-                if r > 0:
-                    radii.append(r)
-        except TypeError:
-            for name in ("front_left", "front_right", "rear_left", "rear_right"):
-                w = getattr(wheels, name, None)
-                if w is not None:
-                    r = float(getattr(w, "radius", 0.0) or 0.0)
-                    if r > 0:
-                        radii.append(r)
-        if not radii:
-            return None
-        return sum(radii) / len(radii)
-
-    def _estimate_speed(self, pkt, wheel_radius: float) -> float:
-        # """Return vehicle speed in m/s.
-        # Prefer wheel RPS; if it's tiny, fall back to wheel ground_speed; then car_speed.
-        # Convert car_speed from km/h when needed.
-        # """
-        # wheels = getattr(pkt, "wheels", None)
-        # # 1) Prefer RPS if sensible
-        # rps_vals = []
-        # try:
-        #     rps_vals = [float(getattr(w, "rps", 0.0) or 0.0) for w in (wheels or [])]
-        # except TypeError:
-        #     for name in ("front_left", "front_right", "rear_left", "rear_right"):
-        #         w = getattr(wheels, name, None)
-        #         if w is not None:
-        #             rps_vals.append(float(getattr(w, "rps", 0.0) or 0.0))
-        # if rps_vals:
-        #     avg_rps = sum(rps_vals) / len(rps_vals)
-        #     if avg_rps > 0.2:  # ~ >1.25 m/s with 0.31 m radius
-        #         return 2.0 * math.pi * avg_rps * wheel_radius
-
-        # # 2) Try wheel ground_speed (already m/s in schema)
-        # gs = []
-        # try:
-        #     gs = [float(getattr(w, "ground_speed", 0.0) or 0.0) for w in (wheels or [])]
-        # except TypeError:
-        #     for name in ("front_left", "front_right", "rear_left", "rear_right"):
-        #         w = getattr(wheels, name, None)
-        #         if w is not None:
-        #             gs.append(float(getattr(w, "ground_speed", 0.0) or 0.0))
-        # if gs:
-        #     avg_gs = sum(gs) / len(gs)
-        #     if abs(avg_gs) > 0.5:
-        #         return avg_gs
-
-        # 3) Fallback: car_speed in m/s
-        v = float(getattr(pkt, "car_speed", 0.0))
-        return v
+            self.logger.debug(f"Car changed to {car_id}: {self._cache.stats()}")
+        return self._cache.get(car_id)
 
     def _push_recent(
         self, model: CarModel, gear: int, rpm: float, proxy: float
     ) -> None:
-        dq = model.recent_by_gear.get(gear)
-        if dq is None:
-            dq = deque(maxlen=500)
-            model.recent_by_gear[gear] = dq
-        dq.append((float(rpm), float(proxy), time.time()))
+        samples = model.recent_by_gear.get(gear)
+        if samples is None:
+            samples = RecentSamples()
+            model.recent_by_gear[gear] = samples
+        samples.append(float(rpm), float(proxy), time.time())
 
     def _recompute_targets(self, model: CarModel) -> None:
         gr = model.gear_ratios
         if not gr:
             return
         xs, ys = model.curve.smoothed()
-        if sum(1 for c in model.curve.counts if c >= 3) < 8:
+        if np.count_nonzero(model.curve.counts >= 3) < 8:
             return
-        for g in range(1, len(gr)):
-            Gg = gr[g - 1]
-            Gn = gr[g] if g < len(gr) else None
-            if Gn is None or Gg <= 0 or Gn <= 0:
-                continue
-            best_rpm = None
-            for rpm in xs:
-                if rpm < 1200.0:
-                    continue
-                if rpm > model.redline_rpm:
-                    break
-                t_curr = model.curve.torque_at(rpm) * Gg
-                rpm_next = rpm * (Gn / Gg)
-                t_next = model.curve.torque_at(rpm_next) * Gn
-                if t_next >= t_curr:
-                    best_rpm = rpm
-                    break
-            if best_rpm is None:
-                best_rpm = min(model.redline_rpm, xs[-1] if xs else model.redline_rpm)
-            model.shift_up_rpm[g] = best_rpm
-        # Downshift hints for gears 2..N-1
-        for g in range(2, len(gr)):
-            Gg = gr[g - 1]
-            Gd = gr[g - 2]
-            if Gg <= 0 or Gd <= 0:
-                continue
-            best_rpm = None
-            for rpm in xs:
-                if rpm < 1000.0:
-                    continue
-                t_curr = model.curve.torque_at(rpm) * Gg
-                rpm_low = rpm * (Gd / Gg)
-                t_low = model.curve.torque_at(rpm_low) * Gd
-                if t_curr >= t_low:
-                    best_rpm = rpm
-                    break
-            if best_rpm is None:
-                best_rpm = 1400.0
-            model.shift_down_rpm[g] = best_rpm
+        table = solve_shift_points(xs, ys, gr, model.redline_rpm)
+        model.shift_up_rpm.update(table.up)
+        model.shift_down_rpm.update(table.down)
 
     # --- Persistence -------------------------------------------------------
-    def _model_path(self, car_id: int) -> str:
-        return os.path.join(self.storage_dir, f"dyno_{car_id}.json")
-
     def _load_model(self, car_id: int) -> CarModel:
-        path = self._model_path(car_id)
-        if os.path.isfile(path):
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                curve = DynoCurve(
-                    rpm_min=data.get("rpm_min", 800.0),
-                    rpm_max=data.get("rpm_max", 12000.0),
-                    bin_size=data.get("bin_size", 100.0),
-                    torque_bins=data.get("torque_bins", []),
-                    counts=data.get("counts", []),
-                )
-                cm = CarModel(
-                    car_id=car_id,
-                    curve=curve,
-                    gear_ratios=data.get("gear_ratios", []),
-                    redline_rpm=data.get("redline_rpm", 7500.0),
-                    idle_rpm=data.get("idle_rpm", 800.0),
-                    shift_up_rpm={
-                        int(k): float(v)
-                        for k, v in data.get("shift_up_rpm", {}).items()
-                    },
-                    shift_down_rpm={
-                        int(k): float(v)
-                        for k, v in data.get("shift_down_rpm", {}).items()
-                    },
-                )
-                return cm
-            except Exception:
-                pass
-        return CarModel(car_id=car_id)
+        try:
+            rec = self.store.load(car_id)
+        except Exception as e:
+            self.logger.info(f"Could not load ECU model for car {car_id}: {e}")
+            rec = None
+        if rec is None:
+            return CarModel(car_id=car_id)
+        curve = DynoCurve(
+            rpm_min=rec.rpm_min,
+            rpm_max=rec.rpm_max,
+            bin_size=rec.bin_size,
+            torque_bins=rec.torque_bins,
+            counts=rec.counts,
+        )
+        return CarModel(
+            car_id=car_id,
+            curve=curve,
+            gear_ratios=rec.gear_ratios,
+            redline_rpm=rec.redline_rpm,
+            idle_rpm=rec.idle_rpm,
+            shift_up_rpm=rec.shift_up_rpm,
+            shift_down_rpm=rec.shift_down_rpm,
+        )
 
     def _save_model(self, cm: CarModel) -> None:
+        rec = ModelRecord(
+            car_id=cm.car_id,
+            rpm_min=cm.curve.rpm_min,
+            rpm_max=cm.curve.rpm_max,
+            bin_size=cm.curve.bin_size,
+            torque_bins=cm.curve.torque_bins,
+            counts=cm.curve.counts,
+            gear_ratios=cm.gear_ratios,
+            redline_rpm=cm.redline_rpm,
+            idle_rpm=cm.idle_rpm,
+            shift_up_rpm=cm.shift_up_rpm,
+            shift_down_rpm=cm.shift_down_rpm,
+        )
+        changed = cm.curve.take_dirty()
         try:
-            path = self._model_path(cm.car_id)
-            tmp = path + ".tmp"
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(
-                    {
-                        "rpm_min": cm.curve.rpm_min,
-                        "rpm_max": cm.curve.rpm_max,
-                        "bin_size": cm.curve.bin_size,
-                        "torque_bins": cm.curve.torque_bins,
-                        "counts": cm.curve.counts,
-                        "gear_ratios": cm.gear_ratios,
-                        "redline_rpm": cm.redline_rpm,
-                        "idle_rpm": cm.idle_rpm,
-                        "shift_up_rpm": cm.shift_up_rpm,
-                        "shift_down_rpm": cm.shift_down_rpm,
-                        "saved_at": time.time(),
-                    },
-                    f,
-                    indent=2,
+            if self.store.append(rec, changed):
+                self.logger.debug(
+                    f"ECU model for car {cm.car_id} saved ({changed.size} bins)"
                 )
-            os.replace(tmp, path)
-            print("ECU model updated...")
-        except Exception:
-            pass
+        except Exception as e:
+            cm.curve._dirty[changed] = True  # retry on the next save
+            self.logger.info(f"ECU model save failed: {e}")
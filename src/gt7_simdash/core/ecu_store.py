@@ -0,0 +1,441 @@
+import glob
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .logger import Logger
+
+# Append-only binary store for the ECU's learned car models.
+#
+# All cars share one log file (``models.bin``). Each record carries a fixed
+# header (tag, car_id, payload length, CRC32) followed by its payload:
+#
+#   META  rpm_min, rpm_max, bin_size (f64), redline, idle (f32), n_bins (u32),
+#         n_gears (u16), then gear ratios / upshift / downshift rpm as three
+#         float32[n_gears] blocks (NaN = not set).
+#   BINS  n (u32), then torque float32[n], counts uint32[n], bin index
+#         uint16[n]. Only the bins that changed since the last save are
+#         written; a full snapshot is simply all of them.
+#
+# A model is the latest META plus every BINS record for that car, applied in
+# order. Opening the store only walks the record headers to build a car_id
+# index; payloads are read lazily from an mmap when a car is first loaded.
+# Writes are handed to a background thread. A torn record at the end of the
+# file (e.g. after a crash) is detected by its CRC and cut off.
+
+FILE_NAME = "models.bin"
+FILE_MAGIC = b"GT7ECU01"
+TAG_META = b"META"
+TAG_BINS = b"BINS"
+
+# rewrite the log once it is this many times larger than the live data
+COMPACT_RATIO = 4.0
+COMPACT_MIN_BYTES = 256 * 1024
+
+_REC = struct.Struct("<4sIII")  # tag, car_id, payload length, crc32
+_META = struct.Struct("<dddffIH")
+
+
+@dataclass
+class ModelRecord:
+    """Plain stored form of one car model, independent of the ECU classes."""
+
+    car_id: int
+    rpm_min: float = 800.0
+    rpm_max: float = 12000.0
+    bin_size: float = 100.0
+    torque_bins: np.ndarray = field(default_factory=lambda: np.zeros(0, np.float32))
+    counts: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int64))
+    gear_ratios: List[float] = field(default_factory=list)
+    redline_rpm: float = 7500.0
+    idle_rpm: float = 800.0
+    shift_up_rpm: Dict[int, float] = field(default_factory=dict)
+    shift_down_rpm: Dict[int, float] = field(default_factory=dict)
+
+
+def pack_meta(rec: ModelRecord) -> bytes:
+    keys = list(rec.shift_up_rpm) + list(rec.shift_down_rpm)
+    n = max([len(rec.gear_ratios), *keys], default=0)
+    blocks = np.full((3, n), np.nan, dtype="<f4")
+    blocks[0, : len(rec.gear_ratios)] = rec.gear_ratios
+    for row, table in ((1, rec.shift_up_rpm), (2, rec.shift_down_rpm)):
+        for g, rpm in table.items():
+            if g >= 1:
+                blocks[row, g - 1] = rpm
+    head = _META.pack(
+        float(rec.rpm_min),
+        float(rec.rpm_max),
+        float(rec.bin_size),
+        float(rec.redline_rpm),
+        float(rec.idle_rpm),
+        int(np.size(rec.torque_bins)),
+        n,
+    )
+    return head + blocks.tobytes()
+
+
+def pack_bins(idx: np.ndarray, torque: np.ndarray, counts: np.ndarray) -> bytes:
+    idx = np.asarray(idx)
+    return (
+        struct.pack("<I", idx.size)
+        + np.asarray(torque[idx], dtype="<f4").tobytes()
+        + np.asarray(counts[idx], dtype="<u4").tobytes()
+        + idx.astype("<u2").tobytes()
+    )
+
+
+def _apply_meta(rec: ModelRecord, buf, off: int) -> int:
+    rpm_min, rpm_max, bin_size, redline, idle, n_bins, n = _META.unpack_from(buf, off)
+    blocks = np.frombuffer(buf, "<f4", 3 * n, off + _META.size).reshape(3, n)
+    rec.rpm_min, rec.rpm_max, rec.bin_size = rpm_min, rpm_max, bin_size
+    rec.redline_rpm, rec.idle_rpm = float(redline), float(idle)
+    ratios = blocks[0]
+    unset = np.isnan(ratios)
+    end = int(unset.argmax()) if unset.any() else n
+    rec.gear_ratios = ratios[:end].tolist()
+    rec.shift_up_rpm = {
+        g + 1: float(v) for g, v in enumerate(blocks[1].tolist()) if v == v
+    }
+    rec.shift_down_rpm = {
+        g + 1: float(v) for g, v in enumerate(blocks[2].tolist()) if v == v
+    }
+    return n_bins
+
+
+def _apply_bins(rec: ModelRecord, buf, off: int) -> None:
+    (n,) = struct.unpack_from("<I", buf, off)
+    off += 4
+    torque = np.frombuffer(buf, "<f4", n, off)
+    counts = np.frombuffer(buf, "<u4", n, off + 4 * n)
+    idx = np.frombuffer(buf, "<u2", n, off + 8 * n).astype(np.intp)
+    keep = idx < rec.torque_bins.size
+    rec.torque_bins[idx[keep]] = torque[keep]
+    rec.counts[idx[keep]] = counts[keep]
+
+
+class ECUStore:
+    """Append-only, memory-mapped store of :class:`ModelRecord` s.
+
+    :meth:`load` may be called from any thread. :meth:`append` only packs
+    the payloads on the caller's thread; the file write happens on the
+    store's writer thread. Call :meth:`flush` to wait for pending writes and
+    :meth:`close` on shutdown.
+    """
+
+    def __init__(self, storage_dir: str) -> None:
+        self.storage_dir = storage_dir
+        self.path = os.path.join(storage_dir, FILE_NAME)
+        self.logger = Logger(__class__.__name__).get()
+        self._lock = threading.RLock()
+        self._queue: "queue.Queue[Optional[Tuple[bytes, int, bytes]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        # records queued but not yet written; the writer notifies at zero
+        self._pending = 0
+        self._drained = threading.Condition()
+        self._fh = None
+        self._mm: Optional[mmap.mmap] = None
+        self._mm_len = 0
+        self._size = 0
+        # car_id -> (latest META offset, [BINS offsets])
+        self._index: Dict[int, Tuple[Optional[int], List[int]]] = {}
+        self._last_meta: Dict[int, bytes] = {}
+        self.bytes_written = 0
+        self._open()
+        self._migrate_json()
+        self._maybe_compact()
+
+    # --- Public ------------------------------------------------------------
+    def car_ids(self) -> List[int]:
+        with self._lock:
+            return list(self._index)
+
+    def load(self, car_id: int) -> Optional[ModelRecord]:
+        """Rebuild the stored model for *car_id*, or ``None`` if unknown."""
+        with self._lock:
+            entry = self._index.get(car_id)
+            if entry is None or entry[0] is None:
+                return None
+            meta_off, bins_offs = entry
+            buf = self._view()
+            rec = ModelRecord(car_id=car_id)
+            n_bins = _apply_meta(rec, buf, meta_off + _REC.size)
+            rec.torque_bins = np.zeros(n_bins, np.float32)
+            rec.counts = np.zeros(n_bins, np.int64)
+            for off in bins_offs:
+                _apply_bins(rec, buf, off + _REC.size)
+            self._last_meta[car_id] = bytes(
+                buf[meta_off + _REC.size : meta_off + _REC.size + self._len(meta_off)]
+            )
+            return rec
+
+    def append(
+        self, rec: ModelRecord, changed_bins: Optional[np.ndarray] = None
+    ) -> bool:
+        """Queue the changes of *rec* for writing.
+
+        A META record is written when the gearing/shift tables differ from
+        the last stored ones; a BINS record for *changed_bins* (all bins when
+        ``None``). Returns ``False`` if there was nothing to write.
+        """
+        car_id = int(rec.car_id)
+        meta = pack_meta(rec)
+        with self._lock:
+            if car_id not in self._last_meta and not np.any(rec.counts):
+                return False  # nothing learned yet, don't persist an empty model
+            meta_changed = self._last_meta.get(car_id) != meta
+            self._last_meta[car_id] = meta
+        if changed_bins is None:
+            changed_bins = np.arange(np.size(rec.torque_bins))
+        if not meta_changed and changed_bins.size == 0:
+            return False
+        self._ensure_writer()
+        if meta_changed:
+            self._enqueue((TAG_META, car_id, meta))
+        if changed_bins.size:
+            self._enqueue(
+                (TAG_BINS, car_id, pack_bins(changed_bins, rec.torque_bins, rec.counts))
+            )
+        return True
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Block until every queued record has been written.
+
+        Returns ``False`` if records were still pending after *timeout*.
+        """
+        with self._drained:
+            return self._drained.wait_for(lambda: self._pending == 0, timeout)
+
+    def compact(self) -> None:
+        """Rewrite the log with a single META + full BINS record per car.
+
+        Skipped if pending records could not be flushed: the writer would
+        append them to the file that is about to be replaced.
+        """
+        if not self.flush():
+            self.logger.warning("ECU store not compacted: pending writes timed out")
+            return
+        with self._lock:
+            records = [self.load(cid) for cid in list(self._index)]
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(FILE_MAGIC)
+                for rec in records:
+                    if rec is None:
+                        continue
+                    f.write(self._frame(TAG_META, rec.car_id, pack_meta(rec)))
+                    idx = np.flatnonzero(rec.counts)
+                    f.write(
+                        self._frame(
+                            TAG_BINS,
+                            rec.car_id,
+                            pack_bins(idx, rec.torque_bins, rec.counts),
+                        )
+                    )
+            before = self._size
+            self._close_files()
+            os.replace(tmp, self.path)
+            self._open()
+        self.logger.info(f"ECU store compacted: {before} -> {self._size} bytes")
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout=2.0)
+            self._writer = None
+        with self._lock:
+            self._close_files()
+
+    # --- File handling -----------------------------------------------------
+    @staticmethod
+    def _frame(tag: bytes, car_id: int, payload: bytes) -> bytes:
+        return _REC.pack(tag, car_id, len(payload), zlib.crc32(payload)) + payload
+
+    def _open(self) -> None:
+        os.makedirs(self.storage_dir, exist_ok=True)
+        if not os.path.isfile(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, "wb") as f:
+                f.write(FILE_MAGIC)
+        self._fh = open(self.path, "r+b")
+        if self._fh.read(len(FILE_MAGIC)) != FILE_MAGIC:
+            self._fh.close()
+            bad = self.path + f".corrupt-{int(time.time())}"
+            os.replace(self.path, bad)
+            self.logger.warning(f"ECU store has a bad header, moved to {bad}")
+            return self._open()
+        self._index = {}
+        self._last_meta = {}
+        self._size = os.path.getsize(self.path)
+        self._remap()
+        self._scan()
+
+    def _close_files(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+            self._mm_len = 0
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def _remap(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mm_len = len(self._mm)
+
+    def _view(self) -> mmap.mmap:
+        if self._fh is None:
+            self._open()
+        if self._mm_len < self._size:
+            self._remap()
+        return self._mm
+
+    def _len(self, off: int) -> int:
+        return _REC.unpack_from(self._mm, off)[2]
+
+    def _scan(self) -> None:
+        """Index every complete record; cut off a torn tail."""
+        mm = self._mm
+        off = len(FILE_MAGIC)
+        while off + _REC.size <= self._mm_len:
+            tag, car_id, length, crc = _REC.unpack_from(mm, off)
+            end = off + _REC.size + length
+            if (
+                tag not in (TAG_META, TAG_BINS)
+                or end > self._mm_len
+                or zlib.crc32(mm[off + _REC.size : end]) != crc
+            ):
+                break
+            self._index_record(tag, car_id, off)
+            off = end
+        if off != self._size:
+            self.logger.warning(
+                f"ECU store: dropping {self._size - off} bytes of torn records"
+            )
+            self._mm.close()
+            self._mm = None
+            self._fh.truncate(off)
+            self._size = off
+            self._remap()
+
+    def _index_record(self, tag: bytes, car_id: int, off: int) -> None:
+        meta_off, bins_offs = self._index.get(car_id, (None, []))
+        if tag == TAG_META:
+            meta_off = off
+        else:
+            bins_offs.append(off)
+        self._index[car_id] = (meta_off, bins_offs)
+
+    # --- Writer thread -----------------------------------------------------
+    def _ensure_writer(self) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._write_loop, name="ECUStoreWriter", daemon=True
+            )
+            self._writer.start()
+
+    def _enqueue(self, item: Tuple[bytes, int, bytes]) -> None:
+        with self._drained:
+            self._pending += 1
+        self._queue.put(item)
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self._write(*item)
+            except Exception as e:
+                self.logger.info(f"ECU store write failed: {e}")
+            finally:
+                with self._drained:
+                    self._pending -= 1
+                    if self._pending == 0:
+                        self._drained.notify_all()
+
+    def _write(self, tag: bytes, car_id: int, payload: bytes) -> None:
+        data = self._frame(tag, car_id, payload)
+        with self._lock:
+            if self._fh is None:
+                self._open()
+            off = self._size
+            self._fh.seek(off)
+            self._fh.write(data)
+            self._fh.flush()
+            self._size += len(data)
+            self.bytes_written += len(data)
+            self._index_record(tag, car_id, off)
+
+    # --- Maintenance -------------------------------------------------------
+    def _live_bytes(self) -> int:
+        buf = self._view()
+        total = len(FILE_MAGIC)
+        for meta_off, bins_offs in self._index.values():
+            if meta_off is None:
+                continue
+            n_bins = _META.unpack_from(buf, meta_off + _REC.size)[5]
+            total += 2 * _REC.size + self._len(meta_off) + 4 + 10 * n_bins
+        return total
+
+    def _maybe_compact(self) -> None:
+        with self._lock:
+            live = self._live_bytes()
+            if self._size < COMPACT_MIN_BYTES or self._size < COMPACT_RATIO * live:
+                return
+        self.compact()
+
+    def _migrate_json(self) -> None:
+        """Import legacy ``dyno_<car_id>.json`` files not yet in the store."""
+        for path in sorted(glob.glob(os.path.join(self.storage_dir, "dyno_*.json"))):
+            try:
+                car_id = int(os.path.basename(path)[5:-5])
+            except ValueError:
+                continue
+            try:
+                if car_id not in self._index:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    rec = ModelRecord(
+                        car_id=car_id,
+                        rpm_min=data.get("rpm_min", 800.0),
+                        rpm_max=data.get("rpm_max", 12000.0),
+                        bin_size=data.get("bin_size", 100.0),
+                        torque_bins=np.asarray(data.get("torque_bins", []), np.float32),
+                        counts=np.asarray(data.get("counts", []), np.int64),
+                        gear_ratios=list(data.get("gear_ratios", [])),
+                        redline_rpm=data.get("redline_rpm", 7500.0),
+                        idle_rpm=data.get("idle_rpm", 800.0),
+                        shift_up_rpm={
+                            int(k): float(v)
+                            for k, v in data.get("shift_up_rpm", {}).items()
+                        },
+                        shift_down_rpm={
+                            int(k): float(v)
+                            for k, v in data.get("shift_down_rpm", {}).items()
+                        },
+                    )
+                    self._write(TAG_META, car_id, pack_meta(rec))
+                    self._write(
+                        TAG_BINS,
+                        car_id,
+                        pack_bins(
+                            np.arange(rec.torque_bins.size),
+                            rec.torque_bins,
+                            rec.counts,
+                        ),
+                    )
+                    self.logger.info(f"Imported ECU model for car {car_id}")
+                os.replace(path, path + ".migrated")
+            except Exception as e:
+                self.logger.info(f"Could not import {path}: {e}")
@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+
+from .ecu import ECU, RecentSamples
+from .ingest import StampedPacket
+from .logger import Logger
+
+# Runs the ECU off the render thread. The worker consumes the full packet
+# stream from a bounded queue, and after each batch publishes an immutable
+# ECUSnapshot which the widget reads with a single attribute load.
+# Plot samples are published by reference plus a sequence number, and the
+# curve tuple is only rebuilt when the learned curve changes.
+
+DEFAULT_QUEUE_DEPTH = 256
+
+
+@dataclass(frozen=True, slots=True)
+class ECUSnapshot:
+    tick: int  # seq of the last packet folded into this snapshot
+    car_id: int
+    gear: int
+    shift_up_rpm: Mapping[int, float]
+    shift_down_rpm: Mapping[int, float]
+    info: Mapping[str, Any]
+    plot_samples: Optional[RecentSamples] = None  # live ring, read up to plot_seq
+    plot_seq: int = 0
+    plot_bounds: Tuple[float, float, float] = (800.0, 12000.0, 1.0)
+    curve: Tuple[Tuple[float, float], ...] = ()
+    curve_version: int = 0  # bumped whenever `curve` changes
+    published_at: float = field(default_factory=time.monotonic)
+
+
+EMPTY_SNAPSHOT = ECUSnapshot(
+    tick=0,
+    car_id=0,
+    gear=0,
+    shift_up_rpm=MappingProxyType({}),
+    shift_down_rpm=MappingProxyType({}),
+    info=MappingProxyType({}),
+)
+
+
+class ECUWorker:
+    """Background thread that owns an :class:`ECU`.
+
+    Feed it with :meth:`submit` (safe to call from any thread, e.g. as a
+    :class:`TelemetryIngest` subscriber) and read :attr:`snapshot` from the
+    render thread. Once started, the ECU must only be touched by the worker.
+
+    ``queue_depth`` bounds the backlog; when full, the oldest packet is dropped
+    and counted in ``overflowed``.
+    """
+
+    def __init__(
+        self, ecu: Optional[ECU] = None, queue_depth: int = DEFAULT_QUEUE_DEPTH
+    ) -> None:
+        self.ecu = ecu or ECU()
+        self.logger = Logger(__class__.__name__).get()
+        self.queue_depth = max(1, int(queue_depth))
+        self._queue: deque[StampedPacket] = deque(maxlen=self.queue_depth)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._last_recv_ns: Optional[int] = None
+        self.snapshot: ECUSnapshot = EMPTY_SNAPSHOT
+        self.submitted_seq = 0
+        self.overflowed = 0
+        self.max_lag = 0
+        # published curve, rebuilt when the model's curve object or version
+        # changes; _curve_version counts the rebuilds for the widget
+        self._curve_key: Tuple[Any, int] = (None, -1)
+        self._curve: Tuple[Tuple[float, float], ...] = ()
+        self._curve_version = 0
+
+    # --- Lifecycle ---------------------------------------------------------
+    def start(self) -> "ECUWorker":
+        if self._thread is None:
+            # a fresh event per thread: one that outlived stop() keeps its own
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, args=(self._stop,), name="ECUWorker", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the worker and close the ECU.
+
+        A running worker closes the ECU itself on its way out, so a worker
+        still busy after the join timeout never races with the close.
+        """
+        self._stop.set()
+        self._wake.set()
+        thread, self._thread = self._thread, None
+        if thread is None:
+            self._close_ecu()
+            return
+        thread.join(timeout=2.0)
+        if thread.is_alive():
+            self.logger.info("ECU worker did not stop in time; it closes the ECU")
+
+    def _close_ecu(self) -> None:
+        try:
+            self.ecu.close()
+        except Exception as e:
+            self.logger.info(f"ECU save on stop failed: {e}")
+
+    # --- Producer/consumer -------------------------------------------------
+    def submit(self, stamped: StampedPacket) -> None:
+        if len(self._queue) == self.queue_depth:
+            self.overflowed += 1
+        self._queue.append(stamped)
+        self.submitted_seq = stamped.seq
+        self._wake.set()
+
+    def lag(self) -> int:
+        """Packets submitted but not yet reflected in :attr:`snapshot`."""
+        lag = max(0, self.submitted_seq - self.snapshot.tick)
+        self.max_lag = max(self.max_lag, lag)
+        return lag
+
+    def process_pending(self) -> int:
+        """Fold every queued packet into the ECU and publish a snapshot.
+
+        Called by the worker thread; call it directly when no thread runs.
+        """
+        n = 0
+        last: Optional[StampedPacket] = None
+        while self._queue:
+            last = self._queue.popleft()
+            dt = None
+            if self._last_recv_ns is not None:
+                dt = (last.recv_ns - self._last_recv_ns) / 1e9
+            self._last_recv_ns = last.recv_ns
+            self.ecu.update(last.frame, dt)
+            n += 1
+        if last is not None:
+            self.snapshot = self._make_snapshot(last)
+        return n
+
+    def _run(self, stop: threading.Event) -> None:
+        try:
+            while not stop.is_set():
+                self._wake.wait(timeout=0.1)
+                self._wake.clear()
+                try:
+                    self.process_pending()
+                except Exception as e:
+                    self.logger.info(f"ECU update failed: {e}")
+        finally:
+            self._close_ecu()
+
+    def _make_snapshot(self, stamped: StampedPacket) -> ECUSnapshot:
+        frame = stamped.frame
+        ecu = self.ecu
+        up, dn, info = ecu.get_shift_targets(frame)
+        car_id = frame.car_id
+        gear = frame.gear
+        model = ecu.models.get(car_id)
+        samples, bounds, version = ecu.plot_source(frame, gear)
+        if model is None:
+            self._curve_key, self._curve = (None, -1), ()
+        elif (model.curve, version) != self._curve_key:
+            xs, ys = model.curve.smoothed()
+            self._curve = tuple(zip(xs.tolist(), ys.tolist()))
+            self._curve_key = (model.curve, version)
+            self._curve_version += 1
+        return ECUSnapshot(
+            tick=stamped.seq,
+            car_id=car_id,
+            gear=gear,
+            shift_up_rpm=MappingProxyType(dict(model.shift_up_rpm) if model else {}),
+            shift_down_rpm=MappingProxyType(
+                dict(model.shift_down_rpm) if model else {}
+            ),
+            info=MappingProxyType(dict(info)),
+            plot_samples=samples,
+            plot_seq=samples.count if samples is not None else 0,
+            plot_bounds=bounds,
+            curve=self._curve,
+            curve_version=self._curve_version,
+        )
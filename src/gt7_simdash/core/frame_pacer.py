@@ -0,0 +1,179 @@
+import time
+from typing import Callable, Optional
+
+import pygame
+
+from .logger import Logger
+from .perf import DEFAULT_RING_SIZE, TimingRing, summarize
+
+# Decides when the main loop renders the next frame.
+#
+#   fixed      render at `fps`, always (the old clock.tick(60))
+#   vsync      let a vsynced flip pace the loop (falls back to fixed)
+#   telemetry  render when a new packet or input arrived, at most at `fps`
+#              and at least at `idle_fps` so timers and transitions still run
+#   idle       `fps` while there is input or pending content, `idle_fps` once
+#              nothing happened for `idle_after_s` (menus on battery/Pi)
+#
+# Waiting is done with short sleeps that wake early on pending input
+# (pygame.event.peek) or when the state reports something new to show.
+
+MODE_FIXED = "fixed"
+MODE_VSYNC = "vsync"
+MODE_TELEMETRY = "telemetry"
+MODE_IDLE = "idle"
+MODES = (MODE_FIXED, MODE_VSYNC, MODE_TELEMETRY, MODE_IDLE)
+
+POLL_INTERVAL_S = 0.002  # granularity of the event/telemetry poll while waiting
+VSYNC_PROBE_FRAMES = 30  # frames after which a non-blocking "vsync" is detected
+
+
+class FramePacer:
+    """Frame scheduler for the main loop.
+
+    Call :meth:`wait` at the top of each iteration (it returns the frame
+    ``dt`` in seconds), :meth:`note_input` when events were handled, and
+    :meth:`frame_done` after presenting. ``pending`` is polled while waiting
+    and should return ``True`` when the current state has something new to
+    show (see :meth:`State.has_pending_frame`).
+
+    Frame intervals and the work time per frame (update, draw, present) are
+    kept in rings; :meth:`stats` summarises them.
+    """
+
+    def __init__(
+        self,
+        mode: str = MODE_FIXED,
+        fps: float = 60.0,
+        idle_fps: float = 10.0,
+        idle_after_s: float = 2.0,
+        history: int = DEFAULT_RING_SIZE,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown frame mode {mode!r}, expected one of {MODES}")
+        self.logger = Logger(__class__.__name__).get()
+        self.mode = mode
+        self.fps = max(1.0, float(fps))
+        self.idle_fps = max(0.5, min(float(idle_fps), self.fps))
+        self.idle_after_s = max(0.0, float(idle_after_s))
+        self.vsync_active = False
+
+        self._last_frame: Optional[float] = None
+        self._deadline: Optional[float] = None
+        self._last_input = time.perf_counter()
+        self._work_start: Optional[float] = None
+        self._intervals = TimingRing(history)
+        self._work = TimingRing(history)
+        self.frames = 0
+        self.idle_frames = 0  # frames rendered at the idle rate
+
+    @classmethod
+    def from_config(cls, conf) -> "FramePacer":
+        return cls(
+            mode=conf.frame_mode,
+            fps=conf.fps,
+            idle_fps=conf.idle_fps,
+            idle_after_s=conf.idle_after_s,
+        )
+
+    # --- Display setup -----------------------------------------------------
+    def set_mode(self, size) -> pygame.Surface:
+        """Open the display, with vsync when the mode asks for it."""
+        if self.mode == MODE_VSYNC:
+            try:
+                screen = pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+                self.vsync_active = True
+                return screen
+            except pygame.error as e:
+                self.logger.info(f"vsync unavailable ({e}), pacing at {self.fps} fps")
+        return pygame.display.set_mode(size)
+
+    # --- Loop hooks --------------------------------------------------------
+    def note_input(self) -> None:
+        self._last_input = time.perf_counter()
+
+    def wait(self, pending: Callable[[], bool] = lambda: False) -> float:
+        """Block until the next frame is due; returns the seconds since the last."""
+        if self._last_frame is not None:
+            if self.mode == MODE_VSYNC and self.vsync_active:
+                self._check_vsync()  # the flip already blocked until the vblank
+            elif self.mode in (MODE_TELEMETRY, MODE_IDLE):
+                self._wait_for_content(pending)
+            else:
+                self._wait_fixed()
+
+        now = time.perf_counter()
+        dt = 0.0 if self._last_frame is None else now - self._last_frame
+        if self._last_frame is not None:
+            self._intervals.add(int(dt * 1e9))
+        self._last_frame = now
+        self._work_start = now
+        self.frames += 1
+        return dt
+
+    def frame_done(self) -> None:
+        """Mark the end of the frame's work (after presenting)."""
+        if self._work_start is not None:
+            self._work.add(int((time.perf_counter() - self._work_start) * 1e9))
+            self._work_start = None
+
+    def stats(self) -> dict:
+        intervals = self._intervals.values()
+        mean = float(intervals.mean()) if intervals.size else 0.0
+        return {
+            "mode": self.mode,
+            "vsync": self.vsync_active,
+            "frames": self.frames,
+            "idle_frames": self.idle_frames,
+            "fps": round(1e9 / mean, 2) if mean else 0.0,
+            "interval": summarize(intervals),
+            "work": summarize(self._work.values()),
+        }
+
+    # --- Internals ---------------------------------------------------------
+    def _check_vsync(self) -> None:
+        # some drivers accept vsync=1 but never block in flip (dummy, software
+        # renderers); fall back to fixed pacing instead of spinning the CPU
+        if self.frames != VSYNC_PROBE_FRAMES:
+            return
+        median_ms = summarize(self._intervals.values()).get("p50_ms", 0.0)
+        if median_ms < 500.0 / self.fps:
+            self.vsync_active = False
+            self.logger.info(
+                f"vsync does not block ({median_ms:.2f} ms/frame), "
+                f"pacing at {self.fps} fps"
+            )
+
+    def _wait_fixed(self) -> None:
+        period = 1.0 / self.fps
+        now = time.perf_counter()
+        if self._deadline is None or now - self._deadline > period:
+            self._deadline = now + period  # first frame or fell behind: resync
+        else:
+            self._deadline += period
+        delay = self._deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _wait_for_content(self, pending: Callable[[], bool]) -> None:
+        min_period = 1.0 / self.fps
+        max_period = 1.0 / self.idle_fps
+        start = self._last_frame
+        if self.mode == MODE_IDLE and max_period > min_period:
+            busy = time.perf_counter() - self._last_input < self.idle_after_s
+            if busy or pending():
+                max_period = min_period
+        # never faster than fps
+        delay = start + min_period - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        # then render as soon as there is something to show, or at the idle rate
+        while True:
+            if pygame.event.peek() or pending():
+                return
+            remaining = start + max_period - time.perf_counter()
+            if remaining <= 0:
+                if max_period > min_period:
+                    self.idle_frames += 1
+                return
+            time.sleep(min(POLL_INTERVAL_S, remaining))
@@ -0,0 +1,181 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+from .logger import Logger
+from .telemetry_frame import TelemetryFrame
+
+# Telemetry ingest: drains the Feed on its own thread so no packet waits for
+# the next render frame. Each packet is stamped with a monotonic receive time
+# and sequence number, fanned out to subscribers (e.g. the ECU, which wants
+# every packet) and published to a single-slot mailbox the renderer reads
+# (it only ever wants the newest one). The TelemetryFrame both of them read
+# is built here, once per packet.
+
+# A packet_id this far from the last one is a new session, not reordering/loss.
+PACKET_ID_RESET_GAP = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class StampedPacket:
+    seq: int  # ingest sequence number, 1-based, gap-free
+    recv_ns: int  # time.monotonic_ns() when the packet left the feed
+    packet: Any  # granturismo Packet
+    frame: TelemetryFrame  # normalised/derived fields of `packet`
+
+
+class TelemetryIngest:
+    """Feed -> (subscribers, latest-packet mailbox) pump.
+
+    The mailbox is a single attribute holding the newest
+    :class:`StampedPacket`; publishing is one reference assignment, so the
+    render thread never takes a lock to read it.
+
+    Counters (see :meth:`stats`):
+
+    - ``received``: packets pulled from the feed.
+    - ``dropped``: packets never seen, from gaps in ``packet_id``, and
+      malformed packets no frame could be built from.
+    - ``duplicated``: repeats of the previous ``packet_id`` (discarded).
+    - ``out_of_order``: packets older than the newest one (discarded).
+    - ``superseded``: published packets replaced before the renderer took
+      them. Approximate, as it is updated without a lock.
+    """
+
+    def __init__(self, feed, poll_interval: float = 0.001) -> None:
+        self.feed = feed
+        self.logger = Logger(__class__.__name__).get()
+        self._poll_interval = max(0.0, float(poll_interval))
+        self._subscribers: List[Callable[[StampedPacket], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._slot: Optional[StampedPacket] = None
+        self._taken_seq = 0
+        self._seq = 0
+        self._last_packet_id: Optional[int] = None
+
+        self.received = 0
+        self.dropped = 0
+        self.duplicated = 0
+        self.out_of_order = 0
+        self.superseded = 0
+
+    # --- Lifecycle ---------------------------------------------------------
+    def start(self) -> "TelemetryIngest":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="TelemetryIngest", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        try:
+            if self.feed is not None:
+                self.feed.close()
+        except Exception:
+            pass
+        self.feed = None
+
+    # --- Consumers ---------------------------------------------------------
+    def subscribe(self, callback: Callable[[StampedPacket], None]) -> None:
+        """Call *callback* for every accepted packet, on the ingest thread."""
+        self._subscribers.append(callback)
+
+    def take_latest(self) -> Optional[StampedPacket]:
+        """Return the newest packet if it has not been taken yet, else ``None``."""
+        s = self._slot
+        if s is None or s.seq == self._taken_seq:
+            return None
+        self._taken_seq = s.seq
+        return s
+
+    def has_new(self) -> bool:
+        """``True`` if a packet is waiting that :meth:`take_latest` would return."""
+        s = self._slot
+        return s is not None and s.seq != self._taken_seq
+
+    def latest(self) -> Optional[StampedPacket]:
+        """Peek at the newest packet without marking it as taken."""
+        return self._slot
+
+    def stats(self) -> dict:
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "duplicated": self.duplicated,
+            "out_of_order": self.out_of_order,
+            "superseded": self.superseded,
+        }
+
+    # --- Pump --------------------------------------------------------------
+    def pump(self) -> int:
+        """Drain everything the feed has buffered right now.
+
+        Runs on the ingest thread, but can also be called directly when no
+        thread was started. Returns the number of packets pulled.
+        """
+        n = 0
+        while self.feed is not None:
+            try:
+                pkt = self.feed.get_nowait()
+            except queue.Empty:
+                break
+            except Exception as e:
+                self.logger.info(f"Feed read failed: {e}")
+                break
+            if pkt is None:
+                break
+            n += 1
+            self._accept(pkt, time.monotonic_ns())
+        return n
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self.pump():
+                self._stop.wait(self._poll_interval)
+
+    def _accept(self, pkt, recv_ns: int) -> None:
+        self.received += 1
+        pid = getattr(pkt, "packet_id", None)
+        last = self._last_packet_id
+        if pid is not None and last is not None:
+            if pid == last:
+                self.duplicated += 1
+                return
+            if pid < last and last - pid < PACKET_ID_RESET_GAP:
+                self.out_of_order += 1
+                return
+            if last < pid < last + PACKET_ID_RESET_GAP:
+                self.dropped += pid - last - 1
+        if pid is not None:
+            self._last_packet_id = pid
+
+        try:
+            frame = TelemetryFrame.from_packet(pkt)
+        except (AttributeError, TypeError, ValueError) as e:
+            # a malformed packet must not end the ingest thread
+            self.dropped += 1
+            self.logger.info(f"Dropping malformed packet {pid}: {e}")
+            return
+
+        self._seq += 1
+        stamped = StampedPacket(seq=self._seq, recv_ns=recv_ns, packet=pkt, frame=frame)
+        for cb in self._subscribers:
+            try:
+                cb(stamped)
+            except Exception as e:
+                self.logger.info(f"Ingest subscriber failed: {e}")
+
+        prev = self._slot
+        if prev is not None and prev.seq > self._taken_seq:
+            self.superseded += 1
+        self._slot = stamped
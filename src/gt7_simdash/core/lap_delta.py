@@ -0,0 +1,341 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .lap_store import LapReference
+
+# Progress-along-track matching against a best-lap reference.
+#
+# The reference checkpoints, in driving order, form a polyline with a
+# cumulative distance. A cursor remembers the segment of the last match and
+# each lookup only projects the position onto a few segments around it, so
+# a frame costs O(1) and the match cannot jump to a crossing or a parallel
+# straight. The reference time is interpolated between the two samples that
+# bracket the projection, which makes the delta smooth between checkpoints.
+#
+# MultiProgressCursor does the same for several references at once (session
+# best, all-time best, previous lap): their segments are packed into flat
+# arrays and every tick projects onto all cursor windows with one (R, W)
+# gather, so the per-frame cost barely grows with the number of references.
+# Packing the references (pack_references) is pure, so it can run on a worker
+# thread; the render thread only installs the finished layout.
+
+SEARCH_BACK = 1  # segments behind the cursor still considered (noise)
+SEARCH_AHEAD = 8  # segments ahead; ~30 m at 10 Hz sampling and 300 km/h
+LOST_M = 25.0  # further than this from the matched segment counts as lost
+LOST_FRAMES = 3  # consecutive lost lookups before re-acquiring globally
+
+
+class ProgressCursor:
+    """Monotonic matcher of positions to progress along a :class:`LapReference`.
+
+    :meth:`locate` returns the reference lap time at the projection of the
+    position, or ``None`` if there is no usable reference. After a pause,
+    rewind or pit visit the cursor re-acquires the nearest segment, via the
+    reference's KD-tree when it is ready and a vectorised scan before that.
+    """
+
+    def __init__(self, ref: LapReference) -> None:
+        self.ref = ref
+        pts = np.asarray(ref.points, dtype=np.float64)
+        self._a = pts[:-1]
+        self._d = pts[1:] - pts[:-1]
+        self._len2 = np.maximum((self._d**2).sum(axis=1), 1e-9)
+        seg_len = np.sqrt(self._len2)
+        self.distance = np.concatenate(([0.0], np.cumsum(seg_len)))  # metres
+        self._times = np.asarray(ref.times, dtype=np.float64)
+        self._n_seg = int(self._a.shape[0])
+
+        self._k: Optional[int] = None  # segment of the last match
+        self._lost = 0
+        self.progress_m = 0.0  # distance along the reference of the last match
+        self.reacquired = 0
+
+    @property
+    def length_m(self) -> float:
+        return float(self.distance[-1]) if self.distance.size else 0.0
+
+    def reset(self, at_start: bool = True) -> None:
+        """New lap: restart from the first segment (or re-acquire if False)."""
+        self._k = 0 if at_start else None
+        self._lost = 0
+        self.progress_m = 0.0
+
+    def locate(self, x: float, z: float) -> Optional[float]:
+        if self._n_seg < 1:
+            return None
+        if self._k is None:
+            self._k = self._acquire(x, z)
+            self.reacquired += 1
+
+        i, u, dist2 = self._project(x, z, self._k)
+        if dist2 > LOST_M * LOST_M:
+            self._lost += 1
+            if self._lost >= LOST_FRAMES:
+                self._k = self._acquire(x, z)
+                self.reacquired += 1
+                self._lost = 0
+                i, u, dist2 = self._project(x, z, self._k)
+        else:
+            self._lost = 0
+
+        self._k = max(self._k, i)  # the cursor only moves forward
+        t0, t1 = self._times[i], self._times[i + 1]
+        self.progress_m = float(self.distance[i] + u * np.sqrt(self._len2[i]))
+        return float(t0 + u * (t1 - t0))
+
+    def _project(self, x: float, z: float, k: int):
+        lo = max(0, k - SEARCH_BACK)
+        hi = min(self._n_seg, k + SEARCH_AHEAD + 1)
+        a = self._a[lo:hi]
+        d = self._d[lo:hi]
+        rx = x - a[:, 0]
+        rz = z - a[:, 1]
+        u = np.clip((rx * d[:, 0] + rz * d[:, 1]) / self._len2[lo:hi], 0.0, 1.0)
+        ex = rx - u * d[:, 0]
+        ez = rz - u * d[:, 1]
+        dist2 = ex * ex + ez * ez
+        j = int(np.argmin(dist2))
+        return lo + j, float(u[j]), float(dist2[j])
+
+    def _acquire(self, x: float, z: float) -> int:
+        idx = self.ref.nearest_index((x, z))
+        if idx is None:
+            diff = self._a - (x, z)
+            idx = int(np.argmin((diff**2).sum(axis=1)))
+        # the nearest checkpoint starts or ends a segment; search from before it
+        return max(0, min(int(idx), self._n_seg) - 1)
+
+
+@dataclass
+class PackedReferences:
+    """Flat arrays of several references, as :class:`MultiProgressCursor` uses.
+
+    Points (time, distance, length of the segment they start) of reference
+    ``r`` start at ``p_off[r]``; its segments (x, z, dx, dz, 1/len^2) at
+    ``s_off[r]``, followed by a window of far-away padding segments so no
+    search window reaches into the next reference. ``at_start`` says where a
+    reference new to the cursor starts: its first segment, or re-acquired.
+    """
+
+    refs: Dict[str, LapReference] = field(default_factory=dict)
+    at_start: Dict[str, bool] = field(default_factory=dict)
+    n_seg: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int64))
+    p_off: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int64))
+    s_off: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int64))
+    seg: np.ndarray = field(default_factory=lambda: np.zeros((0, 5)))
+    times: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    dist: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    seg_len: np.ndarray = field(default_factory=lambda: np.zeros(0))
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.refs)
+
+
+def pack_references(
+    refs: Dict[str, LapReference], at_start: Optional[Dict[str, bool]] = None
+) -> PackedReferences:
+    """Pack *refs* for :meth:`MultiProgressCursor.install` (thread-safe).
+
+    References with fewer than two points are left out.
+    """
+    refs = {name: ref for name, ref in refs.items() if len(ref) >= 2}
+    at_start = {name: (at_start or {}).get(name, True) for name in refs}
+    if not refs:
+        return PackedReferences(refs, at_start)
+    n = len(refs)
+    w = SEARCH_BACK + SEARCH_AHEAD + 1
+    pts = [
+        np.asarray(ref.points, dtype=np.float64).reshape(-1, 2) for ref in refs.values()
+    ]
+    n_seg = np.asarray([p.shape[0] - 1 for p in pts], dtype=np.int64)
+    p_off = np.concatenate(([0], np.cumsum(n_seg + 1)[:-1])).astype(np.int64)
+    s_off = p_off - np.arange(n, dtype=np.int64) + w * np.arange(n)
+
+    seg, times, dist, seg_len = [], [], [], []
+    pad = np.zeros((w, 5))
+    pad[:, :2] = 1e9
+    for ref, p in zip(refs.values(), pts):
+        d = p[1:] - p[:-1]
+        len2 = np.maximum((d**2).sum(axis=1), 1e-9)
+        seg.append(np.column_stack((p[:-1], d, 1.0 / len2)))
+        seg.append(pad)
+        length = np.sqrt(len2)
+        seg_len.append(np.concatenate((length, [0.0])))
+        dist.append(np.concatenate(([0.0], np.cumsum(length))))
+        times.append(np.asarray(ref.times, dtype=np.float64))
+    return PackedReferences(
+        refs,
+        at_start,
+        n_seg,
+        p_off,
+        s_off,
+        np.concatenate(seg),
+        np.concatenate(times),
+        np.concatenate(dist),
+        np.concatenate(seg_len),
+    )
+
+
+class MultiProgressCursor:
+    """:class:`ProgressCursor` for several named references, batched.
+
+    References are added with :meth:`set`, or packed elsewhere with
+    :func:`pack_references` and swapped in with :meth:`install`;
+    :meth:`locate` returns the reference lap time at the current position
+    for each of them. The numpy work per tick is a fixed number of
+    vectorised operations over an ``(n_refs, window)`` block; only
+    re-acquiring a lost cursor (rare) touches the references one by one.
+    """
+
+    def __init__(self) -> None:
+        self._window = np.arange(SEARCH_BACK + SEARCH_AHEAD + 1)
+        self.reacquired = 0
+        self._packed = PackedReferences()
+        self._k = np.zeros(0, dtype=np.int64)  # -1: not acquired yet
+        self._lost = np.zeros(0, dtype=np.int64)
+        self._progress = np.zeros(0, dtype=np.float64)
+        self.install(self._packed)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._refs
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._names)
+
+    @property
+    def refs(self) -> Dict[str, LapReference]:
+        return dict(self._refs)
+
+    def get(self, name: str) -> Optional[LapReference]:
+        return self._refs.get(name)
+
+    def set(
+        self, name: str, ref: Optional[LapReference], at_start: bool = True
+    ) -> None:
+        """Add or replace the reference *name* (``None`` removes it).
+
+        A new reference starts at its first segment, or re-acquires its
+        place on the next lookup when *at_start* is False (picked up mid-lap).
+        This packs all references on the calling thread.
+        """
+        if self._refs.get(name) is ref:
+            return
+        refs = dict(self._refs)
+        if ref is None:
+            refs.pop(name, None)
+        else:
+            refs[name] = ref
+        flags = dict(self._packed.at_start)
+        flags[name] = at_start
+        self.install(pack_references(refs, flags))
+
+    def install(self, packed: PackedReferences) -> None:
+        """Swap in a packed reference set.
+
+        Cursors of references that are still the same object keep their
+        place; new ones start as their ``at_start`` flag says.
+        """
+        state = {
+            name: (self._k[i], self._lost[i], self._progress[i])
+            for i, name in enumerate(self._packed.names)
+            if packed.refs.get(name) is self._packed.refs[name]
+        }
+        self._packed = packed
+        self._refs = packed.refs
+        self._names = packed.names
+        n = len(self._names)
+        self._k = np.zeros(n, dtype=np.int64)
+        self._lost = np.zeros(n, dtype=np.int64)
+        self._progress = np.zeros(n, dtype=np.float64)
+        self._rows = np.arange(n)
+        for i, name in enumerate(self._names):
+            if name in state:
+                self._k[i], self._lost[i], self._progress[i] = state[name]
+            elif not packed.at_start[name]:
+                self._k[i] = -1
+
+    def clear(self) -> None:
+        self.install(PackedReferences())
+
+    def reset(self, at_start: bool = True) -> None:
+        """New lap: restart every cursor from its first segment."""
+        self._k[:] = 0 if at_start else -1
+        self._lost[:] = 0
+        self._progress[:] = 0.0
+
+    def progress_m(self, name: str) -> Optional[float]:
+        """Distance along *name* of its last match, in metres."""
+        if name not in self._refs:
+            return None
+        return float(self._progress[self._names.index(name)])
+
+    def length_m(self, name: str) -> Optional[float]:
+        """Length of the reference *name* along its checkpoints, in metres."""
+        if name not in self._refs:
+            return None
+        r = self._names.index(name)
+        pk = self._packed
+        return float(pk.dist[pk.p_off[r] + pk.n_seg[r]])
+
+    def locate(self, x: float, z: float) -> Dict[str, float]:
+        """Reference lap time at the projection of ``(x, z)``, per reference."""
+        if not self._names:
+            return {}
+        if self._k.min() < 0:
+            for r in np.flatnonzero(self._k < 0):
+                self._k[r] = self._acquire(int(r), x, z)
+                self.reacquired += 1
+
+        i, u, dist2 = self._project(x, z)
+        lost = dist2 > LOST_M * LOST_M
+        if lost.any():
+            self._lost = np.where(lost, self._lost + 1, 0)
+            again = np.flatnonzero(self._lost >= LOST_FRAMES)
+            if again.size:
+                for r in again:
+                    self._k[r] = self._acquire(int(r), x, z)
+                    self._lost[r] = 0
+                    self.reacquired += 1
+                i, u, dist2 = self._project(x, z)
+        elif self._lost.any():
+            self._lost[:] = 0
+
+        np.maximum(self._k, i, out=self._k)  # cursors only move forward
+        pk = self._packed
+        p = pk.p_off + i
+        t0 = pk.times[p]
+        t = t0 + u * (pk.times[p + 1] - t0)
+        self._progress = pk.dist[p] + u * pk.seg_len[p]
+        return dict(zip(self._names, t.tolist()))
+
+    # --- Internals ---------------------------------------------------------
+    def _project(self, x: float, z: float):
+        pk = self._packed
+        lo = np.maximum(self._k - SEARCH_BACK, 0)
+        seg = pk.seg[(pk.s_off + lo)[:, None] + self._window]  # (R, W, 5)
+        rx = x - seg[..., 0]
+        rz = z - seg[..., 1]
+        dx = seg[..., 2]
+        dz = seg[..., 3]
+        u = np.clip((rx * dx + rz * dz) * seg[..., 4], 0.0, 1.0)
+        ex = rx - u * dx
+        ez = rz - u * dz
+        dist2 = ex * ex + ez * ez
+        j = np.argmin(dist2, axis=1)
+        return lo + j, u[self._rows, j], dist2[self._rows, j]
+
+    def _acquire(self, r: int, x: float, z: float) -> int:
+        pk = self._packed
+        n_seg = int(pk.n_seg[r])
+        idx = self._refs[self._names[r]].nearest_index((x, z))
+        if idx is None:
+            a = pk.seg[pk.s_off[r] : pk.s_off[r] + n_seg]
+            idx = int(np.argmin((a[:, 0] - x) ** 2 + (a[:, 1] - z) ** 2))
+        return max(0, min(int(idx), n_seg) - 1)
@@ -0,0 +1,228 @@
+import queue
+import threading
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import numpy as np
+
+from .lap_delta import PackedReferences, pack_references
+from .lap_store import LapReference, LapStore, StoredLap
+from .logger import Logger
+
+# Lap samples and the references built from them.
+#
+# LapSampleBuffer records the checkpoints of the lap being driven into a
+# preallocated float32 array (x, z, lap time), doubling it when a long track
+# fills it. Positions are quantised to a grid and only the first visit of a
+# cell is kept; cells are deduplicated through a set of packed integer keys
+# rather than float tuples. Finishing a lap hands the filled array over and
+# starts a fresh one, so nothing is copied on the render thread.
+#
+# ReferenceBuilder turns finished laps (and stored laps matched on the track)
+# into LapReferences on a daemon thread: it builds their KD-tree, saves new
+# bests to the LapStore and packs the whole reference set for the cursor.
+# The render thread polls for the finished layout and installs it in one
+# swap; results queued before a reset() are discarded.
+
+DEFAULT_CAPACITY = 4096  # checkpoints; ~7 min at 10 Hz before growing
+
+
+def cell_key(qx: int, qz: int) -> int:
+    """Pack two grid indices (|q| < 2**31) into one integer key."""
+    return (qx << 32) | (qz & 0xFFFFFFFF)
+
+
+class LapSampleBuffer:
+    """Growable float32 buffer of one lap's quantised checkpoints."""
+
+    def __init__(self, grid_m: float = 0.25, capacity: int = DEFAULT_CAPACITY):
+        self.grid_m = float(grid_m)
+        self._capacity = max(16, int(capacity))
+        self._data = np.empty((self._capacity, 3), dtype=np.float32)
+        self._n = 0
+        self._cells: Set[int] = set()
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def capacity(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def points(self) -> np.ndarray:
+        """(N, 2) view of the recorded x, z."""
+        return self._data[: self._n, :2]
+
+    @property
+    def times(self) -> np.ndarray:
+        """(N,) view of the lap time at each checkpoint."""
+        return self._data[: self._n, 2]
+
+    def add(self, x: float, z: float, t: float) -> bool:
+        """Record ``(x, z)`` at lap time *t* unless its grid cell was seen."""
+        g = self.grid_m
+        qx = round(float(x) / g)
+        qz = round(float(z) / g)
+        key = cell_key(qx, qz)
+        if key in self._cells:
+            return False  # keep the earliest time of a cell
+        self._cells.add(key)
+        if self._n == self._data.shape[0]:
+            self._grow()
+        self._data[self._n] = (qx * g, qz * g, t)
+        self._n += 1
+        return True
+
+    def clear(self) -> None:
+        """Start a new lap in the same buffer."""
+        self._n = 0
+        self._cells.clear()
+
+    def freeze(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Hand over ``(points, times)`` and start a new lap in a fresh buffer."""
+        data = self._data[: self._n]
+        # keep the size the longest lap needed, so the next one never grows
+        self._data = np.empty_like(self._data)
+        self._n = 0
+        self._cells.clear()
+        return data[:, :2], data[:, 2]
+
+    def _grow(self) -> None:
+        data = np.empty((2 * self._data.shape[0], 3), dtype=np.float32)
+        data[: self._n] = self._data[: self._n]
+        self._data = data
+
+
+class ReferenceBuilder:
+    """Daemon thread that builds lap references and packs them for the cursor.
+
+    :meth:`submit_lap` and :meth:`submit_stored` queue work and return at
+    once; :meth:`poll` returns the latest :class:`PackedReferences` (or
+    ``None``) for :meth:`MultiProgressCursor.install`. The thread owns the
+    reference set; each result holds all references, not only the new one.
+    """
+
+    def __init__(
+        self,
+        store: Optional[LapStore] = None,
+        leafsize: int = 16,
+        grid_m: float = 0.0,
+    ) -> None:
+        self.logger = Logger(__class__.__name__).get()
+        self._store = store
+        self._leafsize = int(leafsize)
+        self._grid = float(grid_m)
+        self._jobs: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._result: Optional[Tuple[int, PackedReferences]] = None
+        self._gen = 0
+        # the reference set, only touched by the worker thread
+        self._refs: Dict[str, LapReference] = {}
+        self._at_start: Dict[str, bool] = {}
+        self.built = 0
+
+    def submit_lap(
+        self,
+        points: np.ndarray,
+        times: np.ndarray,
+        lap_time: float,
+        car_id: int,
+        slots: Iterable[str],
+        save: bool = False,
+    ) -> None:
+        """Make a finished lap the reference of every slot in *slots*."""
+        self._put(
+            "lap", (points, times, float(lap_time), int(car_id), tuple(slots), save)
+        )
+
+    def submit_stored(self, lap: StoredLap, slot: str) -> None:
+        """Load a stored lap into *slot*; its cursor re-acquires mid-lap."""
+        self._put("stored", (lap, slot))
+
+    def reset(self) -> None:
+        """Drop all references, and results of work queued before now."""
+        self._gen += 1
+        with self._lock:
+            self._result = None
+        self._put("clear", ())
+
+    @property
+    def pending(self) -> bool:
+        """A finished reference set is waiting for :meth:`poll`."""
+        return self._result is not None
+
+    def poll(self) -> Optional[PackedReferences]:
+        """The newest finished reference set, once; ``None`` if nothing new."""
+        if self._result is None:
+            return None
+        with self._lock:
+            result, self._result = self._result, None
+        if result is None or result[0] != self._gen:
+            return None
+        return result[1]
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Finish queued work and stop the thread (restarts on demand)."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._jobs.put(None)
+            thread.join(timeout)
+
+    # --- Worker ------------------------------------------------------------
+    def _put(self, kind: str, args: tuple) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="ReferenceBuilder", daemon=True
+            )
+            self._thread.start()
+        self._jobs.put((self._gen, kind, args))
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            gen, kind, args = job
+            if kind == "clear":
+                self._refs.clear()
+                self._at_start.clear()
+                continue
+            if gen != self._gen:
+                continue  # queued before a reset
+            try:
+                if kind == "lap":
+                    ref, slots = self._build_lap(*args)
+                    flag = True
+                else:
+                    lap, slot = args
+                    ref = self._store.load(lap, leafsize=self._leafsize)
+                    ref.build_index().wait_ready()
+                    slots, flag = (slot,), False
+            except (OSError, ValueError) as e:
+                self.logger.info(f"Could not build lap reference: {e}")
+                continue
+            for slot in slots:
+                self._refs[slot] = ref
+                self._at_start[slot] = flag
+            packed = pack_references(self._refs, self._at_start)
+            self.built += 1
+            with self._lock:
+                self._result = (gen, packed)
+
+    def _build_lap(
+        self,
+        points: np.ndarray,
+        times: np.ndarray,
+        lap_time: float,
+        car_id: int,
+        slots: Tuple[str, ...],
+        save: bool,
+    ) -> Tuple[LapReference, Tuple[str, ...]]:
+        ref = LapReference(
+            points, times, lap_time, car_id=car_id, leafsize=self._leafsize
+        )
+        ref.build_index().wait_ready()
+        if save and self._store is not None:
+            self._store.save(ref, grid=self._grid)
+        return ref, slots
@@ -0,0 +1,320 @@
+import glob
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree as KDTree
+
+from .logger import Logger
+
+# Best-lap references persisted per car and track.
+#
+# GT7 telemetry does not say which track is being driven, so a track is
+# identified by the coarse grid cells (FINGERPRINT_CELL_M) its lap covers.
+# The fingerprint in the file name is a CRC of those cells; matching a
+# session against stored laps compares the cells seen so far instead, so a
+# reference can be picked up a few hundred metres into the first lap.
+#
+# One file per reference, ``<car_id>_<fingerprint>.lap``:
+#
+#   header   magic, car_id, n_points, best time (f64), grid (f32), n_cells
+#   points   float32[n_points, 3]: x, z, lap time at that checkpoint
+#   cells    int32[n_cells, 2]: the fingerprint cells
+#
+# The points are read with np.memmap, so loading is instant and only the
+# pages the KD-tree build touches are read; the tree is built on a thread.
+
+FILE_MAGIC = b"GT7LAP01"
+FILE_SUFFIX = ".lap"
+_HEADER = struct.Struct("<8sIIdfI")
+
+FINGERPRINT_CELL_M = 50.0
+MATCH_MIN_CELLS = 6  # seen cells needed before a stored lap is trusted
+MATCH_RATIO = 0.9  # share of seen cells that must lie on the stored lap
+
+
+def track_cells(
+    points_xz: np.ndarray, cell_m: float = FINGERPRINT_CELL_M
+) -> np.ndarray:
+    """Unique coarse cells (int32, sorted rows) covered by *points_xz*."""
+    pts = np.asarray(points_xz, dtype=np.float64).reshape(-1, 2)
+    if pts.size == 0:
+        return np.zeros((0, 2), np.int32)
+    cells = np.floor(pts / cell_m).astype(np.int32)
+    return np.unique(cells, axis=0)
+
+
+def cell_of(x: float, z: float, cell_m: float = FINGERPRINT_CELL_M) -> Tuple[int, int]:
+    return (int(np.floor(x / cell_m)), int(np.floor(z / cell_m)))
+
+
+def fingerprint(cells: np.ndarray) -> str:
+    return f"{zlib.crc32(np.ascontiguousarray(cells, dtype='<i4').tobytes()):08x}"
+
+
+class LapReference:
+    """Best-lap checkpoints with a lazily built KD-tree.
+
+    ``points`` is (N, 2) and ``times`` (N,); both may be views of a memmap.
+    :meth:`query` returns ``None`` until :meth:`build_index` finished, which
+    runs on a daemon thread so the render thread never waits for it.
+    """
+
+    def __init__(
+        self,
+        points: np.ndarray,
+        times: np.ndarray,
+        best_time_s: float,
+        car_id: int = 0,
+        cells: Optional[np.ndarray] = None,
+        leafsize: int = 16,
+        path: Optional[str] = None,
+    ) -> None:
+        self.points = points
+        self.times = times
+        self.best_time_s = float(best_time_s)
+        self.car_id = int(car_id)
+        self.cells = track_cells(points) if cells is None else cells
+        self.path = path
+        self._leafsize = int(leafsize)
+        self._tree: Optional[KDTree] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._tree is not None
+
+    def __len__(self) -> int:
+        return int(self.times.shape[0])
+
+    def build_index(self) -> "LapReference":
+        """Start building the KD-tree in the background (idempotent)."""
+        if self._thread is None and self._tree is None:
+            self._thread = threading.Thread(
+                target=self._build, name="LapReferenceIndex", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def nearest_index(self, pos: Tuple[float, float]) -> Optional[int]:
+        """Index of the checkpoint nearest to *pos*, ``None`` until indexed."""
+        tree = self._tree
+        if tree is None:
+            return None
+        _, idx = tree.query(pos, k=1)
+        return int(idx)
+
+    def query(self, pos: Tuple[float, float]) -> Optional[float]:
+        """Reference lap time at the checkpoint nearest to *pos*."""
+        idx = self.nearest_index(pos)
+        return None if idx is None else float(self.times[idx])
+
+    def _build(self) -> None:
+        # copy out of the memmap once; the tree keeps its own array anyway
+        pts = np.array(self.points, dtype=np.float32)
+        self._tree = KDTree(pts, leafsize=self._leafsize)
+
+
+@dataclass
+class StoredLap:
+    """Header and fingerprint of a reference file; points stay on disk."""
+
+    path: str
+    car_id: int
+    n_points: int
+    best_time_s: float
+    grid: float
+    cells: Set[Tuple[int, int]]
+
+    def match_ratio(self, seen: Iterable[Tuple[int, int]]) -> float:
+        seen = list(seen)
+        if not seen:
+            return 0.0
+        return sum(1 for c in seen if c in self.cells) / len(seen)
+
+
+class LapStore:
+    """Directory of best-lap references, one file per car and track."""
+
+    def __init__(self, storage_dir: str) -> None:
+        self.storage_dir = os.path.expanduser(storage_dir)
+        os.makedirs(self.storage_dir, exist_ok=True)
+        self.logger = Logger(__class__.__name__).get()
+        self._index: Dict[int, List[StoredLap]] = {}
+        self._lock = threading.Lock()
+        self._writers: List[threading.Thread] = []
+
+    # --- Lookup ------------------------------------------------------------
+    def laps(self, car_id: int) -> List[StoredLap]:
+        """Stored references for *car_id* (headers are read once per car)."""
+        with self._lock:
+            laps = self._index.get(car_id)
+            if laps is None:
+                laps = []
+                for path in sorted(glob.glob(self._pattern(car_id))):
+                    try:
+                        laps.append(self._read_header(path))
+                    except (OSError, ValueError) as e:
+                        self.logger.info(f"Skipping lap reference {path}: {e}")
+                self._index[car_id] = laps
+            return list(laps)
+
+    def match(self, car_id: int, seen: Set[Tuple[int, int]]) -> Optional[StoredLap]:
+        """The stored lap whose track covers the *seen* cells, if unambiguous.
+
+        Several layouts of one circuit share most cells, so the best ratio
+        only wins once it clears ``MATCH_RATIO`` and no other lap ties.
+        """
+        if len(seen) < MATCH_MIN_CELLS:
+            return None
+        scored = sorted(
+            ((lap.match_ratio(seen), lap) for lap in self.laps(car_id)),
+            key=lambda x: x[0],
+            reverse=True,
+        )
+        if not scored or scored[0][0] < MATCH_RATIO:
+            return None
+        if len(scored) > 1 and scored[1][0] >= scored[0][0]:
+            return None
+        return scored[0][1]
+
+    def load(self, lap: StoredLap, leafsize: int = 16) -> LapReference:
+        """Memory-map the checkpoints of *lap*; call ``build_index`` next."""
+        data = np.memmap(
+            lap.path,
+            dtype="<f4",
+            mode="r",
+            offset=_HEADER.size,
+            shape=(lap.n_points, 3),
+        )
+        cells = np.array(sorted(lap.cells), dtype=np.int32).reshape(-1, 2)
+        return LapReference(
+            data[:, :2],
+            data[:, 2],
+            lap.best_time_s,
+            car_id=lap.car_id,
+            cells=cells,
+            leafsize=leafsize,
+            path=lap.path,
+        )
+
+    # --- Saving ------------------------------------------------------------
+    def save(self, ref: LapReference, grid: float = 0.0) -> None:
+        """Persist *ref* in the background, replacing the lap it supersedes.
+
+        Stored references of the same car whose track matches both ways are
+        replaced, so a track keeps one file per car even if its fingerprint
+        drifts between laps; a lap covering only part of another (a shorter
+        layout of the circuit) is kept beside it. Nothing is written if a
+        matching one is already faster.
+        """
+        car_id = ref.car_id
+        points = np.array(ref.points, dtype="<f4")
+        times = np.array(ref.times, dtype="<f4")
+        cells = np.ascontiguousarray(ref.cells, dtype="<i4")
+        seen = {tuple(c) for c in cells.tolist()}
+        path = os.path.join(
+            self.storage_dir, f"{car_id}_{fingerprint(cells)}{FILE_SUFFIX}"
+        )
+        stored = StoredLap(
+            path, car_id, int(times.size), ref.best_time_s, float(grid), seen
+        )
+        old = [
+            lap
+            for lap in self.laps(car_id)
+            if lap.match_ratio(seen) >= MATCH_RATIO
+            and stored.match_ratio(lap.cells) >= MATCH_RATIO
+        ]
+        if any(lap.best_time_s <= ref.best_time_s for lap in old):
+            return  # a faster lap of this track is already stored
+        old_paths = [lap.path for lap in old]
+        with self._lock:
+            laps = self._index.setdefault(car_id, [])
+            laps[:] = [
+                lap for lap in laps if lap.path not in old_paths and lap.path != path
+            ]
+            laps.append(stored)
+        ref.path = path
+
+        t = threading.Thread(
+            target=self._write,
+            args=(stored, points, times, cells, old_paths),
+            name="LapStoreWriter",
+            daemon=True,
+        )
+        self._writers = [w for w in self._writers if w.is_alive()] + [t]
+        t.start()
+
+    def flush(self, timeout: float = 2.0) -> None:
+        for w in list(self._writers):
+            w.join(timeout)
+        self._writers = [w for w in self._writers if w.is_alive()]
+
+    def close(self) -> None:
+        self.flush()
+
+    # --- Internals ---------------------------------------------------------
+    def _pattern(self, car_id: int) -> str:
+        return os.path.join(self.storage_dir, f"{int(car_id)}_*{FILE_SUFFIX}")
+
+    def _write(
+        self,
+        lap: StoredLap,
+        points: np.ndarray,
+        times: np.ndarray,
+        cells: np.ndarray,
+        replaced: List[str],
+    ) -> None:
+        data = np.empty((times.size, 3), dtype="<f4")
+        data[:, :2] = points
+        data[:, 2] = times
+        head = _HEADER.pack(
+            FILE_MAGIC,
+            lap.car_id,
+            lap.n_points,
+            lap.best_time_s,
+            lap.grid,
+            int(cells.shape[0]),
+        )
+        tmp = lap.path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(head)
+                f.write(data.tobytes())
+                f.write(cells.tobytes())
+            os.replace(tmp, lap.path)
+            for p in replaced:
+                if p != lap.path:
+                    os.remove(p)
+        except OSError as e:
+            self.logger.info(f"Could not save lap reference {lap.path}: {e}")
+            return
+        self.logger.info(
+            f"Lap reference saved: car {lap.car_id}, {lap.best_time_s:.3f} s, "
+            f"{lap.n_points} points -> {lap.path}"
+        )
+
+    @staticmethod
+    def _read_header(path: str) -> StoredLap:
+        with open(path, "rb") as f:
+            raw = f.read(_HEADER.size)
+            if len(raw) < _HEADER.size:
+                raise ValueError("truncated header")
+            magic, car_id, n, best, grid, n_cells = _HEADER.unpack(raw)
+            if magic != FILE_MAGIC:
+                raise ValueError("not a lap reference")
+            f.seek(_HEADER.size + n * 3 * 4)
+            cells = np.frombuffer(f.read(n_cells * 8), dtype="<i4")
+        if cells.size != 2 * n_cells:
+            raise ValueError("truncated file")
+        cells_set = {(int(a), int(b)) for a, b in cells.reshape(-1, 2).tolist()}
+        return StoredLap(path, car_id, n, best, grid, cells_set)
@@ -0,0 +1,132 @@
+import queue
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set
+
+from .logger import Logger
+
+# Bounded LRU of per-car models with background loading. The owner thread
+# (the ECU's) asks for a model with get(); an unknown car_id is handed to a
+# loader thread and a placeholder is served until the loaded model is
+# collected on a later get(). Only the owner thread touches `models`.
+
+DEFAULT_MAX_MODELS = 16
+
+
+class ModelCache:
+    """Car models keyed by car_id, loaded off-thread, evicted least recently used.
+
+    ``load(car_id)`` runs on the loader thread and must be thread-safe; if
+    it raises, the placeholder stays in place for the rest of the session.
+    ``placeholder(car_id)`` builds the stand-in served while it runs;
+    ``on_evict(model)`` is called (on the owner thread) for every model
+    pushed out of the cache, e.g. to save it.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[int], Any],
+        placeholder: Callable[[int], Any],
+        on_evict: Optional[Callable[[Any], None]] = None,
+        max_models: int = DEFAULT_MAX_MODELS,
+    ) -> None:
+        self.logger = Logger(__class__.__name__).get()
+        self._load = load
+        self._placeholder = placeholder
+        self._on_evict = on_evict
+        self.max_models = max(1, int(max_models))
+        self.models: "OrderedDict[int, Any]" = OrderedDict()
+
+        self._requests: "queue.SimpleQueue[Optional[int]]" = queue.SimpleQueue()
+        self._done: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._pending: Set[int] = set()
+        self._thread: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, car_id: int) -> Any:
+        """Return the model for *car_id*, or its placeholder while it loads."""
+        if self._pending:
+            self.collect()
+        model = self.models.get(car_id)
+        if model is None:
+            model = self._placeholder(car_id)
+            self._put(car_id, model)
+            self._pending.add(car_id)
+            self._ensure_thread()
+            self._requests.put(car_id)
+        else:
+            self.models.move_to_end(car_id)
+            if car_id not in self._pending:
+                self.hits += 1
+        return model
+
+    def is_loading(self, car_id: int) -> bool:
+        return car_id in self._pending
+
+    def collect(self) -> int:
+        """Install models the loader has finished. Returns how many."""
+        n = 0
+        while True:
+            try:
+                car_id, model = self._done.get_nowait()
+            except queue.Empty:
+                return n
+            self._pending.discard(car_id)
+            # drop results for placeholders evicted (or failed) meanwhile
+            if model is not None and car_id in self.models:
+                self._put(car_id, model)
+                n += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self.models),
+            "hits": self.hits,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "pending": len(self._pending),
+        }
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._requests.put(None)
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.collect()
+
+    # --- Internals ---------------------------------------------------------
+    def _put(self, car_id: int, model: Any) -> None:
+        self.models[car_id] = model
+        self.models.move_to_end(car_id)
+        while len(self.models) > self.max_models:
+            old_id, old = self.models.popitem(last=False)
+            self.evictions += 1
+            if old_id in self._pending:
+                continue  # just a placeholder, nothing to save
+            if self._on_evict is not None:
+                try:
+                    self._on_evict(old)
+                except Exception as e:
+                    self.logger.info(f"Saving evicted model {old_id} failed: {e}")
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="ModelLoader", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            car_id = self._requests.get()
+            if car_id is None:
+                return
+            try:
+                model = self._load(car_id)
+            except Exception as e:
+                self.logger.info(f"Loading model {car_id} failed: {e}")
+                model = None
+            self.loads += 1
+            self._done.put((car_id, model))
@@ -0,0 +1,58 @@
+from typing import Dict, Iterable, Union
+
+import numpy as np
+
+# Frame-time bookkeeping shared by the WidgetGroup instrumentation, the
+# on-screen overlay and the benchmark.
+
+DEFAULT_RING_SIZE = 600  # 10 s at 60 fps
+
+
+class TimingRing:
+    """Fixed-size ring of ``perf_counter_ns`` durations."""
+
+    __slots__ = ("_buf", "_i", "count")
+
+    def __init__(self, size: int = DEFAULT_RING_SIZE) -> None:
+        self._buf = np.zeros(max(1, int(size)), dtype=np.int64)
+        self._i = 0
+        self.count = 0  # total samples ever added
+
+    @property
+    def size(self) -> int:
+        return self._buf.size
+
+    def add(self, ns: int) -> None:
+        self._buf[self._i] = ns
+        self._i = (self._i + 1) % self._buf.size
+        self.count += 1
+
+    def values(self) -> np.ndarray:
+        """Samples currently held, oldest first."""
+        if self.count < self._buf.size:
+            return self._buf[: self.count].copy()
+        return np.roll(self._buf, -self._i)
+
+    def clear(self) -> None:
+        self._i = 0
+        self.count = 0
+
+
+def summarize(samples_ns: Union[np.ndarray, Iterable[int]]) -> Dict[str, float]:
+    """Mean/p50/p95/p99/max in milliseconds for a set of ns durations."""
+    a = np.asarray(
+        samples_ns if isinstance(samples_ns, np.ndarray) else list(samples_ns),
+        dtype=np.float64,
+    )
+    if a.size == 0:
+        return {"n": 0}
+    a = a / 1e6
+    p50, p95, p99 = np.percentile(a, [50, 95, 99])
+    return {
+        "n": int(a.size),
+        "mean_ms": round(float(a.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(a.max()), 4),
+    }
@@ -0,0 +1,115 @@
+import queue
+import time
+from typing import Dict, Iterator, Optional, Union
+
+import numpy as np
+
+from .capture import CaptureReader, CapturedPacket, decode_packet
+from .logger import Logger
+
+# Plays a telemetry capture back through the same surface as
+# granturismo's Feed (start / get_nowait / close), so DashboardState and the
+# ingest run unchanged on recorded data.
+
+MODE_REALTIME = "realtime"  # original packet timing, scaled by `speed`
+MODE_FAST = "fast"  # every packet immediately
+MODE_STEP = "step"  # only as many packets as released with step()
+MODES = (MODE_REALTIME, MODE_FAST, MODE_STEP)
+
+
+class ReplayFeed:
+    """Feed replacement that replays a capture file.
+
+    ``get_nowait`` raises :class:`queue.Empty` when no packet is due yet
+    (realtime), none has been released (step) or the capture is exhausted.
+    With ``loop=True`` playback wraps around; packet ids keep increasing
+    across loops so the ingest does not mistake the wrap for reordering.
+    """
+
+    def __init__(
+        self,
+        source: Union[str, CaptureReader, Dict[str, np.ndarray]],
+        mode: str = MODE_REALTIME,
+        speed: float = 1.0,
+        loop: bool = False,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown replay mode {mode!r}, expected one of {MODES}")
+        self.logger = Logger(__class__.__name__).get()
+        if isinstance(source, str):
+            source = CaptureReader(source)
+        self._cols = source.columns() if isinstance(source, CaptureReader) else source
+        self.mode = mode
+        self.speed = max(1e-3, float(speed))
+        self.loop = loop
+
+        ts = np.asarray(self._cols["recv_ns"], dtype=np.int64)
+        self._t = ts - ts[0] if ts.size else ts
+        self._n = int(ts.size)
+        pids = self._cols["packet_id"]
+        self._id_span = int(pids.max()) - int(pids.min()) + 1 if self._n else 0
+
+        self._i = 0
+        self._t0: Optional[int] = None
+        self._allowance = 0
+        self._closed = False
+        self.loops = 0
+        self.finished = self._n == 0
+        self.delivered = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    # --- Feed surface ------------------------------------------------------
+    def start(self) -> "ReplayFeed":
+        self._t0 = time.monotonic_ns()
+        return self
+
+    def close(self) -> None:
+        self._closed = True
+
+    def get_nowait(self) -> CapturedPacket:
+        if self._closed or not self._advance_loop():
+            raise queue.Empty
+        if self.mode == MODE_REALTIME:
+            if self._t0 is None:
+                self.start()
+            due = (time.monotonic_ns() - self._t0) * self.speed
+            if self._t[self._i] > due:
+                raise queue.Empty
+        elif self.mode == MODE_STEP:
+            if self._allowance <= 0:
+                raise queue.Empty
+            self._allowance -= 1
+        return self._take()
+
+    # --- Replay controls ---------------------------------------------------
+    def step(self, n: int = 1) -> None:
+        """Release *n* more packets in step mode."""
+        self._allowance += max(0, int(n))
+
+    def packets(self) -> Iterator[CapturedPacket]:
+        """The rest of the current pass, ignoring timing (e.g. to fuzz the ECU)."""
+        while self._i < self._n:
+            yield self._take()
+
+    # --- Internals ---------------------------------------------------------
+    def _advance_loop(self) -> bool:
+        if self._i < self._n:
+            return True
+        if not self.loop or self._n == 0:
+            if not self.finished:
+                self.finished = True
+                self.logger.info(f"Replay finished after {self.delivered} packets")
+            return False
+        self._i = 0
+        self.loops += 1
+        self._t0 = time.monotonic_ns()
+        return True
+
+    def _take(self) -> CapturedPacket:
+        pkt = decode_packet(self._cols, self._i)
+        pkt.packet_id += self.loops * self._id_span
+        self._i += 1
+        self.delivered += 1
+        return pkt
@@ -0,0 +1,156 @@
+from typing import Optional
+
+import numpy as np
+
+# Sector and micro-sector timing against a reference lap.
+#
+# The reference lap is split into n_micro equal-distance micro-sectors,
+# grouped into n_sectors sectors. Each tick feeds the distance along the
+# reference (ProgressCursor.progress_m) and the running lap time; crossing a
+# boundary interpolates the crossing time between the two ticks around it,
+# so the split does not depend on the packet rate. Best and last times per
+# (micro-)sector and the theoretical best (the sum of the best micro-sectors)
+# are updated as each boundary is crossed: a tick costs O(1) plus O(1) per
+# boundary crossed, and nothing is rescanned at the end of the lap.
+
+DEFAULT_SECTORS = 3
+DEFAULT_MICRO_PER_SECTOR = 8
+MAX_STEP_M = 150.0  # progress jumps larger than this (re-acquired) are not timed
+
+
+class Splits:
+    """Best and last time of a fixed number of consecutive splits."""
+
+    def __init__(self, n: int) -> None:
+        self.n = int(n)
+        self.best = np.full(self.n, np.inf)
+        self.last = np.full(self.n, np.nan)
+        self.improved = np.zeros(self.n, dtype=bool)  # last time set the best
+        self._best_sum = 0.0
+        self._missing = self.n  # splits without a best yet
+
+    def record(self, i: int, t: float) -> bool:
+        """Store split *i* of the current lap; returns ``True`` on a new best."""
+        self.last[i] = t
+        old = self.best[i]
+        better = t < old
+        self.improved[i] = better
+        if better:
+            if np.isinf(old):
+                self._missing -= 1
+                self._best_sum += t
+            else:
+                self._best_sum += t - old
+            self.best[i] = t
+        return bool(better)
+
+    def clear_last(self) -> None:
+        self.last[:] = np.nan
+        self.improved[:] = False
+
+    @property
+    def best_sum(self) -> Optional[float]:
+        """Sum of the best splits, once every split has one."""
+        return None if self._missing else float(self._best_sum)
+
+
+class SectorTimer:
+    """Incremental sector and micro-sector times along a reference lap.
+
+    Call :meth:`set_length` when the reference changes, :meth:`start_lap` /
+    :meth:`finish_lap` at lap boundaries and :meth:`advance` every tick.
+    ``micro`` and ``sectors`` hold the best/last times;
+    :attr:`theoretical_best_s` is the sum of the best micro-sectors.
+    """
+
+    def __init__(
+        self,
+        n_sectors: int = DEFAULT_SECTORS,
+        micro_per_sector: int = DEFAULT_MICRO_PER_SECTOR,
+    ) -> None:
+        self.n_sectors = max(1, int(n_sectors))
+        self.micro_per_sector = max(1, int(micro_per_sector))
+        self.n_micro = self.n_sectors * self.micro_per_sector
+        self.micro = Splits(self.n_micro)
+        self.sectors = Splits(self.n_sectors)
+        self.length_m = 0.0
+        self._width = 0.0
+        self._index = 0  # micro-sector the car is in
+        self._entered_t: Optional[float] = None  # lap time it was entered at
+        self._prev: Optional[tuple] = None  # (progress_m, lap_time) last tick
+        self._sector_sum = 0.0  # timed micro-sectors of the current sector
+        self._sector_count = 0
+
+    @property
+    def theoretical_best_s(self) -> Optional[float]:
+        return self.micro.best_sum
+
+    @property
+    def current_micro(self) -> int:
+        return self._index
+
+    def reset(self) -> None:
+        """Forget all times (new car or track)."""
+        self.micro = Splits(self.n_micro)
+        self.sectors = Splits(self.n_sectors)
+        self.set_length(0.0)
+        self.start_lap()
+
+    def set_length(self, length_m: Optional[float]) -> None:
+        """Split a reference of *length_m* metres; bests are kept."""
+        self.length_m = max(0.0, float(length_m or 0.0))
+        self._width = self.length_m / self.n_micro
+
+    def start_lap(self, at_start: bool = True) -> None:
+        """New lap; with *at_start* False the car is somewhere mid-lap and
+        timing starts at the next boundary it crosses."""
+        self._index = 0
+        self._entered_t = 0.0 if at_start else None
+        self._prev = (0.0, 0.0) if at_start else None
+        self._sector_sum = 0.0
+        self._sector_count = 0
+        self.micro.clear_last()
+        self.sectors.clear_last()
+
+    def finish_lap(self, lap_time_s: float) -> None:
+        """Close the last micro-sector at the finish line."""
+        if self._entered_t is not None and self._index == self.n_micro - 1:
+            self._complete(self._index, float(lap_time_s))
+
+    def advance(self, progress_m: float, lap_time_s: float) -> int:
+        """Feed one tick; returns the number of micro-sectors completed."""
+        if self._width <= 0.0:
+            return 0
+        d, t = float(progress_m), float(lap_time_s)
+        target = min(int(d / self._width), self.n_micro - 1)
+        prev, self._prev = self._prev, (d, t)
+        if prev is None or d - prev[0] > MAX_STEP_M:
+            # unknown or jumped position: resume timing at the next boundary
+            self._index = max(self._index, target)
+            self._entered_t = None
+            return 0
+
+        d0, t0 = prev
+        done = 0
+        while self._index < target:
+            b = (self._index + 1) * self._width
+            tb = t0 + (b - d0) / (d - d0) * (t - t0) if d > d0 else t
+            if self._entered_t is not None:
+                self._complete(self._index, tb)
+                done += 1
+            else:
+                self._sector_sum, self._sector_count = 0.0, 0
+            self._entered_t = tb
+            self._index += 1
+        return done
+
+    def _complete(self, i: int, t_exit: float) -> None:
+        t = t_exit - self._entered_t
+        self.micro.record(i, t)
+        self._sector_sum += t
+        self._sector_count += 1
+        if (i + 1) % self.micro_per_sector == 0:
+            # a sector counts only if all of its micro-sectors were timed
+            if self._sector_count == self.micro_per_sector:
+                self.sectors.record(i // self.micro_per_sector, self._sector_sum)
+            self._sector_sum, self._sector_count = 0.0, 0
@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+# Optimal shift points from a learned torque curve, solved for all gears at
+# once. Wheel torque in gear g at engine speed r is T(r) * G_g; after an
+# upshift the engine drops to r * G_n / G_g. The optimal upshift is the first
+# rpm where T(r) * G_g <= T(r * G_n / G_g) * G_n, the downshift hint the first
+# rpm where staying in gear beats the lower one. Every (gear, rpm bin) pair is
+# evaluated as one 2D array, and the crossing is interpolated between the two
+# bracketing bins instead of snapping to the bin grid.
+
+UPSHIFT_MIN_RPM = 1200.0
+DOWNSHIFT_MIN_RPM = 1000.0
+DOWNSHIFT_FALLBACK_RPM = 1400.0
+
+
+@dataclass(frozen=True, slots=True)
+class ShiftTable:
+    up: Dict[int, float]  # gear -> upshift rpm, gears 1..N-1
+    down: Dict[int, float]  # gear -> downshift rpm, gears 2..N-1
+
+
+def _first_crossing(
+    rpm: np.ndarray, d: np.ndarray, valid: np.ndarray, hit: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per row, rpm of the first valid *hit*, interpolated on the sign change of *d*.
+
+    Returns ``(found, rpm_at_crossing)``.
+    """
+    found = hit.any(axis=1)
+    i = hit.argmax(axis=1)
+    rows = np.arange(d.shape[0])
+    out = rpm[i].astype(np.float64)
+
+    prev = np.maximum(i - 1, 0)
+    bracket = found & (i > 0) & valid[rows, prev] & ~hit[rows, prev]
+    d0 = d[rows, prev]
+    d1 = d[rows, i]
+    denom = d0 - d1
+    bracket &= denom != 0.0
+    t = np.where(bracket, d0 / np.where(denom == 0.0, 1.0, denom), 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    out = np.where(bracket, rpm[prev] + (rpm[i] - rpm[prev]) * t, out)
+    return found, out
+
+
+def solve_shift_points(
+    rpm: np.ndarray,
+    torque: np.ndarray,
+    gear_ratios: Sequence[float],
+    redline_rpm: float,
+) -> ShiftTable:
+    """Solve up- and downshift tables for all gears in one vectorised pass.
+
+    Parameters
+    ----------
+    rpm, torque : np.ndarray
+        Binned (smoothed) torque curve, ``rpm`` ascending.
+    gear_ratios : Sequence[float]
+        Ratios for gears 1..N. Gear pairs with a non-positive ratio are
+        skipped.
+    redline_rpm : float
+        Upshifts are searched up to this rpm; if no crossing is found the
+        upshift falls back to ``min(redline, rpm[-1])``.
+    """
+    rpm = np.asarray(rpm, dtype=np.float64)
+    torque = np.asarray(torque, dtype=np.float64)
+    G = np.asarray(gear_ratios, dtype=np.float64)
+    n = G.size
+    if n < 2 or rpm.size == 0:
+        return ShiftTable(up={}, down={})
+
+    # rows 0..n-2: gear g vs g+1 (upshift); rows n-1..: gear g vs g-1 (down)
+    g_cur = np.concatenate([G[:-1], G[1:-1]])
+    g_other = np.concatenate([G[1:], G[:-2]])
+    ok = (g_cur > 0) & (g_other > 0)
+    ratio = np.where(ok, g_other / np.where(g_cur > 0, g_cur, 1.0), 1.0)
+
+    t_cur = torque[None, :] * g_cur[:, None]
+    t_other = np.interp(rpm[None, :] * ratio[:, None], rpm, torque) * g_other[:, None]
+    d = t_cur - t_other
+
+    n_up = n - 1
+    up_valid = (rpm >= UPSHIFT_MIN_RPM) & (rpm <= redline_rpm)
+    up_valid = np.broadcast_to(up_valid, (n_up, rpm.size))
+    up_found, up_rpm = _first_crossing(
+        rpm, d[:n_up], up_valid, up_valid & (d[:n_up] <= 0)
+    )
+
+    dn_valid = np.broadcast_to(rpm >= DOWNSHIFT_MIN_RPM, (n - 2, rpm.size))
+    dn_found, dn_rpm = _first_crossing(
+        rpm, d[n_up:], dn_valid, dn_valid & (d[n_up:] >= 0)
+    )
+
+    up_fallback = min(redline_rpm, float(rpm[-1]))
+    up = {
+        g + 1: float(up_rpm[g]) if up_found[g] else up_fallback
+        for g in range(n_up)
+        if ok[g]
+    }
+    down = {
+        g + 2: float(dn_rpm[g]) if dn_found[g] else DOWNSHIFT_FALLBACK_RPM
+        for g in range(n - 2)
+        if ok[n_up + g]
+    }
+    return ShiftTable(up=up, down=down)
@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+# One normalised view of a telemetry packet, built once when the packet is
+# ingested and shared by the ECU worker and every widget. Fields are read
+# with defaults and converted here, so consumers do plain attribute loads
+# instead of repeating getattr()/float()/unit conversions per packet.
+
+MS_TO_KMH = 3.6
+REDLINE_MIN_RPM = 2000.0  # rpm_alert.max below this is not a usable redline
+_WHEEL_NAMES = ("front_left", "front_right", "rear_left", "rear_right")
+
+
+def normalize_throttle(t: float) -> float:
+    """Map the common telemetry throttle ranges (0..1, 0..100, 0..255) to 0..1."""
+    if t <= 1.2:
+        return max(0.0, min(1.0, t))
+    if t <= 110.0:
+        return min(1.0, t / 100.0)
+    if t <= 260.0:
+        return min(1.0, t / 255.0)
+    return 1.0
+
+
+def avg_wheel_radius(wheels: Any) -> Optional[float]:
+    """Mean of the positive wheel radii, for iterable or named wheels."""
+    if not wheels:
+        return None
+    try:
+        items = list(wheels)
+    except TypeError:
+        items = [getattr(wheels, name, None) for name in _WHEEL_NAMES]
+    radii = []
+    for w in items:
+        r = float(getattr(w, "radius", 0.0) or 0.0) if w is not None else 0.0
+        if r > 0:
+            radii.append(r)
+    if not radii:
+        return None
+    return sum(radii) / len(radii)
+
+
+@dataclass(frozen=True, slots=True)
+class TelemetryFrame:
+    """Per-packet values with defaults applied and derived fields precomputed.
+
+    ``packet`` keeps the raw packet for the rare field that is not mirrored
+    here. ``gear`` is the GT7 gear number (0 = reverse/neutral) and
+    ``gear_valid`` tells whether it indexes ``gear_ratios``. ``redline_rpm``
+    is ``rpm_alert.max`` when it is plausible; ``rpm_alert_min``/``_max`` are
+    the raw alert bounds (``None`` if the packet has none).
+    """
+
+    packet: Any
+    packet_id: Optional[int]
+    car_id: int
+    lap_count: int
+    paused: bool
+    loading: bool
+    rpm: float
+    gear: int
+    gear_valid: bool
+    gear_ratios: Tuple[float, ...]
+    speed_ms: float
+    speed_kmh: float
+    throttle_raw: float
+    throttle: float  # 0..1
+    brake: float
+    clutch: float  # 0 = engaged, 1 = pressed
+    wheel_radius: Optional[float]
+    rpm_alert_min: Optional[float]
+    rpm_alert_max: Optional[float]
+    redline_rpm: Optional[float]
+    position: Optional[Tuple[float, float]]  # (x, z) on the ground plane
+
+    @classmethod
+    def from_packet(cls, pkt: Any) -> "TelemetryFrame":
+        flags = getattr(pkt, "flags", None)
+        gear = int(getattr(pkt, "current_gear", 0) or 0)
+        ratios = tuple(float(g) for g in (getattr(pkt, "gear_ratios", None) or ()))
+        speed = float(getattr(pkt, "car_speed", 0.0) or 0.0)
+        throttle_raw = float(getattr(pkt, "throttle", 0.0) or 0.0)
+
+        alert = getattr(pkt, "rpm_alert", None)
+        alert_min = alert_max = None
+        if alert is not None:
+            alert_min = _opt_float(getattr(alert, "min", None))
+            alert_max = _opt_float(getattr(alert, "max", None))
+        redline = alert_max if alert_max and alert_max > REDLINE_MIN_RPM else None
+
+        pos = getattr(pkt, "position", None)
+        position = None if pos is None else (float(pos.x), float(pos.z))
+
+        return cls(
+            packet=pkt,
+            packet_id=getattr(pkt, "packet_id", None),
+            car_id=int(getattr(pkt, "car_id", 0) or 0),
+            lap_count=int(getattr(pkt, "lap_count", 0) or 0),
+            paused=bool(getattr(flags, "paused", False)),
+            loading=bool(getattr(flags, "loading_or_processing", False)),
+            rpm=float(getattr(pkt, "engine_rpm", 0.0) or 0.0),
+            gear=gear,
+            gear_valid=1 <= gear <= len(ratios),
+            gear_ratios=ratios,
+            speed_ms=speed,
+            speed_kmh=speed * MS_TO_KMH,
+            throttle_raw=throttle_raw,
+            throttle=normalize_throttle(throttle_raw),
+            brake=float(getattr(pkt, "brake", 0.0) or 0.0),
+            clutch=float(getattr(pkt, "clutch", 0.0) or 0.0),
+            wheel_radius=avg_wheel_radius(getattr(pkt, "wheels", None)),
+            rpm_alert_min=alert_min,
+            rpm_alert_max=alert_max,
+            redline_rpm=redline,
+            position=position,
+        )
+
+
+def _opt_float(v: Any) -> Optional[float]:
+    try:
+        return None if v is None else float(v)
+    except (TypeError, ValueError):
+        return None
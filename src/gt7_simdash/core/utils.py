@@ -1,14 +1,75 @@
+from collections import OrderedDict
 from enum import StrEnum
 from importlib.resources import as_file, files
+from typing import Iterable, Optional, Tuple
 
 import pygame
 
+FontKey = Tuple[str, Optional[str], int]  # (family, dir, size)
+
+
+class FontRegistry:
+    """Process-wide LRU cache of ``pygame.font.Font`` objects.
+
+    Fonts are keyed on ``(family, dir, size)`` so the package resource is
+    resolved and the TTF parsed only once per key. ``hits``/``misses`` let you
+    confirm that e.g. state transitions are served from memory.
+    """
+
+    def __init__(self, max_size: int = 48) -> None:
+        self.max_size = max(1, int(max_size))
+        self._fonts: OrderedDict[FontKey, pygame.font.Font] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, size: int, dir: str = None, name: str = None) -> pygame.font.Font:
+        key = (str(name), str(dir) if dir else None, int(size))
+        font = self._fonts.get(key)
+        if font is not None:
+            self._fonts.move_to_end(key)
+            self.hits += 1
+            return font
+        self.misses += 1
+        font = self._open(*key)
+        self._fonts[key] = font
+        if len(self._fonts) > self.max_size:
+            self._fonts.popitem(last=False)
+            self.evictions += 1
+        return font
+
+    def warm_up(self, specs: Iterable[Tuple[int, Optional[str], str]]) -> None:
+        """Preload ``(size, dir, name)`` specs without counting them as misses."""
+        misses = self.misses
+        for size, dir, name in specs:
+            self.get(size, dir=dir, name=name)
+        self.misses = misses
+
+    def clear(self) -> None:
+        self._fonts.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._fonts),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    @staticmethod
+    def _open(name: str, dir: Optional[str], size: int) -> pygame.font.Font:
+        p = f"assets/fonts/{dir}/{name}.ttf" if dir else f"assets/fonts/{name}.ttf"
+        font_res = files("gt7_simdash").joinpath(p)
+        with as_file(font_res) as font_path:
+            return pygame.font.Font(str(font_path), size)
+
+
+FONTS = FontRegistry()
+
 
 def load_font(size: int, dir: str = None, name: str = None):
-    p = f"assets/fonts/{dir}/{name}.ttf" if dir else f"assets/fonts/{name}.ttf"
-    font_res = files("gt7_simdash").joinpath(p)
-    with as_file(font_res) as font_path:
-        return pygame.font.Font(str(font_path), size)
+    return FONTS.get(size, dir=dir, name=name)
 
 
 class FontFamily(StrEnum):
@@ -22,3 +83,21 @@ class FontFamily(StrEnum):
     D_DIN_EXP_BOLD = "D-DINExp-Bold"
     SILKSCREEN = "slkscr"
     SILKSCREEN_EXPANDED = "sslkscre"
+
+
+# (size, dir, name) of the fonts the dashboard widgets load on construction
+DASHBOARD_FONTS: Tuple[Tuple[int, Optional[str], str], ...] = (
+    (300, "digital", FontFamily.DIGITAL_7_MONO),  # GearLabel
+    (120, "digital", FontFamily.DIGITAL_7_MONO),  # SpeedLabel
+    (64, "digital", FontFamily.DIGITAL_7_MONO),  # EstimatedLap
+    (30, "digital", FontFamily.DIGITAL_7_MONO),  # ShiftLights
+    (17, "d-din", FontFamily.D_DIN_BOLD),  # ShiftLights pills
+    (26, "digital", FontFamily.DIGITAL_7_MONO),  # GraphicalRPM, lap deltas
+    (14, "noto_sans", FontFamily.NOTOSANS_REGULAR),  # PerfOverlay
+    (32, None, FontFamily.DIGITAL_7_MONO),  # Button default
+    (32, "material_symbols", FontFamily.MATERIAL_SYMBOLS),  # Button icon default
+)
+
+
+def warm_up_fonts(specs: Iterable[Tuple[int, Optional[str], str]] = DASHBOARD_FONTS):
+    FONTS.warm_up(specs)
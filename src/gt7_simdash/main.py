@@ -1,50 +1,127 @@
+import argparse
 import datetime
+from typing import Optional
 
 import pygame
 
+from .bench import dashboard as bench_dashboard
+from .bench import simulator as bench_simulator
 from .config import Config, ConfigManager
+from .core.frame_pacer import MODES as FRAME_MODES
+from .core.frame_pacer import FramePacer
+from .core.logger import Logger
+from .core.replay import MODES, ReplayFeed
+from .core.utils import warm_up_fonts
+from .states.dashboard_state import DashboardState
 from .states.main_menu_state import MainMenuState
 from .states.state_manager import StateManager
 
 
-def run(conf: Config) -> int:
+def run(conf: Config, replay: Optional[ReplayFeed] = None) -> int:
     pygame.init()
 
-    screen = pygame.display.set_mode((conf.width, conf.height))
+    pacer = FramePacer.from_config(conf)
+    screen = pacer.set_mode((conf.width, conf.height))
+    warm_up_fonts()
 
-    main_menu = MainMenuState()
-    state_manager = StateManager(main_menu)
-    main_menu.state_manager = state_manager
+    if replay is not None:
+        # skip the menus and drive the dashboard from the capture
+        first_state = DashboardState(None, replay.start())
+    else:
+        first_state = MainMenuState()
+    state_manager = StateManager(first_state)
+    first_state.state_manager = state_manager
 
-    clock = pygame.time.Clock()
     state_manager.running = True
     take_screenshot = False
 
     while state_manager.running:
-        dt = clock.tick(60) / 1000  # 60 in fps, dt in seconds
-        for pygame_event in pygame.event.get():
+        dt = pacer.wait(state_manager.has_pending_frame)  # seconds
+        events = pygame.event.get()
+        if events:
+            pacer.note_input()
+        for pygame_event in events:
             if pygame_event.type == pygame.QUIT:
                 state_manager.running = False
             elif pygame_event.type == pygame.KEYDOWN:
                 if pygame_event.key == pygame.K_SPACE:
                     take_screenshot = True
+                elif replay is not None and pygame_event.key == pygame.K_RIGHT:
+                    # step mode: one packet, or a second's worth with shift
+                    shift = pygame_event.mod & pygame.KMOD_SHIFT
+                    replay.step(60 if shift else 1)
             state_manager.handle_event(pygame_event)
         state_manager.update(dt)
-        state_manager.draw(screen)
-        pygame.display.flip()
+        rects = state_manager.draw(screen)
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
         if take_screenshot:
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"gt7-simdash_{timestamp}.png"
             pygame.image.save(screen.convert(24), filename)
             take_screenshot = False
+        pacer.frame_done()
 
+    Logger("main").get().info(f"Frame pacing: {pacer.stats()}")
     pygame.quit()
     return 0
 
 
-def main() -> int:
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="gt7-simdash")
+    parser.add_argument(
+        "--replay", metavar="CAPTURE", help="play back a telemetry capture file"
+    )
+    parser.add_argument(
+        "--replay-mode",
+        choices=MODES,
+        default="realtime",
+        help="realtime (default), fast, or step (right arrow releases packets)",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        help="playback speed multiplier for realtime mode",
+    )
+    parser.add_argument(
+        "--loop", action="store_true", help="restart the replay when it ends"
+    )
+    parser.add_argument(
+        "--frame-mode",
+        choices=FRAME_MODES,
+        help="override the configured frame pacing (fixed, vsync, telemetry, idle)",
+    )
+    commands = parser.add_subparsers(dest="command")
+    bench_dashboard.add_arguments(
+        commands.add_parser("bench", help="headless frame-time benchmark")
+    )
+    bench_simulator.add_arguments(
+        commands.add_parser("sim", help="local GT7 telemetry simulator")
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.command == "bench":
+        return bench_dashboard.run(args)
+    if args.command == "sim":
+        return bench_simulator.run(args)
     config = ConfigManager.get_config()
-    return run(config)
+    if args.frame_mode:
+        config.frame_mode = args.frame_mode
+    replay = None
+    if args.replay:
+        replay = ReplayFeed(
+            args.replay,
+            mode=args.replay_mode,
+            speed=args.replay_speed,
+            loop=args.loop,
+        )
+    return run(config, replay)
 
 
 if __name__ == "__main__":
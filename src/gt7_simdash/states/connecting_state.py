@@ -214,6 +214,9 @@ class ConnectingState(State):
                 EnterIPState(self.state_manager, conf.recent_connected)
             )
 
+    def has_pending_frame(self):
+        return True  # the spinner animates every frame
+
     def exit(self):
         self.cancel_event.set()
         super().exit()
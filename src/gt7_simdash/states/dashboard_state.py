@@ -1,9 +1,18 @@
+import os
+import time
 from typing import Optional
 
-from granturismo.intake.feed import Feed, Packet
+import pygame
+from granturismo.intake.feed import Feed
 
+from ..config import ConfigManager
+from ..core.capture import CaptureRecorder
+from ..core.ecu import ECU
 from ..core.events import BACK_TO_MENU_RELEASED
+from ..core.ingest import TelemetryIngest
+from ..core.lap_store import LapStore
 from ..core.logger import Logger
+from ..core.telemetry_frame import TelemetryFrame
 from ..states.state_manager import StateManager
 from ..widgets.base.colors import Color
 from ..widgets.base.widget_group import WidgetGroup
@@ -11,6 +20,7 @@ from ..widgets.button_bar import ButtonBar
 from ..widgets.gear import GearLabel
 from ..widgets.graphical_rpm import GraphicalRPM
 from ..widgets.lap import EstimatedLap
+from ..widgets.perf_overlay import PerfOverlay
 from ..widgets.shift_lights import ShiftLights
 from ..widgets.speed import SpeedLabel
 from .state import State
@@ -21,17 +31,36 @@ class DashboardState(State):
         self,
         state_manager: StateManager,
         feed: Optional[Feed],
+        threaded: bool = True,
+        ecu_storage_dir: Optional[str] = None,
+        record: bool = True,
+        lap_storage_dir: Optional[str] = None,
     ):
+        """
+        ``threaded=False`` drains the feed and runs the ECU synchronously in
+        :meth:`update` instead of on background threads, so every frame sees
+        exactly the packets released before it (used by the benchmark).
+        ``record=False`` ignores the telemetry recording setting.
+        ``lap_storage_dir`` overrides the configured lap reference directory.
+        """
         super().__init__(state_manager)
         self.feed: Optional[Feed] = feed
+        self.threaded = threaded
+        self.record = record
+        self.ingest: Optional[TelemetryIngest] = (
+            TelemetryIngest(feed) if feed is not None else None
+        )
         self.logger = Logger(__class__.__name__).get()
-        self.packet: Optional[Packet] = None
+        self.frame: Optional[TelemetryFrame] = None  # of the newest packet
+        self.recorder: Optional[CaptureRecorder] = None
         # Create ECU-side model for learning curves
 
         shift_lights = ShiftLights(
             anchor=lambda size: (size[0] // 2, size[1] // 16),
             step_thresholds=[0.62, 0.78, 0.92, 0.985],
             color_thresholds=(0.5, 0.8),
+            ecu=ECU(ecu_storage_dir),
+            threaded=threaded,
         )
         # la widget tree
         self.widgets = WidgetGroup(
@@ -54,48 +83,106 @@ class DashboardState(State):
                     size=(260, 120),
                     sample_hz=10.0,
                     grid_m=0.25,
+                    store=self._open_lap_store(lap_storage_dir),
                 ),
             ]
         )
         self.widgets.add(shift_lights)
+        # F3: per-widget frame times, F4: dump them (kept on top)
+        self.widgets.add(PerfOverlay(self.widgets))
+        if self.ingest is not None:
+            # the ECU learns from every packet, not just the rendered ones
+            shift_lights.attach_source(self.ingest)
+
+        # dirty-region rendering: repaint everything on the first frame and
+        # whenever the window contents may have been lost
+        self._full_redraw = True
+        self.pixels_pushed = 0
 
     def enter(self):
         super().enter()
         self.widgets.enter()
+        self._full_redraw = True
+        if self.ingest is not None:
+            self._start_recording()
+            if self.threaded:
+                self.ingest.start()
 
     def exit(self):
-        try:
-            if self.feed is not None:
-                self.feed.close()
-        except Exception:
-            pass
+        if self.ingest is not None:
+            self.logger.info(f"Telemetry ingest: {self.ingest.stats()}")
+            self.ingest.close()  # also closes the feed
+        self.ingest = None
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
         self.feed = None
         self.widgets.exit()
         super().exit()
 
     def handle_event(self, event):
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self._full_redraw = True
         self.widgets.handle_event(event)
 
     def update(self, dt):
         super().update(dt)
-        if not self.feed:
+        if not self.ingest:
             return
-        try:
-            pkt: Packet | None = self.feed.get_nowait()
-            if pkt:
-                self.packet = pkt
-        except Exception as e:
-            self.logger.info({e})
+        if not self.threaded:
+            self.ingest.pump()
+        stamped = self.ingest.take_latest()
+        if stamped is not None:
+            self.frame = stamped.frame
+
+        if self.frame is not None:
+            self.widgets.update(self.frame, dt)
 
-        if self.packet:
-            self.widgets.update(self.packet, dt)
+    def has_pending_frame(self):
+        if self._full_redraw or super().has_pending_frame():
+            return True
+        if self.ingest is None:
+            return False
+        if not self.threaded:
+            return True  # the feed is only pumped from update()
+        return self.ingest.has_new()
 
     def draw(self, surface):
-        surface.fill(Color.BLACK.rgb())
-        self.widgets.draw(surface)
+        if self._full_redraw:
+            self._full_redraw = False
+            surface.fill(Color.BLACK.rgb())
+            self.widgets.draw(surface)
+            self.pixels_pushed = self.widgets.pixels_pushed
+            return None
+        rects = self.widgets.draw_dirty(surface, Color.BLACK.rgb())
+        self.pixels_pushed = self.widgets.pixels_pushed
+        return rects
+
+    def _open_lap_store(self, storage_dir: Optional[str]) -> Optional[LapStore]:
+        storage_dir = storage_dir or ConfigManager.get_config().lap_reference_dir
+        try:
+            return LapStore(storage_dir)
+        except OSError as e:
+            self.logger.info(f"Lap references will not be saved: {e}")
+            return None
+
+    def _start_recording(self) -> None:
+        conf = ConfigManager.get_config()
+        if not (self.record and conf.record_telemetry) or self.recorder is not None:
+            return
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(os.path.expanduser(conf.capture_dir), f"gt7_{stamp}.gt7cap")
+        try:
+            self.recorder = CaptureRecorder(
+                path, compress=conf.capture_compress
+            ).start()
+        except OSError as e:
+            self.logger.info(f"Telemetry recording disabled: {e}")
+            return
+        self.ingest.subscribe(self.recorder.submit)
+        self.logger.info(f"Recording telemetry to {path}")
 
     def on_back(self, event=None):
-        from ..config import ConfigManager
         from .enter_ip_state import EnterIPState
 
         conf = ConfigManager.get_config()
@@ -26,10 +26,23 @@ class State(ABC):
     @abstractmethod
     def draw(self, surface):
         """
-        Draw all widgets on surface
+        Draw all widgets on surface.
+        Return None to present the whole surface, or a list of rects to only
+        push those regions to the display.
         """
         pass
 
+    def has_pending_frame(self):
+        """
+        Return True if the next frame would show something new (telemetry,
+        animation, a due transition). Used by the frame pacer to decide
+        whether to render early; static screens return False.
+        """
+        if self._pending_transition is None:
+            return False
+        _, trigger_time = self._pending_transition
+        return pygame.time.get_ticks() / 1000.0 >= trigger_time
+
     def enter(self):
         """
         Add extra listeners, start actions
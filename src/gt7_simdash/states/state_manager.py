@@ -15,7 +15,10 @@ class StateManager:
         self.current_state.update(dt)
 
     def draw(self, surface):
-        self.current_state.draw(surface)
+        return self.current_state.draw(surface)
+
+    def has_pending_frame(self):
+        return self.current_state.has_pending_frame()
 
     def change_state(self, new_state):
         self.current_state.exit()
@@ -0,0 +1,163 @@
+"""Glyph-atlas text rendering for high-frequency numeric labels.
+
+`GlyphAtlasLabel` is a drop-in for :class:`Label` that never calls
+``font.render`` for the characters it has already seen. Each glyph is
+rasterised once per (font, color, antialias) into a shared `GlyphAtlas`;
+text is then composed by blitting the cached glyph surfaces side by side.
+
+Glyphs are placed by their individual advance, so kerning is ignored. That
+is exact for the monospaced Digital-7 font used by the dashboard readouts.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import pygame
+
+from ...widgets.base.colors import Color
+
+# speed, gear, rpm and lap/delta readouts only ever show these
+NUMERIC_CHARSET = "0123456789-.:RN "
+# shared atlases kept alive; labels hold on to theirs after eviction
+MAX_ATLASES = 32
+
+
+class GlyphAtlas:
+    """Rasterised glyphs for one font/color/antialias combination.
+
+    The charset is rendered up front; characters outside of it are rasterised
+    on first use and kept as well.
+    """
+
+    def __init__(
+        self,
+        font: pygame.font.Font,
+        color: Tuple[int, int, int],
+        antialias: bool = True,
+        charset: str = NUMERIC_CHARSET,
+    ) -> None:
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        self.height = font.get_height()
+        self._glyphs: Dict[str, pygame.Surface] = {}
+        for ch in charset:
+            self._rasterise(ch)
+
+    def glyph(self, ch: str) -> pygame.Surface:
+        g = self._glyphs.get(ch)
+        if g is None:
+            g = self._rasterise(ch)
+        return g
+
+    def layout(self, text: str) -> Tuple[List[Tuple[pygame.Surface, int]], int]:
+        """Return ``([(glyph, x_offset), ...], total_width)`` for *text*."""
+        placed = []
+        x = 0
+        for ch in text:
+            g = self.glyph(ch)
+            placed.append((g, x))
+            x += g.get_width()
+        return placed, x
+
+    def _rasterise(self, ch: str) -> pygame.Surface:
+        g = self.font.render(ch, self.antialias, self.color)
+        self._glyphs[ch] = g
+        return g
+
+
+_ATLASES: OrderedDict[tuple, GlyphAtlas] = OrderedDict()
+
+
+def get_atlas(
+    font: pygame.font.Font, color: Tuple[int, int, int], antialias: bool = True
+) -> GlyphAtlas:
+    """Return the shared atlas for *font*/*color*/*antialias*.
+
+    Atlases live in a small LRU, so a font evicted from the font registry is
+    not kept alive by its atlas for long.
+    """
+    key = (font, tuple(color), bool(antialias))
+    atlas = _ATLASES.get(key)
+    if atlas is not None:
+        _ATLASES.move_to_end(key)
+        return atlas
+    atlas = GlyphAtlas(font, tuple(color), bool(antialias))
+    _ATLASES[key] = atlas
+    if len(_ATLASES) > MAX_ATLASES:
+        _ATLASES.popitem(last=False)
+    return atlas
+
+
+class GlyphAtlasLabel:
+    """Label whose text is composed from cached glyphs instead of re-rendered.
+
+    Same constructor and attributes as :class:`Label` (``text``, ``font``,
+    ``color``, ``pos``, ``center``, ``antialias``, ``rect``, ``surface``), so
+    it can replace it wherever the text changes every frame. Assigning
+    ``color`` switches to the matching atlas without re-rasterising.
+    """
+
+    def __init__(
+        self,
+        text,
+        font: pygame.font.Font = None,
+        color: tuple[int, int, int] = Color.WHITE.rgb(),
+        pos: tuple[int, int] = (0, 0),
+        center: bool = True,
+        antialias: bool = True,
+    ):
+        self.text = text
+        self.font = font
+        self.pos = pos
+        self.center = center
+        self.antialias = antialias
+        self._color = color
+        self._atlas = get_atlas(font, color, antialias)
+        self._surface = None
+        self._layout_text()
+
+    @property
+    def color(self) -> tuple[int, int, int]:
+        return self._color
+
+    @color.setter
+    def color(self, value: tuple[int, int, int]) -> None:
+        if value != self._color:
+            self._color = value
+            self._atlas = get_atlas(self.font, value, self.antialias)
+            self._layout_text(keep_pos=True)
+
+    @property
+    def surface(self) -> pygame.Surface:
+        """Composed text surface, built lazily for callers that need one."""
+        if self._surface is None:
+            surf = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            surf.blits([(g, (dx, 0)) for g, dx in self._glyphs], doreturn=False)
+            self._surface = surf
+        return self._surface
+
+    def _layout_text(self, keep_pos: bool = False):
+        """Lay out cached glyphs whenever text changes."""
+        self._glyphs, width = self._atlas.layout(self.text)
+        self._surface = None
+        if keep_pos:
+            self.rect.size = (width, self._atlas.height)
+            return
+        self.rect = pygame.Rect(0, 0, width, self._atlas.height)
+        if self.center:
+            self.rect.center = self.pos
+        else:
+            self.rect.topleft = self.pos
+
+    def set_text(self, text: str) -> bool:
+        """Update the text. Returns ``True`` if the text changed."""
+        if text != self.text:
+            self.text = text
+            self._layout_text()
+            return True
+        return False
+
+    def draw(self, surface: pygame.Surface):
+        x, y = self.rect.topleft
+        surface.blits([(g, (x + dx, y)) for g, dx in self._glyphs], doreturn=False)
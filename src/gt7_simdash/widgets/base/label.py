@@ -29,11 +29,13 @@ class Label:
         else:
             self.rect = self.surface.get_rect(topleft=self.pos)
 
-    def set_text(self, text: str):
-        """Update the text and re-render."""
+    def set_text(self, text: str) -> bool:
+        """Update the text and re-render. Returns ``True`` if the text changed."""
         if text != self.text:
             self.text = text
             self._render_text()
+            return True
+        return False
 
     def draw(self, surface: pygame.Surface):
         surface.blit(self.surface, self.rect)
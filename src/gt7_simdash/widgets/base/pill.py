@@ -0,0 +1,103 @@
+"""Pre-composed rounded "pill" badges (text on a bordered rounded box).
+
+`PillRenderer` keeps the finished pill surfaces in a bounded LRU keyed on
+``(text, bg)``, so a pill whose text and colour did not change costs a single
+blit. The rounded boxes themselves are cached per ``(size, bg)``; a new
+string only renders its text onto a copy of an existing box.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import pygame
+
+from ...widgets.base.colors import Color
+
+RGB = Tuple[int, int, int]
+
+DEFAULT_MAX_PILLS = 64
+
+
+class PillRenderer:
+    """Bounded cache of composed pill surfaces for one font and style."""
+
+    def __init__(
+        self,
+        font: pygame.font.Font,
+        fg: RGB = (240, 240, 250),
+        border: RGB = Color.BLACK.rgb(),
+        pad: int = 10,
+        radius: int = 10,
+        border_width: int = 2,
+        max_pills: int = DEFAULT_MAX_PILLS,
+    ) -> None:
+        self.font = font
+        self.fg = tuple(fg)
+        self.border = tuple(border)
+        self.pad = pad
+        self.radius = radius
+        self.border_width = border_width
+        self.max_pills = max(1, int(max_pills))
+        self._pills: OrderedDict[Tuple[str, RGB], pygame.Surface] = OrderedDict()
+        self._boxes: Dict[Tuple[int, int, RGB], pygame.Surface] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, text: str, bg: RGB) -> pygame.Surface:
+        """Return the pill for *text* on *bg*, composing it on first use."""
+        key = (text, tuple(bg))
+        pill = self._pills.get(key)
+        if pill is not None:
+            self._pills.move_to_end(key)
+            self.hits += 1
+            return pill
+        self.misses += 1
+        pill = self._compose(text, key[1])
+        self._pills[key] = pill
+        if len(self._pills) > self.max_pills:
+            self._pills.popitem(last=False)
+            self.evictions += 1
+        return pill
+
+    def draw(self, surface: pygame.Surface, x: int, y: int, text: str, bg: RGB):
+        """Blit the pill with its top-left at ``(x, y)``; returns its rect."""
+        pill = self.render(text, bg)
+        return surface.blit(pill, (x, y))
+
+    def clear(self) -> None:
+        self._pills.clear()
+        self._boxes.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._pills),
+            "max_size": self.max_pills,
+            "boxes": len(self._boxes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _compose(self, text: str, bg: RGB) -> pygame.Surface:
+        timg = self.font.render(text, True, self.fg)
+        size = (timg.get_width() + 2 * self.pad, timg.get_height() + 2 * self.pad)
+        pill = self._box(size, bg).copy()
+        pill.blit(timg, (self.pad, self.pad))
+        return pill
+
+    def _box(self, size: Tuple[int, int], bg: RGB) -> pygame.Surface:
+        # a handful of widths per pill (digit count, proportional glyphs)
+        key = (size[0], size[1], bg)
+        box = self._boxes.get(key)
+        if box is None:
+            if len(self._boxes) >= 4 * self.max_pills:
+                self._boxes.clear()
+            box = pygame.Surface(size, pygame.SRCALPHA)
+            r = box.get_rect()
+            pygame.draw.rect(box, bg, r, border_radius=self.radius)
+            pygame.draw.rect(
+                box, self.border, r, width=self.border_width, border_radius=self.radius
+            )
+            self._boxes[key] = box
+        return box
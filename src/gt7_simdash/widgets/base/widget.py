@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Tuple
+from typing import Any, Callable, List, Optional, Tuple
 
-from granturismo.model.packet import Packet
+import pygame
+
+from ...core.telemetry_frame import TelemetryFrame
 
 Anchor = Callable[[Tuple[int, int]], Tuple[int, int]]
 
@@ -10,10 +12,25 @@ class Widget(ABC):
     """Interface every on-screen control implements.
 
     The interface is intentionally small so widgets can be lightweight and
-    composable. All widgets should accept the same *model* (the telemetry
-    ``Packet``) in :meth:`update` to remain decoupled from higher-level state.
+    composable. All widgets should accept the same *model* (the per-packet
+    :class:`TelemetryFrame`) in :meth:`update` to remain decoupled from
+    higher-level state.
+
+    Widgets also take part in dirty-region rendering: a widget flags itself
+    with :meth:`mark_dirty` whenever its visuals change and records the screen
+    area it painted in ``_drawn_rects`` from :meth:`draw`. Widgets that never
+    record a footprint force their :class:`WidgetGroup` into a full redraw.
+
+    Updates can be change-driven: a widget lists the :class:`TelemetryFrame`
+    fields it reads in ``inputs`` and its group skips :meth:`update` while
+    none of them changed. ``None`` (the default) means the widget is updated
+    every frame; time-driven widgets report :meth:`is_animating` instead.
     """
 
+    inputs: Optional[Tuple[str, ...]] = None
+    _dirty: bool = True
+    _drawn_rects: Optional[List[pygame.Rect]] = None
+
     def enter(self) -> None:
         """Called when the widget becomes active/visible.
 
@@ -56,14 +73,15 @@ class Widget(ABC):
         return False
 
     @abstractmethod
-    def update(self, model: Packet, dt: float) -> None:
+    def update(self, model: TelemetryFrame, dt: float) -> None:
         """Advance internal state for the current frame.
 
         Parameters
         ----------
         model : Any
-            The data model for this frame; in this project it's the telemetry
-            ``Packet``. Widgets read any fields they need from it.
+            The data model for this frame; in this project it's the
+            :class:`TelemetryFrame` of the newest packet, with values already
+            defaulted and converted. The raw packet is ``model.packet``.
         dt : float
             Delta time in seconds since the previous frame (for animations or
             smoothing). Widgets may ignore this if not needed.
@@ -81,3 +99,33 @@ class Widget(ABC):
             display or clear the surface; that is managed by the caller.
         """
         ...
+
+    def is_animating(self) -> bool:
+        """Return ``True`` if the next frame needs :meth:`update` even though
+        none of ``inputs`` changed (timers, flashing, asynchronous data).
+
+        Skipped frames are not replayed: the *dt* of the next update is that
+        frame's own, so a widget integrating time must stay animating while
+        its clock runs.
+        """
+        return False
+
+    def mark_dirty(self) -> None:
+        """Flag the widget so the next partial redraw repaints it."""
+        self._dirty = True
+
+    def clear_dirty(self) -> None:
+        """Reset the dirty flag once the widget's current state is on screen."""
+        self._dirty = False
+
+    def is_dirty(self) -> bool:
+        """Return ``True`` if the widget changed since it was last drawn."""
+        return self._dirty
+
+    def dirty_rects(self) -> Optional[List[pygame.Rect]]:
+        """Return the screen rects covered by the last :meth:`draw` call.
+
+        ``None`` means the footprint is unknown and the whole surface has to be
+        treated as damaged.
+        """
+        return self._drawn_rects
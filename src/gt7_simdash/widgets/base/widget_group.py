@@ -1,5 +1,10 @@
-from typing import Any, Iterable, List
+import json
+import time
+from typing import Any, Dict, Iterable, List, Optional
 
+import pygame
+
+from ...core.perf import DEFAULT_RING_SIZE, TimingRing, summarize
 from ...widgets.base.widget import Widget
 
 
@@ -8,6 +13,18 @@ class WidgetGroup(Widget):
 
     Children are drawn in insertion order. Events are dispatched in reverse
     order (top-most first) and stop at the first child that returns ``True``.
+
+    Besides the plain full :meth:`draw`, the group can act as a retained-mode
+    compositor via :meth:`draw_dirty`, repainting only the children that
+    changed since the previous frame.
+
+    With :meth:`set_instrumented` the group times every child's update and
+    draw with ``perf_counter_ns`` into fixed-size rings (one sample per frame
+    and phase), readable via :meth:`timing_stats` and :meth:`dump_timings`.
+
+    Updates are change-driven: a child whose declared ``inputs`` are equal in
+    this frame and the previous one, and which is not animating, is skipped
+    and stays clean. :meth:`update_stats` counts updates and skips per child.
     """
 
     def __init__(self, children: Iterable[Widget] | None = None) -> None:
@@ -19,14 +36,29 @@ class WidgetGroup(Widget):
             Optional sequence of child widgets to add in order.
         """
         self.children: List[Widget] = list(children or [])
+        # pixels covered by the rects handed to the display in the last frame
+        self.pixels_pushed: int = 0
+        # per-child timing rings, index-aligned with children; None when off
+        self._timing_capacity: int = DEFAULT_RING_SIZE
+        self._timing_names: Optional[List[str]] = None
+        self._update_rings: Optional[List[TimingRing]] = None
+        self._draw_rings: Optional[List[TimingRing]] = None
+        self._draw_acc: List[int] = []
+        # change-driven updates: previous frame and per-child counters
+        self._last_model: Any = None
+        self._update_counts: List[int] = []
+        self._skip_counts: List[int] = []
+        self._reset_update_counts()
 
     def add(self, w: Widget) -> None:
         """Append a child widget at the end (top-most draw order)."""
         self.children.append(w)
+        self._children_changed()
 
     def extend(self, ws: Iterable[Widget]) -> None:
         """Append multiple child widgets in order."""
         self.children.extend(ws)
+        self._children_changed()
 
     def remove(self, w: Widget) -> None:
         """Remove the first matching child widget.
@@ -37,14 +69,17 @@ class WidgetGroup(Widget):
             If the widget is not a child of this group.
         """
         self.children.remove(w)
+        self._children_changed()
 
     def clear(self) -> None:
         """Remove all children from this group."""
         self.children.clear()
+        self._children_changed()
 
     # lifecycle
     def enter(self) -> None:
         """Propagate :meth:`Widget.enter` to all children in order."""
+        self._last_model = None  # first frame updates everyone
         for w in self.children:
             w.enter()
 
@@ -64,11 +99,238 @@ class WidgetGroup(Widget):
         return False
 
     def update(self, model: Any, dt: float) -> None:
-        """Advance all children one frame using the shared *model* and *dt*."""
-        for w in self.children:
+        """Advance the children whose inputs changed using *model* and *dt*.
+
+        A child is skipped when it declares ``inputs``, none of those fields
+        differ from the previous *model* and it is not animating. The same
+        *model* object twice in a row (no new packet) changes nothing.
+        """
+        prev, self._last_model = self._last_model, model
+        rings = self._update_rings
+        clock = time.perf_counter_ns
+        for i, w in enumerate(self.children):
+            if prev is not None and not self._needs_update(w, prev, model):
+                self._skip_counts[i] += 1
+                if rings is not None:
+                    rings[i].add(0)
+                continue
+            self._update_counts[i] += 1
+            if rings is None:
+                w.update(model, dt)
+                continue
+            t0 = clock()
             w.update(model, dt)
+            rings[i].add(clock() - t0)
+
+    @staticmethod
+    def _needs_update(w: Widget, prev: Any, model: Any) -> bool:
+        inputs = w.inputs
+        if inputs is None or w.is_animating():
+            return True
+        if model is prev:
+            return False
+        return any(
+            getattr(model, name, None) != getattr(prev, name, None) for name in inputs
+        )
 
     def draw(self, surface: Any) -> None:
         """Draw all children in insertion order onto *surface*."""
+        for i, w in enumerate(self.children):
+            self._draw_child(i, w, surface)
+            w.clear_dirty()
+        self.pixels_pushed = surface.get_width() * surface.get_height()
+        self._commit_draw_timings()
+
+    # dirty-region rendering
+    def mark_dirty(self) -> None:
+        """Flag every child for repaint."""
         for w in self.children:
+            w.mark_dirty()
+
+    def clear_dirty(self) -> None:
+        for w in self.children:
+            w.clear_dirty()
+
+    def is_dirty(self) -> bool:
+        return any(w.is_dirty() for w in self.children)
+
+    def dirty_rects(self) -> Optional[List[pygame.Rect]]:
+        rects: List[pygame.Rect] = []
+        for w in self.children:
+            r = w.dirty_rects()
+            if r is None:
+                return None
+            rects.extend(r)
+        return rects
+
+    def draw_dirty(
+        self, surface: pygame.Surface, background: Any
+    ) -> Optional[List[pygame.Rect]]:
+        """Repaint only the children that changed since the last frame.
+
+        The previous footprints of dirty children are cleared to *background*,
+        then children are drawn in order: dirty ones in full, clean ones only
+        where they overlap a cleared area or a dirty child drawn below them
+        (via ``set_clip``).
+
+        Returns
+        -------
+        list[pygame.Rect] | None
+            Rects to hand to ``pygame.display.update`` (empty if nothing
+            changed), or ``None`` if a child could not report its footprint and
+            the whole surface was redrawn instead (the caller should flip).
+        """
+        if any(w.dirty_rects() is None for w in self.children):
+            surface.fill(background)
+            self.draw(surface)
+            return None
+
+        dirty = [w for w in self.children if w.is_dirty()]
+        if not dirty:
+            self.pixels_pushed = 0
+            self._commit_draw_timings()
+            return []
+
+        bounds = surface.get_rect()
+        cleared = [r.clip(bounds) for w in dirty for r in w.dirty_rects()]
+        cleared = [r for r in cleared if r.w > 0 and r.h > 0]
+        for r in cleared:
+            surface.fill(background, r)
+
+        # damaged so far: cleared footprints plus what dirty children below
+        # painted, which may reach past their old footprint
+        updated = list(cleared)
+        for i, w in enumerate(self.children):
+            if w.is_dirty():
+                self._draw_child(i, w, surface)
+                w.clear_dirty()
+                drawn = (r.clip(bounds) for r in w.dirty_rects() or [])
+                updated.extend(r for r in drawn if r.w > 0 and r.h > 0)
+                continue
+            footprint = w.dirty_rects()
+            for r in updated:
+                if r.collidelist(footprint) != -1:
+                    surface.set_clip(r)
+                    self._draw_child(i, w, surface)
+            surface.set_clip(None)
+
+        self.pixels_pushed = sum(r.w * r.h for r in updated)
+        self._commit_draw_timings()
+        return updated
+
+    # instrumentation
+    def set_instrumented(
+        self, on: bool = True, capacity: int = DEFAULT_RING_SIZE
+    ) -> None:
+        """Start (with empty rings of *capacity* frames) or stop child timing."""
+        self._timing_capacity = max(1, int(capacity))
+        self._timing_names = [] if on else None
+        self._reset_timing_layout()
+
+    def is_instrumented(self) -> bool:
+        return self._timing_names is not None
+
+    def reset_timings(self) -> None:
+        """Drop all samples and update counts collected so far, keeping
+        instrumentation on."""
+        for ring in (self._update_rings or []) + (self._draw_rings or []):
+            ring.clear()
+        self._reset_update_counts()
+
+    def update_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-child ``{"updates": n, "skipped": n}`` since the last reset."""
+        return {
+            name: {"updates": u, "skipped": k}
+            for name, u, k in zip(
+                self._child_names(), self._update_counts, self._skip_counts
+            )
+        }
+
+    def timing_stats(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Per-child ``{"update": summary, "draw": summary}`` in milliseconds.
+
+        Samples are per frame: a child that was skipped or not repainted in a
+        frame contributes a zero, so the figures reflect its real cost per
+        frame.
+        """
+        if self._timing_names is None:
+            return {}
+        return {
+            name: {"update": summarize(u.values()), "draw": summarize(d.values())}
+            for name, u, d in zip(
+                self._timing_names, self._update_rings, self._draw_rings
+            )
+        }
+
+    def dump_timings(self, path: str) -> None:
+        """Write :meth:`timing_stats` plus the raw samples (ns) as JSON."""
+        raw = {}
+        if self._timing_names is not None:
+            raw = {
+                name: {"update": u.values().tolist(), "draw": d.values().tolist()}
+                for name, u, d in zip(
+                    self._timing_names, self._update_rings, self._draw_rings
+                )
+            }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "created": time.time(),
+                    "capacity": self._timing_capacity,
+                    "widgets": self.timing_stats(),
+                    "updates": self.update_stats(),
+                    "samples_ns": raw,
+                },
+                f,
+                indent=2,
+            )
+
+    def _child_names(self) -> List[str]:
+        names: List[str] = []
+        for w in self.children:
+            name = type(w).__name__
+            if name in names:
+                name = f"{name}#{len(names)}"
+            names.append(name)
+        return names
+
+    def _children_changed(self) -> None:
+        # counters are index-aligned too; the next frame updates every child
+        self._last_model = None
+        self._reset_update_counts()
+        self._reset_timing_layout()
+
+    def _reset_update_counts(self) -> None:
+        n = len(self.children)
+        self._update_counts = [0] * n
+        self._skip_counts = [0] * n
+
+    def _reset_timing_layout(self) -> None:
+        # children changed (or instrumentation toggled): rebuild index-aligned rings
+        if self._timing_names is None:
+            self._update_rings = self._draw_rings = None
+            self._draw_acc = []
+            return
+        names = self._child_names()
+        n = len(names)
+        self._timing_names = names
+        self._update_rings = [TimingRing(self._timing_capacity) for _ in range(n)]
+        self._draw_rings = [TimingRing(self._timing_capacity) for _ in range(n)]
+        self._draw_acc = [0] * n
+
+    def _draw_child(self, i: int, w: Widget, surface: Any) -> None:
+        if self._draw_rings is None:
             w.draw(surface)
+            return
+        t0 = time.perf_counter_ns()
+        w.draw(surface)
+        self._draw_acc[i] += time.perf_counter_ns() - t0
+
+    def _commit_draw_timings(self) -> None:
+        # one sample per child and frame, however often it was drawn (clips)
+        if self._draw_rings is None:
+            return
+        acc = self._draw_acc
+        for i, ring in enumerate(self._draw_rings):
+            ring.add(acc[i])
+            acc[i] = 0
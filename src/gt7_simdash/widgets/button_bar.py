@@ -13,6 +13,8 @@ class ButtonBar(Widget):
     via the composed group while exposing a clean widget interface.
     """
 
+    inputs = ()  # event-driven, never needs update()
+
     def __init__(
         self,
         rect=(40, 540, 100, 50),
@@ -60,7 +62,10 @@ class ButtonBar(Widget):
         Returns ``True`` if a registered callback was invoked for this event
         (i.e., the event is considered consumed by this control).
         """
+        before = [b.state for b in self._group.buttons]
         self._group.handle_event(event)
+        if before != [b.state for b in self._group.buttons]:
+            self.mark_dirty()
         callback = self._on_events.get(getattr(event, "type", None))
         if callback:
             callback(event)
@@ -74,3 +79,4 @@ class ButtonBar(Widget):
     def draw(self, surface: Any) -> None:
         """Delegate rendering to the internal :class:`ButtonGroup`."""
         self._group.draw(surface)
+        self._drawn_rects = [b.rect.copy() for b in self._group.buttons]
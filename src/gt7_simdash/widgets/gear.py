@@ -1,16 +1,19 @@
 from typing import Any
 
+from ..core.telemetry_frame import TelemetryFrame
 from ..core.utils import FontFamily, load_font
 from ..widgets.base.colors import Color
-from ..widgets.base.label import Label
+from ..widgets.base.glyph_atlas_label import GlyphAtlasLabel
 from ..widgets.base.widget import Anchor, Widget
 
 
 class GearLabel(Widget):
     """Gear indicator implemented via composition: owns a Label internally."""
 
+    inputs = ("gear",)
+
     def __init__(self, anchor: Anchor) -> None:
-        self._label = Label(
+        self._label = GlyphAtlasLabel(
             text="0",
             font=load_font(size=300, dir="digital", name=FontFamily.DIGITAL_7_MONO),
             color=Color.BLUE.rgb(),
@@ -35,11 +38,13 @@ class GearLabel(Widget):
     def handle_event(self, event: Any) -> bool:
         return False
 
-    def update(self, model: Any, dt: float) -> None:
-        gear = int(getattr(model, "current_gear", 0) or 0)
-        self._label.set_text("R" if gear == 0 else str(gear))
+    def update(self, model: TelemetryFrame, dt: float) -> None:
+        gear = model.gear
+        if self._label.set_text("R" if gear == 0 else str(gear)):
+            self.mark_dirty()
 
     def draw(self, surface: Any) -> None:
         w, h = surface.get_size()
         self._label.rect.center = self._anchor((w, h))
         self._label.draw(surface)
+        self._drawn_rects = [self._label.rect.copy()]
@@ -2,8 +2,8 @@ import math
 from typing import Any
 
 import pygame
-from granturismo.model.packet import Packet
 
+from ..core.telemetry_frame import TelemetryFrame
 from ..core.utils import FontFamily, load_font
 from ..widgets.base.colors import Color
 from ..widgets.base.label import Label
@@ -11,6 +11,17 @@ from ..widgets.base.widget import Widget
 
 
 class GraphicalRPM(Widget):
+    """Horizontal rpm bar with an adaptive tick scale.
+
+    The static scale (ticks, redline colouring, min/max labels) is rendered
+    once into a cached surface keyed on ``(width, max_rpm, redline, tick
+    step)``; a frame is one blit of it plus the fill segments.
+    ``scale_rebuilds`` counts how often the cache had to be rebuilt, which
+    should only happen when the car (and with it the rpm range) changes.
+    """
+
+    inputs = ("rpm", "rpm_alert_min", "rpm_alert_max")
+
     def __init__(
         self,
         alert_min,
@@ -49,13 +60,19 @@ class GraphicalRPM(Widget):
             center=False,
         )
         self.max_label = Label(
-            text=str(self._max_rpm),
+            text=str(self._normalize(self._max_rpm)),
             font=load_font(size=26, dir="digital", name=self.font_name),
             color=Color.LIGHT_GREY.rgb(),
             pos=(0, 0),
             center=False,
         )
 
+        # cached scale surface and where it sits relative to (bar_left, y)
+        self._scale_surface = None
+        self._scale_key = None
+        self._scale_offset = (0, 0)
+        self.scale_rebuilds = 0
+
         self._recompute_geometry()
 
     @property
@@ -64,7 +81,10 @@ class GraphicalRPM(Widget):
 
     @max_rpm.setter
     def max_rpm(self, value):
-        self._max_rpm = max(1, int(value))
+        value = max(1, int(value))
+        if value == self._max_rpm:
+            return
+        self._max_rpm = value
         self.current_rpm = max(0, min(self.current_rpm, self._max_rpm))
         self.max_label.set_text(str(self._normalize(self._max_rpm)))
         self._recompute_geometry()
@@ -77,6 +97,7 @@ class GraphicalRPM(Widget):
     def width(self, value):
         self._width = max(1, int(value))
         self._recompute_geometry()
+        self.mark_dirty()
 
     @property
     def redline_rpm(self):
@@ -130,18 +151,11 @@ class GraphicalRPM(Widget):
         # actual minor tick count (inclusive end tick in drawing)
         self._tick_count = math.ceil(self._max_rpm / self._tick_step_rpm)
 
-    def update(self, packet: Packet, dt: float | None = None) -> None:
-        """Reads values from Packet for current frame dt"""
-        rpm_alert = getattr(packet, "rpm_alert", None)
-
-        new_redline = (
-            int(getattr(rpm_alert, "min", self.redline_rpm))
-            if rpm_alert
-            else self.redline_rpm
-        )
-        new_max = (
-            int(getattr(rpm_alert, "max", self.max_rpm)) if rpm_alert else self.max_rpm
-        )
+    def update(self, frame: TelemetryFrame, dt: float | None = None) -> None:
+        """Reads values from the TelemetryFrame for current frame dt"""
+        alert_min, alert_max = frame.rpm_alert_min, frame.rpm_alert_max
+        new_redline = int(alert_min) if alert_min is not None else self.redline_rpm
+        new_max = int(alert_max) if alert_max is not None else self.max_rpm
 
         # If these change, setters will recompute geometry
         self.redline_rpm = new_redline
@@ -149,27 +163,21 @@ class GraphicalRPM(Widget):
 
         self.alert_min = self.redline_rpm
 
-        rpm = int(getattr(packet, "engine_rpm", 0) or 0)
+        rpm = int(frame.rpm)
+        before = (self.current_rpm, self._max_rpm, self._redline_rpm, self._alert_min)
         self.current_rpm = max(0, min(rpm, self._max_rpm))
+        if before != (
+            self.current_rpm,
+            self._max_rpm,
+            self._redline_rpm,
+            self._alert_min,
+        ):
+            self.mark_dirty()
 
     def draw(self, surface: Any) -> None:
         x, y = (surface.get_width() // 2, 180)
         bar_left = x - self._width // 2
 
-        # for consistent tick rendering (major/minor + color)
-        def _draw_tick(tick_rpm: int, y1: int) -> None:
-            tick_x = self._rpm_to_x(bar_left, tick_rpm)
-            is_end = tick_rpm >= self._max_rpm  # force last tick to be major
-            is_major = is_end or ((tick_rpm % self._major_step_rpm) == 0)
-            y2 = y1 + (7 if is_major else 3)
-            width = 3 if is_major else 1
-            tick_color = (
-                Color.LIGHT_RED.rgb()
-                if tick_rpm >= self._redline_rpm
-                else Color.LIGHT_GREY.rgb()
-            )
-            pygame.draw.line(surface, tick_color, (tick_x, y1), (tick_x, y2), width)
-
         # continuous fill mode
         if self._max_rpm >= 0:
             rpm = self.current_rpm
@@ -220,25 +228,63 @@ class GraphicalRPM(Widget):
                     ),
                 )
 
-            sparse_factor = 2  # skip every other minor tick
-            y1 = y + self.height
-            minor_count = self._tick_count + 1
-            for i in range(0, minor_count, sparse_factor):
-                tick_rpm = min(i * self._tick_step_rpm, self._max_rpm)
-                _draw_tick(tick_rpm, y1)
-
-            # Ensure the last tick is drawn bold even if skipped by sparse step
-            if (minor_count - 1) % sparse_factor != 0:
-                _draw_tick(self._max_rpm, y1)
-
-        # labels
-        self.max_label.set_text(str(self._normalize(self._max_rpm)))
+        # static scale: ticks and labels
+        scale = self._scale()
+        ox, oy = self._scale_offset
+        scale_rect = surface.blit(scale, (bar_left + ox, y + oy))
+
+        # bar (the bold end tick may overhang it by a pixel or two) + scale
+        bar = pygame.Rect(bar_left, y, self._width, self.height + 8).inflate(4, 0)
+        self._drawn_rects = [bar, scale_rect]
+
+    def _scale(self) -> pygame.Surface:
+        key = (self._width, self._max_rpm, self._redline_rpm, self._tick_step_rpm)
+        if key != self._scale_key or self._scale_surface is None:
+            self._build_scale()
+            self._scale_key = key
+            self.scale_rebuilds += 1
+        return self._scale_surface
+
+    def _build_scale(self) -> None:
+        """Render ticks below the bar and the labels beside them."""
         pad = 4
-        label_y = y + self.height + 2
-        self.min_label.rect.topleft = (
-            bar_left - self.min_label.surface.get_width() - pad,
-            label_y,
+        min_img = self.min_label.surface
+        max_img = self.max_label.surface
+        bar_left = min_img.get_width() + pad
+        label_y = self.height + 2
+        w = bar_left + self._width + pad + max_img.get_width()
+        h = max(
+            self.height + 8,
+            label_y + min_img.get_height(),
+            label_y + max_img.get_height(),
+        )
+        surf = pygame.Surface((w, h), pygame.SRCALPHA)
+
+        sparse_factor = 2  # skip every other minor tick
+        y1 = self.height
+        minor_count = self._tick_count + 1
+        for i in range(0, minor_count, sparse_factor):
+            tick_rpm = min(i * self._tick_step_rpm, self._max_rpm)
+            self._draw_tick(surf, bar_left, tick_rpm, y1)
+        # Ensure the last tick is drawn bold even if skipped by sparse step
+        if (minor_count - 1) % sparse_factor != 0:
+            self._draw_tick(surf, bar_left, self._max_rpm, y1)
+
+        surf.blit(min_img, (0, label_y))
+        surf.blit(max_img, (bar_left + self._width + pad, label_y))
+        self._scale_surface = surf
+        self._scale_offset = (-bar_left, 0)
+
+    def _draw_tick(self, surf, bar_left: int, tick_rpm: int, y1: int) -> None:
+        # major/minor + colour, consistent for every tick
+        tick_x = self._rpm_to_x(bar_left, tick_rpm)
+        is_end = tick_rpm >= self._max_rpm  # force last tick to be major
+        is_major = is_end or ((tick_rpm % self._major_step_rpm) == 0)
+        y2 = y1 + (7 if is_major else 3)
+        width = 3 if is_major else 1
+        tick_color = (
+            Color.LIGHT_RED.rgb()
+            if tick_rpm >= self._redline_rpm
+            else Color.LIGHT_GREY.rgb()
         )
-        self.max_label.rect.topleft = (bar_left + self._width + pad, label_y)
-        self.min_label.draw(surface)
-        self.max_label.draw(surface)
+        pygame.draw.line(surf, tick_color, (tick_x, y1), (tick_x, y2), width)
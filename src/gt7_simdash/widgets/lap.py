@@ -1,17 +1,24 @@
-from typing import Any, Callable, Optional, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple
 
-import numpy as np
 import pygame
-from granturismo.model.packet import Packet
-from scipy.spatial import cKDTree as KDTree
 
+from ..core.lap_delta import MultiProgressCursor
+from ..core.lap_samples import LapSampleBuffer, ReferenceBuilder
+from ..core.lap_store import LapStore, cell_of
+from ..core.sectors import DEFAULT_MICRO_PER_SECTOR, DEFAULT_SECTORS, SectorTimer
+from ..core.telemetry_frame import TelemetryFrame
 from ..core.utils import FontFamily, load_font
 from ..widgets.base.colors import Color
-from ..widgets.base.label import Label
+from ..widgets.base.glyph_atlas_label import GlyphAtlasLabel
 from ..widgets.base.widget import Widget
 
 Anchor = Callable[[Tuple[int, int]], Tuple[int, int]]  # (w, h) -> (cx, cy)
 
+# reference slots, see EstimatedLap
+REF_BEST = "best"  # all-time best: stored for this car and track, or this session
+REF_SESSION = "session"  # best lap of this session
+REF_LAST = "last"  # the previous lap
+
 
 def _format_mmss_hh(seconds: float) -> str:
     """Format seconds as MM:SS.hh (hundredths)."""
@@ -27,19 +34,38 @@ class EstimatedLap(Widget):
     Lap-time / delta widget.
 
     - Lap 1 (no reference yet): shows elapsed lap time as MM:SS.hh (white).
-    - Lap ≥ 2: shows delta vs nearest checkpoint from the best lap:
+    - Lap ≥ 2: shows delta vs the best lap at the same progress along track
+      (interpolated between its checkpoints, see `ProgressCursor`):
         * faster -> green, prefixed with "-" (e.g., "-0.18")
         * slower/equal -> red, no sign (e.g., "0.23")
+    - Smaller deltas vs the session best ("S", when it is not the all-time
+      best) and the previous lap ("L") are shown above it. All references
+      are matched with one batched lookup per tick (`MultiProgressCursor`);
+      the latest values are in `deltas`, keyed by the REF_* slot names.
     - Uses `dt`, samples track positions at a fixed Hz, and quantizes (x, z)
-      to a grid to keep the KD-tree compact.
+      to a grid to keep the KD-tree compact (`LapSampleBuffer`).
+    - With a `LapStore`, best laps are saved per car and track and picked up
+      again once the positions of the current session match a stored track,
+      so deltas show from the first lap.
+    - References, their KD-trees and the packed cursor arrays are built on a
+      `ReferenceBuilder` thread and swapped in when ready, so a lap boundary
+      costs the render thread no more than a normal frame.
+    - `sectors` times equal-distance sectors and micro-sectors of the best
+      lap as the car crosses them (`SectorTimer`); `theoretical_best_s` is
+      the sum of the best micro-sectors.
+    - Time-driven: animating while the lap clock runs or a reference set is
+      ready, otherwise only updated when one of `inputs` changes.
     """
 
+    inputs = ("lap_count", "car_id", "position", "paused", "loading")
+
     def __init__(
         self,
         anchor: Anchor,
         *,
         font_name: str = FontFamily.DIGITAL_7_MONO,
         font_size: int = 64,
+        secondary_font_size: int = 26,
         color_idle: Tuple[int, int, int] = None,
         color_faster: Tuple[int, int, int] = None,
         color_slower: Tuple[int, int, int] = None,
@@ -54,10 +80,13 @@ class EstimatedLap(Widget):
         border_padding: int = 0,
         border_radius: int = 4,
         border_color: Tuple[int, int, int] | None = Color.GREY.rgb(),
+        store: LapStore | None = None,
+        n_sectors: int = DEFAULT_SECTORS,
+        micro_per_sector: int = DEFAULT_MICRO_PER_SECTOR,
     ) -> None:
         super().__init__()
         self._anchor = anchor
-        self._label = Label(
+        self._label = GlyphAtlasLabel(
             text="--:--.--",
             font=load_font(size=font_size, dir="digital", name=font_name),
             color=(color_idle or Color.WHITE.rgb()),
@@ -67,6 +96,15 @@ class EstimatedLap(Widget):
         self._color_idle = color_idle or Color.WHITE.rgb()
         self._color_faster = color_faster or Color.GREEN.rgb()
         self._color_slower = color_slower or Color.RED.rgb()
+        # secondary deltas: session best (left) and previous lap (right)
+        small = load_font(size=secondary_font_size, dir="digital", name=font_name)
+        self._secondary = {
+            name: GlyphAtlasLabel(
+                text="", font=small, color=self._color_idle, pos=(0, 0)
+            )
+            for name in (REF_SESSION, REF_LAST)
+        }
+        self.deltas: Dict[str, float] = {}
 
         self._fixed_size = size
         self._min_size = min_size or (0, 0)
@@ -81,30 +119,39 @@ class EstimatedLap(Widget):
 
         # timing
         self._lap_index: int = -1
+        self._last_lap_count: Optional[int] = None  # of the previous frame
+        # the current lap began at a lap_count change we saw; joined mid-lap
+        # (start-up, reconnect, car change) it is partial and never finalized
+        self._lap_started = False
         self._lap_time_s: float = 0.0
-        self._best_time_s: float = float("inf")
+        self._running = False  # lap clock advancing (in a lap, not paused)
+        self._best_time_s: float = float("inf")  # all-time (includes stored)
+        self._session_best_s: float = float("inf")
 
         # sampling
         self._sample_hz = max(1e-3, float(sample_hz))
         self._sample_interval = 1.0 / self._sample_hz
         self._sample_accum = 0.0
         self._grid = float(grid_m)
+        self._samples = LapSampleBuffer(grid_m=self._grid)  # current lap
 
         self._tenths_last: float | None = None
         self._tenths_hold = 0.0
         self._tenths_debounce_s = 0.06  # must hold for 60 ms
         self._tenths_deadband_s = 0.004  # ~4 ms of deadband (was 8 ms)
 
-        # current lap samples: {(qx, qz): time_s}
-        self._track_positions: dict[Tuple[float, float], float] = {}
-
-        # best lap reference (frozen at the moment a new best is achieved)
-        self._best_pts_np = None  # Nx2 float32 (if numpy available)
-        self._best_times_np = None  # N float32
-        self._best_pts_list = None  # list[tuple[float,float]] (fallback)
-        self._best_times_list = None  # list[float]
-        self._kdtree = None  # cKDTree
+        # lap references by REF_* slot (frozen when a lap completes, or the
+        # best loaded from the store), built and packed by the worker
+        self._refs = MultiProgressCursor()
+        self._ref_stored = False  # REF_BEST loaded from disk, not driven now
         self._kd_leafsize = int(kd_leafsize)
+        self._builder = ReferenceBuilder(store, self._kd_leafsize, self._grid)
+        self.sectors = SectorTimer(n_sectors, micro_per_sector)
+
+        # persistence: coarse cells seen this session identify the track
+        self._store = store
+        self._car_id: Optional[int] = None
+        self._seen_cells: set[Tuple[int, int]] = set()
 
     def enter(self) -> None:
         if self._fixed_size:
@@ -130,62 +177,94 @@ class EstimatedLap(Widget):
         self._box_size = (int(w), int(h))
 
     def exit(self) -> None:
-        pass
+        self._builder.close()
+        if self._store is not None:
+            self._store.flush()
 
     def handle_event(self, event) -> bool:
         return False
 
-    def update(self, packet: Packet, dt: float | None = None) -> None:
+    def is_animating(self) -> bool:
+        return self._running or self._builder.pending
+
+    def update(self, frame: TelemetryFrame, dt: float | None = None) -> None:
         """Advance timing & display delta/elapsed."""
-        dt = float(dt or 0.0)
+        shown = self._shown()
+        self._advance(frame, dt)
+        if shown != self._shown():
+            self.mark_dirty()
 
-        flags = getattr(packet, "flags", None)
-        paused = bool(getattr(flags, "paused", False))
-        loading = bool(getattr(flags, "loading_or_processing", False))
-        lap_count = int(getattr(packet, "lap_count", 0) or 0)
+    def _shown(self) -> tuple:
+        labels = (self._label, *self._secondary.values())
+        return tuple((label.text, label.color) for label in labels)
 
-        # Reset if lap counter is 0 / invalid
-        if lap_count == 0 or lap_count is None:
-            self._reset()
+    def _advance(self, frame: TelemetryFrame, dt: float | None) -> None:
+        dt = float(dt or 0.0)
+        lap_count = frame.lap_count
+        prev_count, self._last_lap_count = self._last_lap_count, lap_count
+
+        # Reset once when the lap counter drops to 0 (menus, pre-race)
+        if lap_count == 0:
+            if prev_count != 0:
+                self._reset()
             return
 
+        # references are per car
+        car_id = frame.car_id
+        if car_id != self._car_id:
+            if self._car_id is not None:
+                self._reset()
+            self._car_id = car_id
+
         # Lap boundary: finalize previous, start new
         if lap_count != self._lap_index:
-            if self._lap_index > 0:
-                prev_time = self._lap_time_s
-                # If it's a new best, freeze checkpoints and build KD-tree
-                if prev_time < self._best_time_s and self._track_positions:
-                    self._best_time_s = prev_time
-                    self._build_reference_from_current()
-            # start new lap
+            if self._lap_index > 0 and self._lap_started:
+                self.sectors.finish_lap(self._lap_time_s)
+                if len(self._samples):
+                    self._finish_lap(self._lap_time_s)
+            # start new lap; only a counter change seen live is its start
+            self._lap_started = prev_count is not None and prev_count != lap_count
+            self._refs.reset()
+            self.sectors.start_lap(at_start=self._lap_started)
             self._lap_index = lap_count
             self._lap_time_s = 0.0
-            self._track_positions.clear()
+            self._samples.clear()
             self._sample_accum = 0.0
 
+        # references finished by the worker since the last frame
+        packed = self._builder.poll()
+        if packed is not None:
+            self._refs.install(packed)
+            self.sectors.set_length(self._refs.length_m(REF_BEST))
+
         # accumulate running time (paused/loading => no time passes)
-        if not paused and not loading and self._lap_index > 0:
+        self._running = not frame.paused and not frame.loading and self._lap_index > 0
+        if self._running:
             self._lap_time_s += dt
 
         # sample current position at fixed Hz, quantized
         self._sample_accum += dt
         if self._sample_accum >= self._sample_interval:
             self._sample_accum -= self._sample_interval
-            pos = getattr(packet, "position", None)
+            pos = frame.position
             if pos is not None:
-                qx, qz = self._quantize(pos.x, pos.z)
-                # keep the earliest time for a given cell (better for NN matching)
-                self._track_positions.setdefault((qx, qz), self._lap_time_s)
+                # keeps the earliest time for a given cell (better for matching)
+                self._samples.add(pos[0], pos[1], self._lap_time_s)
+                self._note_cell(pos[0], pos[1])
 
         # choose display mode
-        if self._has_reference() and self._lap_index >= 2:
-            # delta vs nearest best-lap checkpoint
-            pos = getattr(packet, "position", None)
+        if self._has_reference() and (self._lap_index >= 2 or self._ref_stored):
+            # deltas vs every reference at the same progress along track
+            pos = frame.position
             if pos is not None:
-                qx, qz = self._quantize(pos.x, pos.z)
-                delta = self._delta_vs_best((qx, qz))
+                self.deltas = self._deltas(pos[0], pos[1])
+                progress = self._refs.progress_m(REF_BEST)
+                if progress is not None:
+                    self.sectors.advance(progress, self._lap_time_s)
             else:
-                delta = None
+                self.deltas = {}
+            delta = self.deltas.get(REF_BEST)
+            self._update_secondary()
 
             if delta is None:
                 # fallback: show elapsed
@@ -199,9 +278,16 @@ class EstimatedLap(Widget):
                 self._label.color = self._color_faster if faster else self._color_slower
         else:
             # show elapsed time until we have a best reference
+            self.deltas = {}
+            self._update_secondary()
             self._label.set_text(_format_mmss_hh(self._lap_time_s))
             self._label.color = self._color_idle
 
+    @property
+    def theoretical_best_s(self) -> Optional[float]:
+        """Sum of the best micro-sector times, once all were driven."""
+        return self.sectors.theoretical_best_s
+
     def get_size(self) -> Tuple[int, int]:
         if self._box_size is None:
             self.enter()
@@ -230,8 +316,20 @@ class EstimatedLap(Widget):
                 surface, c, box, width=self._border_w, border_radius=self._border_r
             )
 
+        # secondary deltas in the top corners
+        inner = box.inflate(-2 * self._padding, -2 * self._padding)
+        session, last = self._secondary[REF_SESSION], self._secondary[REF_LAST]
+        session.rect.topleft = inner.topleft
+        last.rect.topright = inner.topright
+
         # draw text
         self._label.draw(surface)
+        rect = box.union(self._label.rect)
+        for label in (session, last):
+            if label.text:
+                label.draw(surface)
+                rect = rect.union(label.rect)
+        self._drawn_rects = [rect]
 
     def _set_text_color(self, text: str, color: Tuple[int, int, int]) -> None:
         self._label.color = color
@@ -281,60 +379,82 @@ class EstimatedLap(Widget):
         self._tenths_hold = 0.0
         return self._tenths_last
 
-    def _quantize(self, x: float, z: float) -> Tuple[float, float]:
-        """Quantize world coords to a grid to reduce noise and KD size."""
-        g = self._grid
-        return (round(float(x) / g) * g, round(float(z) / g) * g)
-
     def _has_reference(self) -> bool:
-        return (
-            (self._kdtree is not None)
-            or (self._best_pts_np is not None and self._best_times_np is not None)
-            or (self._best_pts_list is not None and self._best_times_list is not None)
+        return REF_BEST in self._refs
+
+    def _finish_lap(self, lap_time: float) -> None:
+        """Hand the finished lap to the builder as the previous-lap reference,
+        and as the session/all-time best if it beats them."""
+        slots = [REF_LAST]
+        if lap_time < self._session_best_s:
+            self._session_best_s = lap_time
+            slots.append(REF_SESSION)
+        new_best = lap_time < self._best_time_s
+        if new_best:
+            self._best_time_s = lap_time
+            self._ref_stored = False
+            slots.append(REF_BEST)
+        points, times = self._samples.freeze()
+        self._builder.submit_lap(
+            points, times, lap_time, self._car_id or 0, slots, save=new_best
         )
 
-    def _build_reference_from_current(self) -> None:
-        """Freeze current lap samples as the new best and build KD-tree."""
-        points = list(self._track_positions.keys())
-        times = list(self._track_positions.values())
-        if not points:
+    def _note_cell(self, x: float, z: float) -> None:
+        """Track coarse cells and pick up a stored reference once they match."""
+        cell = cell_of(float(x), float(z))
+        if cell in self._seen_cells:
             return
-
-        pts_np = np.asarray(points, dtype=np.float32)  # (N, 2)
-        t_np = np.asarray(times, dtype=np.float32)  # (N,)
-        self._best_pts_np = pts_np
-        self._best_times_np = t_np
-        self._best_pts_list = None
-        self._best_times_list = None
-
-        # Build KD-tree
-        if self._best_pts_np is not None:
-            self._kdtree = KDTree(self._best_pts_np, leafsize=self._kd_leafsize)
-
-    def _delta_vs_best(self, qpos: Tuple[float, float]) -> Optional[float]:
-        """Return current_lap_time - best_time_at_nearest_checkpoint."""
-        if (
-            self._kdtree is not None
-            and self._best_pts_np is not None
-            and self._best_times_np is not None
-        ):
-            # SciPy supports workers=-1 in newer versions; guard it
-            try:
-                dist, idx = self._kdtree.query(qpos, k=1, workers=-1)
-            except TypeError:
-                dist, idx = self._kdtree.query(qpos, k=1)
-            ref_time = float(self._best_times_np[int(idx)])
-            return float(self._lap_time_s - ref_time)
+        self._seen_cells.add(cell)
+        if self._store is None or self._car_id is None:
+            return
+        if self._has_reference() or self._ref_stored:
+            return
+        lap = self._store.match(self._car_id, self._seen_cells)
+        if lap is None:
+            return
+        # loaded off-thread; picked up mid-lap, the cursor finds its place
+        self._builder.submit_stored(lap, REF_BEST)
+        self.sectors.start_lap(at_start=False)
+        self._ref_stored = True
+        self._best_time_s = min(self._best_time_s, lap.best_time_s)
+
+    def _deltas(self, x: float, z: float) -> Dict[str, float]:
+        """Current lap time minus each reference's time at this progress."""
+        return {
+            name: self._lap_time_s - ref_time
+            for name, ref_time in self._refs.locate(x, z).items()
+        }
+
+    def _update_secondary(self) -> None:
+        best = self._refs.get(REF_BEST)
+        for name, label in self._secondary.items():
+            delta = self.deltas.get(name)
+            # the same lap as the big readout: nothing to add
+            if delta is None or self._refs.get(name) is best:
+                label.set_text("")
+                continue
+            shown = round(delta * 10.0) / 10.0
+            faster = shown < 0.0
+            prefix = "S" if name == REF_SESSION else "L"
+            label.set_text(
+                f"{prefix}-{abs(shown):.1f}" if faster else f"{prefix} {shown:.1f}"
+            )
+            label.color = self._color_faster if faster else self._color_slower
 
     def _reset(self) -> None:
         self._set_text_color("--:--.--", self._color_idle)
         self._lap_index = -1
+        self._lap_started = False
         self._lap_time_s = 0.0
+        self._running = False
         self._best_time_s = float("inf")
-        self._track_positions.clear()
+        self._session_best_s = float("inf")
+        self._samples.clear()
         self._sample_accum = 0.0
-        self._best_pts_np = None
-        self._best_times_np = None
-        self._best_pts_list = None
-        self._best_times_list = None
-        self._kdtree = None
+        self._builder.reset()
+        self.sectors.reset()
+        self._refs.clear()
+        self._ref_stored = False
+        self.deltas = {}
+        self._update_secondary()
+        self._seen_cells.clear()
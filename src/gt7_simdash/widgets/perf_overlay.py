@@ -0,0 +1,149 @@
+import datetime
+from typing import Any, List, Optional
+
+import pygame
+
+from ..core.logger import Logger
+from ..core.utils import FontFamily, load_font
+from ..widgets.base.colors import Color
+from ..widgets.base.widget import Anchor, Widget
+from ..widgets.base.widget_group import WidgetGroup
+
+TOGGLE_KEY = pygame.K_F3
+DUMP_KEY = pygame.K_F4
+
+# column x offsets inside the panel: name, update p50/p95, draw p50/p95
+_COLUMNS = (8, 150, 210, 270, 330)
+_HEADER = ("widget", "upd50", "upd95", "drw50", "drw95")
+
+
+class PerfOverlay(Widget):
+    """Per-widget frame-time table for a :class:`WidgetGroup`.
+
+    F3 toggles the overlay together with the group's instrumentation, so the
+    timers cost nothing while it is hidden. F4 dumps the collected samples to
+    ``gt7-simdash_perf_<timestamp>.json`` in the working directory. Add it as
+    the last child so it is drawn on top.
+    """
+
+    def __init__(
+        self,
+        group: WidgetGroup,
+        anchor: Anchor = lambda size: (8, 8),
+        refresh_hz: float = 2.0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        group : WidgetGroup
+            The group whose children are timed.
+        anchor : Anchor
+            Function mapping ``(width, height)`` -> top-left of the panel.
+        refresh_hz : float
+            How often the table is re-rendered from the rings.
+        """
+        self.logger = Logger(__class__.__name__).get()
+        self._group = group
+        self._anchor = anchor
+        self._period = 1.0 / max(0.1, refresh_hz)
+        self._since = 0.0
+        self._font = load_font(
+            size=14, dir="noto_sans", name=FontFamily.NOTOSANS_REGULAR
+        )
+        self._panel: Optional[pygame.Surface] = None
+        self.visible = False
+        self._drawn_rects = []
+
+    def exit(self) -> None:
+        self._panel = None
+
+    def handle_event(self, event: Any) -> bool:
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == TOGGLE_KEY:
+            self.set_visible(not self.visible)
+            return True
+        if event.key == DUMP_KEY:
+            self.dump()
+            return True
+        return False
+
+    def set_visible(self, visible: bool) -> None:
+        self.visible = visible
+        if visible and not self._group.is_instrumented():
+            self._group.set_instrumented(True)
+        elif not visible:
+            self._group.set_instrumented(False)
+            self._panel = None
+        self._since = self._period  # render on the next update
+        self.mark_dirty()
+
+    def dump(self, path: Optional[str] = None) -> Optional[str]:
+        """Write the group's timings to *path* (timestamped name by default)."""
+        if not self._group.is_instrumented():
+            self.logger.info("Perf dump skipped: instrumentation is off (F3)")
+            return None
+        if path is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = f"gt7-simdash_perf_{timestamp}.json"
+        try:
+            self._group.dump_timings(path)
+        except OSError as e:
+            self.logger.info(f"Perf dump failed: {e}")
+            return None
+        self.logger.info(f"Perf timings written to {path}")
+        return path
+
+    def update(self, model: Any, dt: float) -> None:
+        if not self.visible:
+            return
+        self._since += dt or 0.0
+        if self._since < self._period:
+            return
+        self._since = 0.0
+        self._panel = self._render(self._group.timing_stats())
+        self.mark_dirty()
+
+    def draw(self, surface: Any) -> None:
+        if not self.visible or self._panel is None:
+            self._drawn_rects = []
+            return
+        rect = self._panel.get_rect(topleft=self._anchor(surface.get_size()))
+        surface.blit(self._panel, rect)
+        self._drawn_rects = [rect]
+
+    def _render(self, stats: dict) -> pygame.Surface:
+        rows: List[tuple] = [_HEADER]
+        total_p50 = 0.0
+        for name, phases in stats.items():
+            if name == type(self).__name__:
+                continue  # do not report ourselves
+            upd, drw = phases["update"], phases["draw"]
+            if not upd.get("n") and not drw.get("n"):
+                rows.append((name, "-", "-", "-", "-"))
+                continue
+            total_p50 += upd.get("p50_ms", 0.0) + drw.get("p50_ms", 0.0)
+            rows.append(
+                (
+                    name,
+                    f"{upd.get('p50_ms', 0.0):.2f}",
+                    f"{upd.get('p95_ms', 0.0):.2f}",
+                    f"{drw.get('p50_ms', 0.0):.2f}",
+                    f"{drw.get('p95_ms', 0.0):.2f}",
+                )
+            )
+        rows.append((f"sum p50 {total_p50:.2f} ms", "", "", "", ""))
+
+        line_h = self._font.get_linesize()
+        panel = pygame.Surface(
+            (_COLUMNS[-1] + 60, line_h * len(rows) + 8), pygame.SRCALPHA
+        )
+        panel.fill((0, 0, 0, 190))
+        for r, row in enumerate(rows):
+            color = Color.LIGHT_GREY.rgb() if r == 0 else Color.WHITE.rgb()
+            for x, text in zip(_COLUMNS, row):
+                if text:
+                    panel.blit(
+                        self._font.render(text, True, color), (x, 4 + r * line_h)
+                    )
+        return panel
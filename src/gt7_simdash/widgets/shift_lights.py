@@ -1,17 +1,27 @@
 import math
+import time
 from typing import Any, List, Optional, Protocol, Tuple
 
-from granturismo.model.packet import Packet
+import numpy as np
+import pygame
 
 from ..core.ecu import ECU
+from ..core.ecu_worker import DEFAULT_QUEUE_DEPTH, ECUSnapshot, ECUWorker
+from ..core.ingest import StampedPacket
+from ..core.telemetry_frame import TelemetryFrame
 from ..core.utils import FontFamily, load_font
 from ..widgets.base.colors import Color
-from ..widgets.base.label import Label
+from ..widgets.base.glyph_atlas_label import GlyphAtlasLabel
+from ..widgets.base.pill import PillRenderer
 from ..widgets.base.widget import Anchor, Widget
 
 FLASH_PERIOD_S = 0.12
 SHIFT_HYST_RPM = 120.0
 
+PLOT_FADE_TAU_S = 8.0  # scatter points fade with exp(-age / tau)
+PLOT_DECAY_PERIOD_S = 0.5
+PLOT_HEADROOM = 1.25  # y scale above the peak, so growth rarely rescales
+
 
 class BlinktIface(Protocol):
     NUM_PIXELS: int
@@ -101,16 +111,137 @@ def make_blinkt() -> BlinktIface:
     return RealBlinkt() if _HAVE_BLINKT else FakeBlinkt(8)
 
 
+class ScatterPlotLayer:
+    """Persistent surfaces for the live per-gear scatter plot.
+
+    The frame is drawn once, the learned curve only when the snapshot's
+    ``curve_version`` or the scale changes, and samples are stamped onto the
+    point layer as they arrive (tracked by sequence number). Ageing is a
+    periodic ``BLEND_RGBA_MULT`` of the whole point layer instead of a fade
+    per point, so a frame costs O(new samples) rather than O(window).
+
+    A change of car, gear, rpm range or y scale clears the point layer and
+    replays the sample window once, pre-faded by age.
+    """
+
+    def __init__(self, w: int, h: int, pad: int = 12) -> None:
+        self.box = pygame.Rect(0, 0, w, h)
+        self.inner = self.box.inflate(-2 * pad, -2 * pad)
+        self._frame = pygame.Surface(self.box.size, pygame.SRCALPHA)
+        pygame.draw.rect(self._frame, (22, 22, 28), self.box, border_radius=10)
+        pygame.draw.rect(
+            self._frame, Color.BLACK.rgb(), self.box, width=2, border_radius=10
+        )
+        pygame.draw.rect(self._frame, (30, 30, 38), self.inner, border_radius=8)
+        self._curve = pygame.Surface(self.inner.size, pygame.SRCALPHA)
+        self._points = pygame.Surface(self.inner.size, pygame.SRCALPHA)
+
+        self._key: Optional[tuple] = None  # what the point layer was drawn for
+        self._bounds: Tuple[float, float, float] = (800.0, 12000.0, 1.0)
+        self._y_scale = 0.0
+        self._seq = 0  # next sample sequence number to stamp
+        self._curve_version = -1
+        self._decay_s = 0.0
+        self.rebuilds = 0
+        self.points_stamped = 0
+
+    def update(self, snap: ECUSnapshot, dt: float) -> bool:
+        """Bring the layers up to date with *snap*; ``True`` if they changed."""
+        rpm_min, rpm_max, y_max = snap.plot_bounds
+        if y_max > self._y_scale or y_max < self._y_scale / (2 * PLOT_HEADROOM):
+            self._y_scale = y_max * PLOT_HEADROOM
+        key = (snap.car_id, snap.gear, snap.plot_samples, rpm_min, rpm_max)
+        key += (self._y_scale,)
+        changed = False
+        replay = key != self._key
+        if replay:
+            self._key = key
+            self._bounds = (rpm_min, rpm_max, self._y_scale)
+            self._points.fill((0, 0, 0, 0))
+            self._seq = 0
+            self._curve_version = -1
+            self._decay_s = 0.0
+            self.rebuilds += 1
+            changed = True
+        if snap.curve_version != self._curve_version:
+            self._draw_curve(snap.curve)
+            self._curve_version = snap.curve_version
+            changed = True
+
+        samples = snap.plot_samples
+        if samples is not None and snap.plot_seq > self._seq:
+            rows = samples.since(self._seq, snap.plot_seq)
+            self._stamp(rows, time.time() if replay else None)
+            self._seq = snap.plot_seq
+            changed = True
+
+        self._decay_s += dt
+        if self._decay_s >= PLOT_DECAY_PERIOD_S:
+            k = int(255 * math.exp(-self._decay_s / PLOT_FADE_TAU_S))
+            self._points.fill((k, k, k, k), special_flags=pygame.BLEND_RGBA_MULT)
+            self._decay_s = 0.0
+            changed = True
+        return changed
+
+    def draw(self, surface: Any, x: int, y: int) -> None:
+        surface.blit(self._frame, (x, y))
+        pos = (x + self.inner.left, y + self.inner.top)
+        surface.blit(self._curve, pos)
+        surface.blit(self._points, pos)
+
+    def _to_px(
+        self, rpm: np.ndarray, val: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rpm_min, rpm_max, y_max = self._bounds
+        sx = (rpm - rpm_min) / max(1.0, rpm_max - rpm_min)
+        sy = 1.0 - np.minimum(1.0, val / y_max)
+        w, h = self.inner.size
+        return (sx * w).astype(np.int32), (sy * h).astype(np.int32), sx
+
+    def _draw_curve(self, curve: Tuple[Tuple[float, float], ...]) -> None:
+        self._curve.fill((0, 0, 0, 0))
+        if len(curve) < 2:
+            return
+        c = np.asarray(curve, dtype=np.float64)
+        px, py, _ = self._to_px(np.clip(c[:, 0], *self._bounds[:2]), c[:, 1])
+        pygame.draw.lines(
+            self._curve, (120, 180, 255), False, list(zip(px.tolist(), py.tolist())), 2
+        )
+
+    def _stamp(self, rows: np.ndarray, now: Optional[float]) -> None:
+        # rows: (rpm, proxy, time); *now* pre-fades a replayed window by age
+        if rows.size == 0:
+            return
+        px, py, sx = self._to_px(rows[:, 0], rows[:, 1])
+        keep = (sx >= 0.0) & (sx <= 1.0)
+        if now is None:
+            fades = np.ones(rows.shape[0])
+        else:
+            fades = np.exp(-np.maximum(0.0, now - rows[:, 2]) / PLOT_FADE_TAU_S)
+        layer = self._points
+        for x, y, f in zip(px[keep].tolist(), py[keep].tolist(), fades[keep].tolist()):
+            col = (int(255 * f), int(220 * f), int(80 * f), int(200 * f))
+            pygame.draw.circle(layer, col, (x, y), 2)
+        self.points_stamped += int(np.count_nonzero(keep))
+
+
 class ShiftLights(Widget):
     """Shift-light widget with ECU learning, target flash, and live per-gear scatter plot."""
 
+    # until attach_source(), every new packet is handed to the ECU by update()
+    inputs = ("packet_id",)
+    ATTACHED_INPUTS = ("rpm", "gear")
+
     def __init__(
         self,
         anchor: Anchor,
         step_thresholds: Optional[List[float]] = None,
         color_thresholds: Tuple[float, float] = (0.5, 0.8),
+        ecu_queue_depth: int = DEFAULT_QUEUE_DEPTH,
+        ecu: Optional[ECU] = None,
+        threaded: bool = True,
     ) -> None:
-        self._label = Label(
+        self._label = GlyphAtlasLabel(
             text=" ",
             font=load_font(size=30, dir="digital", name=FontFamily.DIGITAL_7_MONO),
             color=Color.WHITE.rgb(),
@@ -118,8 +249,22 @@ class ShiftLights(Widget):
             center=True,
         )
         self._anchor = anchor
+        # HUD pills are composed once per (text, colour) and then just blitted
+        self._pills = PillRenderer(
+            load_font(size=17, dir="d-din", name=FontFamily.D_DIN_BOLD)
+        )
 
-        self._ecu = ECU()
+        # ECU learning runs on a worker; the widget only reads its snapshots.
+        # Unthreaded, update() folds pending packets in itself (deterministic,
+        # used by the benchmark).
+        self._worker = ECUWorker(ecu, queue_depth=ecu_queue_depth)
+        self._threaded = threaded
+        self._ecu = self._worker.ecu
+        self._attached = False
+        self._last_model: Any = None
+        self._snap: Optional[ECUSnapshot] = None  # last snapshot shown
+        self._local_seq = 0
+        self.snapshot_lag = 0  # packets not yet reflected in the ECU snapshot
 
         # LED device
         self._blinkt: BlinktIface = make_blinkt()
@@ -146,16 +291,26 @@ class ShiftLights(Widget):
         self._rpm: float = 0.0
         self._gear: int = 0
 
-        # plot data
+        # live scatter plot, kept up to date incrementally
         self._show_plot = True
-        self._scatter_points: List[Tuple[float, float, float]] = []  # (rpm, proxy, age)
-        self._plot_bounds: Tuple[float, float, float] = (800.0, 12000.0, 1.0)
-        self._curve_series: List[Tuple[float, float]] = []
+        self._plot = ScatterPlotLayer(360, 160)
+
+    def attach_source(self, ingest) -> None:
+        """Learn from every packet of *ingest* rather than only rendered ones.
+
+        The ECU then integrates with the real inter-packet ``dt`` from the
+        receive timestamps instead of the frame ``dt``.
+        """
+        self._attached = True
+        self.inputs = self.ATTACHED_INPUTS
+        ingest.subscribe(self._worker.submit)
 
     def enter(self) -> None:
-        pass
+        if self._threaded:
+            self._worker.start()
 
     def exit(self) -> None:
+        self._worker.stop()
         try:
             self._blinkt.clear()
             self._blinkt.show()
@@ -169,20 +324,42 @@ class ShiftLights(Widget):
 
             if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
                 self._show_plot = not self._show_plot
+                self.mark_dirty()
                 return True
         except Exception:
             pass
         return False
 
-    def update(self, model: Packet, dt: float | None = None) -> None:
-        # Update ECU learning/state
-        self._ecu.update(model, dt)
+    def is_animating(self) -> bool:
+        # flashing, or the ECU learned something since the last update; the
+        # scatter plot only ages while it is being updated
+        # (lag() would also update the worker's max_lag stat)
+        worker = self._worker
+        snap = worker.snapshot
+        return (
+            self._flashing or snap is not self._snap or worker.submitted_seq > snap.tick
+        )
 
-        self._rpm = float(getattr(model, "engine_rpm", 0.0))
-        self._gear = int(getattr(model, "current_gear", 0))
-        up, dn, info = self._ecu.get_shift_targets(model)
-        self._up_target = up
-        self._down_target = dn
+    def update(self, model: TelemetryFrame, dt: float | None = None) -> None:
+        # Without an ingest stage, hand rendered packets to the ECU worker
+        if not self._attached and model is not self._last_model:
+            self._local_seq += 1
+            self._worker.submit(
+                StampedPacket(self._local_seq, time.monotonic_ns(), model.packet, model)
+            )
+            self._last_model = model
+        if not self._threaded:
+            self._worker.process_pending()
+        snap = self._snap = self._worker.snapshot
+        self.snapshot_lag = self._worker.lag()
+
+        self._rpm = model.rpm
+        self._gear = model.gear
+        info = dict(snap.info)
+        info["rpm"] = self._rpm
+        info["gear"] = float(self._gear)
+        self._up_target = snap.shift_up_rpm.get(self._gear)
+        self._down_target = snap.shift_down_rpm.get(self._gear)
         self._ready = info.get("coverage", 0.0) >= 0.55
 
         # Progress vs upshift target
@@ -216,27 +393,33 @@ class ShiftLights(Widget):
         label_txt = self._format_label(info)
         self._label.set_text(label_txt)
 
-        # Fetch live scatter for current gear
-        self._scatter_points, self._plot_bounds, self._curve_series = (
-            self._ecu.get_plot_data(model, self._gear)
-        )
+        # Live scatter for the gear of the latest learned packet
+        self._plot.update(snap, dt or 0.0)
+        # pills, LEDs and plot track live rpm, so repaint every tick
+        self.mark_dirty()
 
     def draw(self, surface: Any) -> None:
+        import pygame
+
+        drawn = []
         # LED bar visualization (for when no hardware)
         self._draw_led_bar(surface, x=20, y=20, w=240, h=28)
+        drawn.append(pygame.Rect(20, 20, 240, 28))
 
         # ECU pill: shows learning/ready and target(s)
         pill = "READY" if self._ready else "LEARNING"
         bg = Color.DARK_GREEN.rgb() if self._ready else Color.DARK_YELLOW.rgb()
-        self._draw_pill(surface, x=20, y=60, text=f"ECU {pill}", bg=bg)
+        drawn.append(self._draw_pill(surface, x=20, y=60, text=f"ECU {pill}", bg=bg))
 
         # Gear/RPM pill
-        self._draw_pill(
-            surface,
-            x=20,
-            y=95,
-            text=f"G{self._gear}  {int(self._rpm)} rpm",
-            bg=Color.DARK_GREY.rgb(),
+        drawn.append(
+            self._draw_pill(
+                surface,
+                x=20,
+                y=95,
+                text=f"G{self._gear}  {int(self._rpm)} rpm",
+                bg=Color.DARK_GREY.rgb(),
+            )
         )
 
         # Targets pill
@@ -248,8 +431,10 @@ class ShiftLights(Widget):
         if dn:
             txt.append(f"DN {dn} rpm")
         if txt:
-            self._draw_pill(
-                surface, x=20, y=130, text="  ".join(txt), bg=Color.DARK_GREY.rgb()
+            drawn.append(
+                self._draw_pill(
+                    surface, x=20, y=130, text="  ".join(txt), bg=Color.DARK_GREY.rgb()
+                )
             )
 
         # Numeric progress (center label)
@@ -257,17 +442,20 @@ class ShiftLights(Widget):
             pass
         except Exception:
             return
-        rect = self._label.surface.get_rect()
-        rect.center = (surface.get_width() // 2, 26)
-        surface.blit(self._label.surface, rect)
+        self._label.rect.center = (surface.get_width() // 2, 26)
+        self._label.draw(surface)
+        drawn.append(self._label.rect.copy())
 
         # Live scatter plot (per gear)
+        W = surface.get_width()
+        plot_w, plot_h = self._plot.box.size
+        x = W - plot_w - 20
+        y = 50
         if self._show_plot:
-            W = surface.get_width()
-            plot_w, plot_h = 360, 160
-            x = W - plot_w - 20
-            y = 50
-            self._draw_scatter_plot(surface, x, y, plot_w, plot_h)
+            self._plot.draw(surface, x, y)
+        # keep the plot area in the footprint so toggling it off clears it
+        drawn.append(pygame.Rect(x, y, plot_w, plot_h))
+        self._drawn_rects = [r for r in drawn if r is not None]
 
     def _set_progress_leds(self, frac: float) -> None:
         n = self._blinkt.NUM_PIXELS
@@ -307,20 +495,8 @@ class ShiftLights(Widget):
 
     def _draw_pill(
         self, surface: Any, x: int, y: int, text: str, bg: Tuple[int, int, int]
-    ) -> None:
-        try:
-            import pygame
-        except Exception:
-            return
-        font = pygame.font.SysFont("Consolas", 16, bold=True)
-        pad = 10
-        timg = font.render(text, True, (240, 240, 250))
-        rect = timg.get_rect()
-        rect.topleft = (x + pad, y + pad)
-        box = pygame.Rect(x, y, rect.width + 2 * pad, rect.height + 2 * pad)
-        pygame.draw.rect(surface, bg, box, border_radius=10)
-        pygame.draw.rect(surface, Color.BLACK.rgb(), box, width=2, border_radius=10)
-        surface.blit(timg, rect)
+    ) -> Any:
+        return self._pills.draw(surface, x, y, text, bg)
 
     def _draw_led_bar(self, surface: Any, x: int, y: int, w: int, h: int) -> None:
         try:
@@ -341,61 +517,6 @@ class ShiftLights(Widget):
             )
             pygame.draw.rect(surface, color, inner, border_radius=8)
 
-    def _draw_scatter_plot(self, surface: Any, x: int, y: int, w: int, h: int) -> None:
-        try:
-            import pygame
-        except Exception:
-            return
-        # Frame
-        box = pygame.Rect(x, y, w, h)
-        pygame.draw.rect(surface, (22, 22, 28), box, border_radius=10)
-        pygame.draw.rect(surface, Color.BLACK.rgb(), box, width=2, border_radius=10)
-
-        # Axes (inside padding)
-        pad = 12
-        inner = box.inflate(-2 * pad, -2 * pad)
-        pygame.draw.rect(surface, (30, 30, 38), inner, border_radius=8)
-
-        rpm_min, rpm_max, y_max = self._plot_bounds
-        xr = max(1.0, rpm_max - rpm_min)
-
-        # Curve (learned)
-        if self._curve_series:
-            pts = []
-            for r, t in self._curve_series:
-                sx = (r - rpm_min) / xr
-                sx = 0.0 if sx < 0 else (1.0 if sx > 1 else sx)
-                sy = 1.0 - min(1.0, t / y_max)
-                px = inner.left + int(sx * inner.width)
-                py = inner.top + int(sy * inner.height)
-                pts.append((px, py))
-            if len(pts) >= 2:
-                import pygame
-
-                pygame.draw.lines(surface, (120, 180, 255), False, pts, 2)
-
-        # Scatter for current gear (fade with age)
-        if self._scatter_points:
-            import pygame
-
-            lay = pygame.Surface((inner.width, inner.height), pygame.SRCALPHA)
-            for r, p, age in self._scatter_points[-400:]:
-                sx = (r - rpm_min) / xr
-                if sx < 0 or sx > 1:
-                    continue
-                sy = 1.0 - min(1.0, p / y_max)
-                px = int(sx * inner.width)
-                py = int(sy * inner.height)
-                fade = max(0.25, min(1.0, math.exp(-age / 8.0)))  # ~8s half-life
-                col = (
-                    int(255 * fade),
-                    int(220 * fade),
-                    int(80 * fade),
-                    int(200 * fade),
-                )
-                pygame.draw.circle(lay, col, (px, py), 2)
-            surface.blit(lay, (inner.left, inner.top))
-
     def _format_label(self, info: dict) -> str:
         cov = info.get("coverage", 0.0)
         red = int(info.get("redline", 0.0) or 0)
@@ -1,16 +1,17 @@
 from typing import Any
 
-from granturismo.model.packet import Packet
-
+from ..core.telemetry_frame import TelemetryFrame
 from ..core.utils import FontFamily, load_font
 from ..widgets.base.colors import Color
-from ..widgets.base.label import Label
+from ..widgets.base.glyph_atlas_label import GlyphAtlasLabel
 from ..widgets.base.widget import Anchor, Widget
 
 
 class SpeedLabel(Widget):
     """Speed indicator"""
 
+    inputs = ("speed_kmh",)
+
     def __init__(self, anchor: Anchor) -> None:
         """Create the speed label
 
@@ -18,7 +19,7 @@ class SpeedLabel(Widget):
         anchor : Anchor
             Function mapping ``(width, height)`` -> center position for the label.
         """
-        self._label = Label(
+        self._label = GlyphAtlasLabel(
             text="0",
             font=load_font(size=120, dir="digital", name=FontFamily.DIGITAL_7_MONO),
             color=Color.WHITE.rgb(),
@@ -37,11 +38,12 @@ class SpeedLabel(Widget):
         """Never consumes events"""
         return False
 
-    def update(self, model: Packet, dt: float | None = None) -> None:
-        speed_kmh = int(((getattr(model, "car_speed", 0.0) or 0.0) * 3.6))
-        self._label.set_text(f"{speed_kmh}")
+    def update(self, model: TelemetryFrame, dt: float | None = None) -> None:
+        if self._label.set_text(f"{int(model.speed_kmh)}"):
+            self.mark_dirty()
 
     def draw(self, surface: Any) -> None:
         w, h = surface.get_size()
         self._label.rect.center = self._anchor((w, h))
         self._label.draw(surface)
+        self._drawn_rects = [self._label.rect.copy()]